@@ -0,0 +1,291 @@
+import os
+import random
+import collections
+
+
+ProgramOptions = collections.namedtuple("ProgramOptions", [
+    "module_count",
+    "fan_out",
+    "class_density",
+    "generic_density",
+    "function_size",
+    "nesting_depth",
+    "seed",
+])
+
+
+def program_options(module_count=10, fan_out=2, class_density=1, generic_density=1, function_size=10, nesting_depth=2, seed=0):
+    return ProgramOptions(
+        module_count=module_count,
+        fan_out=fan_out,
+        class_density=class_density,
+        generic_density=generic_density,
+        function_size=function_size,
+        nesting_depth=nesting_depth,
+        seed=seed,
+    )
+
+
+package_name = "generated"
+
+
+# Writes a valid nope program to the directory: a package of modules, each
+# importing functions and classes from up to fan_out of the modules before it,
+# and an executable main.py that imports the last module. Returns the path of
+# main.py.
+def generate_program(directory, options):
+    package_path = os.path.join(directory, package_name)
+    os.makedirs(package_path)
+    _write_file(os.path.join(package_path, "__init__.py"), "")
+    
+    rand = random.Random(options.seed)
+    modules = []
+    for index in range(options.module_count):
+        module = _generate_module(index, modules, options, rand)
+        _write_file(os.path.join(package_path, module.name + ".py"), module.source)
+        modules.append(module)
+    
+    main_path = os.path.join(directory, "main.py")
+    _write_file(main_path, _generate_main(modules[-1]))
+    return main_path
+
+
+def generate_module_source(options):
+    return _generate_module(0, [], options, random.Random(options.seed)).source
+
+
+# Modules for stress testing the checker with unusually deep or long trees,
+# like those found in generated code
+def generate_binary_chain_source(depth):
+    writer = _SourceWriter()
+    writer.line("total = 1" + " + 1" * depth)
+    writer.line("print(total)")
+    return writer.source()
+
+
+def generate_long_module_source(statement_count):
+    writer = _SourceWriter()
+    writer.line("total = 0")
+    for index in range(statement_count - 2):
+        writer.line("total = total + {}".format(index % 10))
+    writer.line("print(total)")
+    return writer.source()
+
+
+_Module = collections.namedtuple("_Module", ["name", "functions", "classes", "generic_classes", "source"])
+
+
+def _generate_module(index, previous_modules, options, rand):
+    name = "module_{}".format(index)
+    imported_modules = rand.sample(previous_modules, min(options.fan_out, len(previous_modules)))
+    
+    writer = _SourceWriter()
+    for imported_module in imported_modules:
+        writer.line("from .{} import {}".format(
+            imported_module.name,
+            ", ".join(imported_module.functions + imported_module.classes + imported_module.generic_classes),
+        ))
+    writer.line()
+    
+    # Values from the module being generated can be used alongside the imports
+    functions = list(_flatten(module.functions for module in imported_modules))
+    classes = list(_flatten(module.classes for module in imported_modules))
+    generic_classes = list(_flatten(module.generic_classes for module in imported_modules))
+    
+    module_classes = []
+    for class_index in range(options.class_density):
+        class_name = "Counter_{}_{}".format(index, class_index)
+        _write_class(writer, class_name)
+        module_classes.append(class_name)
+    
+    module_generic_classes = []
+    for class_index in range(options.generic_density):
+        class_name = "Box_{}_{}".format(index, class_index)
+        _write_generic_class(writer, class_name)
+        module_generic_classes.append(class_name)
+    
+    identity_name = "identity_{}".format(index)
+    writer.line("#:: T => T -> T")
+    writer.line("def {}(value):".format(identity_name))
+    with writer.indented():
+        writer.line("return value")
+    writer.line()
+    
+    function_name = "function_{}".format(index)
+    writer.line("#:: int -> int")
+    writer.line("def {}(value):".format(function_name))
+    with writer.indented():
+        writer.line("total = value")
+        _write_statements(
+            writer,
+            _Scope(
+                functions=functions,
+                classes=classes + module_classes,
+                generic_classes=generic_classes + module_generic_classes,
+                identity_name=identity_name,
+            ),
+            options.function_size,
+            options.nesting_depth,
+            rand,
+        )
+        writer.line("return total")
+    writer.line()
+    
+    # Mixes types so that the common super type has to be found
+    writer.line("values_{} = [1, None, \"{}\"]".format(index, name))
+    writer.line()
+    
+    return _Module(
+        name=name,
+        functions=[function_name],
+        classes=module_classes,
+        generic_classes=module_generic_classes,
+        source=writer.source(),
+    )
+
+
+def _write_class(writer, class_name):
+    writer.line("class {}(object):".format(class_name))
+    with writer.indented():
+        writer.line("#:: Self, int -> none")
+        writer.line("def __init__(self, start):")
+        with writer.indented():
+            writer.line("#:: int")
+            writer.line("self.start = start")
+        writer.line()
+        writer.line("#:: Self, int -> int")
+        writer.line("def increment(self, amount):")
+        with writer.indented():
+            writer.line("return self.start + amount")
+    writer.line()
+
+
+def _write_generic_class(writer, class_name):
+    writer.line("#:generic T")
+    writer.line("class {}(object):".format(class_name))
+    with writer.indented():
+        writer.line("#:: Self, T -> none")
+        writer.line("def __init__(self, value):")
+        with writer.indented():
+            writer.line("#:: T")
+            writer.line("self.value = value")
+        writer.line()
+        writer.line("#:: Self -> T")
+        writer.line("def get(self):")
+        with writer.indented():
+            writer.line("return self.value")
+    writer.line()
+
+
+_Scope = collections.namedtuple("_Scope", ["functions", "classes", "generic_classes", "identity_name"])
+
+
+def _write_statements(writer, scope, count, nesting_depth, rand):
+    written = 0
+    while written < count:
+        if nesting_depth > 0 and rand.random() < 0.3:
+            written += _write_block(writer, scope, count - written, nesting_depth, rand)
+        else:
+            _write_simple_statement(writer, scope, rand)
+            written += 1
+    
+    return written
+
+
+def _write_block(writer, scope, remaining, nesting_depth, rand):
+    body_size = max(1, min(remaining - 1, rand.randint(1, 4)))
+    kind = rand.choice(["if", "for", "while"])
+    
+    if kind == "if":
+        writer.line("if total > {}:".format(rand.randint(0, 100)))
+        with writer.indented():
+            written = _write_statements(writer, scope, body_size, nesting_depth - 1, rand)
+        writer.line("else:")
+        with writer.indented():
+            writer.line("total = total - 1")
+        return written + 2
+    elif kind == "for":
+        writer.line("for index_{} in range(0, {}):".format(nesting_depth, rand.randint(1, 3)))
+        with writer.indented():
+            written = _write_statements(writer, scope, body_size, nesting_depth - 1, rand)
+        return written + 1
+    else:
+        counter_name = "count_{}".format(nesting_depth)
+        writer.line("{} = 0".format(counter_name))
+        writer.line("while {} < {}:".format(counter_name, rand.randint(1, 3)))
+        with writer.indented():
+            writer.line("{0} = {0} + 1".format(counter_name))
+            written = _write_statements(writer, scope, body_size, nesting_depth - 1, rand)
+        return written + 3
+
+
+def _write_simple_statement(writer, scope, rand):
+    choices = ["arithmetic", "identity"]
+    if scope.functions:
+        choices.append("call")
+    if scope.classes:
+        choices.append("class")
+    if scope.generic_classes:
+        choices.append("generic")
+    
+    kind = rand.choice(choices)
+    if kind == "arithmetic":
+        writer.line("total = total + {}".format(rand.randint(1, 10)))
+    elif kind == "identity":
+        writer.line("total = {}(total)".format(scope.identity_name))
+    elif kind == "call":
+        writer.line("total = total + {}(total)".format(rand.choice(scope.functions)))
+    elif kind == "class":
+        writer.line("total = {}(total).increment({})".format(rand.choice(scope.classes), rand.randint(1, 10)))
+    else:
+        writer.line("total = {}(total).get()".format(rand.choice(scope.generic_classes)))
+
+
+def _generate_main(module):
+    writer = _SourceWriter()
+    writer.line("#!/usr/bin/env python")
+    writer.line()
+    writer.line("from {}.{} import {}".format(package_name, module.name, module.functions[0]))
+    writer.line()
+    writer.line("print({}(1))".format(module.functions[0]))
+    return writer.source()
+
+
+class _SourceWriter(object):
+    def __init__(self):
+        self._lines = []
+        self._indentation = 0
+    
+    def line(self, text=""):
+        if text:
+            self._lines.append("    " * self._indentation + text)
+        else:
+            self._lines.append("")
+    
+    def indented(self):
+        return _Indentation(self)
+    
+    def source(self):
+        return "\n".join(self._lines) + "\n"
+
+
+class _Indentation(object):
+    def __init__(self, writer):
+        self._writer = writer
+    
+    def __enter__(self):
+        self._writer._indentation += 1
+    
+    def __exit__(self, *args):
+        self._writer._indentation -= 1
+
+
+def _flatten(iterables):
+    for iterable in iterables:
+        for value in iterable:
+            yield value
+
+
+def _write_file(path, contents):
+    with open(path, "w") as target_file:
+        target_file.write(contents)
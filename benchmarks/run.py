@@ -0,0 +1,264 @@
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import tempfile
+
+import nope
+from nope import platforms, types, injection, parser, name_resolution, nodes
+from nope.identity_dict import NodeDict, NodeTable
+from nope.builtin_types import list_type
+from .generator import generate_program, generate_module_source, program_options, generate_binary_chain_source, generate_long_module_source
+
+
+_results_version = 1
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--output", default="benchmark-results.json")
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument("--backend", action="append", choices=platforms.names())
+    argument_parser.add_argument("--quick", action="store_true")
+    argument_parser.add_argument("--compare", metavar="BASELINE")
+    argument_parser.add_argument("--stress", action="store_true")
+    args = argument_parser.parse_args()
+    
+    backends = args.backend or sorted(platforms.names())
+    results = run_benchmarks(repeat=args.repeat, backends=backends, quick=args.quick, stress=args.stress, on_result=_print_result)
+    
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=4)
+    
+    if args.compare is not None:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print()
+        print_comparison(baseline, results)
+
+
+def run_benchmarks(repeat, backends, quick=False, stress=False, on_result=None):
+    if on_result is None:
+        on_result = lambda result: None
+    
+    results = []
+    
+    def record(benchmark, parameters, seconds=None, error=None):
+        result = {"benchmark": benchmark, "parameters": parameters}
+        if error is None:
+            result["seconds"] = seconds
+        else:
+            result["error"] = error
+        results.append(result)
+        on_result(result)
+    
+    for options in _program_options(quick):
+        _run_program_benchmarks(options, repeat, backends, record)
+    
+    for benchmark, sizes, create in _scaling_benchmarks:
+        for size in sizes[:2] if quick else sizes:
+            record(benchmark, {"size": size}, _time_per_call(create(size), repeat))
+    
+    if stress:
+        for benchmark, size, generate_source in _stress_benchmarks:
+            _run_stress_benchmark(benchmark, size, generate_source, repeat, record)
+    
+    return {
+        "version": _results_version,
+        "python": platform.python_version(),
+        "time": time.time(),
+        "results": results,
+    }
+
+
+def _program_options(quick):
+    # Vary each parameter in turn, keeping the others at their defaults
+    default_options = program_options()
+    yield default_options
+    
+    for name, values in _program_parameters:
+        for value in values[:1] if quick else values:
+            yield default_options._replace(**{name: value})
+
+
+_program_parameters = [
+    ("module_count", [40, 160]),
+    ("fan_out", [4, 16]),
+    ("class_density", [4, 16]),
+    ("generic_density", [4, 16]),
+    ("function_size", [100, 1000]),
+    ("nesting_depth", [4, 16]),
+]
+
+
+def _run_program_benchmarks(options, repeat, backends, record):
+    parameters = dict(options._asdict())
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source_dir = os.path.join(temp_dir, "source")
+        os.mkdir(source_dir)
+        generate_program(source_dir, options)
+        
+        record("check", parameters, _time(lambda: _check(source_dir), repeat))
+        
+        for backend in backends:
+            def compile_program():
+                output_dir = tempfile.mkdtemp(dir=temp_dir)
+                nope.compile(source_dir, output_dir, backend)
+            
+            try:
+                seconds = _time(compile_program, repeat)
+            except Exception as error:
+                # Some backends rely on external tools, such as mcs for dotnet
+                record("compile", dict(parameters, backend=backend), error=str(error))
+            else:
+                record("compile", dict(parameters, backend=backend), seconds)
+
+
+def _run_stress_benchmark(benchmark, size, generate_source, repeat, record):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "main.py")
+        with open(path, "w") as source_file:
+            source_file.write(generate_source(size))
+        
+        try:
+            seconds = _time(lambda: _check(path), repeat)
+        # RecursionError only exists on Python 3.5+, where it's a RuntimeError
+        except RuntimeError as error:
+            record(benchmark, {"size": size}, error="{}: {}".format(type(error).__name__, error))
+        else:
+            record(benchmark, {"size": size}, seconds)
+
+
+_stress_benchmarks = [
+    ("stress/binary_chain", 10000, generate_binary_chain_source),
+    ("stress/long_module", 50000, generate_long_module_source),
+]
+
+
+def _check(path):
+    result = nope.check(path)
+    if not result.is_valid:
+        raise result.error
+
+
+def _is_sub_type_of_union(size):
+    class_types = _class_types(size)
+    super_type = types.union(*class_types)
+    sub_type = types.union(*reversed(class_types))
+    return lambda: types.is_sub_type(super_type, sub_type)
+
+
+def _is_sub_type_of_nested_functions(size):
+    def nested_func_type():
+        func_type = types.int_type
+        for index in range(size):
+            func_type = types.func([func_type], types.union(func_type, types.none_type))
+        return func_type
+    
+    super_type = nested_func_type()
+    sub_type = nested_func_type()
+    return lambda: types.is_sub_type(super_type, sub_type)
+
+
+def _is_sub_type_of_nested_generics(size):
+    def nested_list_type():
+        list_of = types.int_type
+        for index in range(size):
+            list_of = list_type(list_of)
+        return list_of
+    
+    super_type = nested_list_type()
+    return lambda: types.is_sub_type(super_type, nested_list_type())
+
+
+def _common_super_type(size):
+    class_types = _class_types(size)
+    return lambda: types.common_super_type(class_types)
+
+
+def _name_resolution(size):
+    source = generate_module_source(program_options(function_size=size, nesting_depth=4))
+    module_node = parser.parse(source)
+    name_resolver = injection.create_injector().get(name_resolution.NameResolver)
+    return lambda: name_resolver.resolve(module_node)
+
+
+def _node_lookup(create_table, size):
+    references = [nodes.ref("x") for index in range(size)]
+    table = create_table([(reference, index) for index, reference in enumerate(references)])
+    
+    def lookup():
+        for reference in references:
+            table[reference]
+            table.get(reference)
+    
+    return lookup
+
+
+def _class_types(size):
+    return [types.class_type("Class{}".format(index)) for index in range(size)]
+
+
+_scaling_benchmarks = [
+    ("is_sub_type/union", [1, 10, 100], _is_sub_type_of_union),
+    ("is_sub_type/nested_functions", [1, 5, 10], _is_sub_type_of_nested_functions),
+    ("is_sub_type/nested_generics", [1, 10, 50], _is_sub_type_of_nested_generics),
+    ("common_super_type", [10, 100, 300], _common_super_type),
+    ("name_resolution", [100, 1000, 5000], _name_resolution),
+    ("node_lookup/node_table", [100, 1000, 5000], lambda size: _node_lookup(NodeTable.create, size)),
+    ("node_lookup/node_dict", [100, 1000, 5000], lambda size: _node_lookup(NodeDict, size)),
+]
+
+
+def _time(func, repeat):
+    return min(timeit.repeat(func, repeat=repeat, number=1))
+
+
+def _time_per_call(func, repeat):
+    # Call the function enough times to get a measurable time
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number=number) < 0.1:
+        number *= 10
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def print_comparison(baseline, results):
+    baseline_seconds = dict(
+        (_result_key(result), result["seconds"])
+        for result in baseline["results"]
+        if "seconds" in result
+    )
+    
+    for result in results["results"]:
+        key = _result_key(result)
+        if "seconds" in result and key in baseline_seconds:
+            print("{:8.2f}x  {}".format(result["seconds"] / baseline_seconds[key], _describe(result)))
+
+
+def _result_key(result):
+    return result["benchmark"], json.dumps(result["parameters"], sort_keys=True)
+
+
+def _print_result(result):
+    if "seconds" in result:
+        print("{:12.6f}s  {}".format(result["seconds"], _describe(result)))
+    else:
+        print("{:>12}   {}: {}".format("error", _describe(result), result["error"]))
+    sys.stdout.flush()
+
+
+def _describe(result):
+    parameters = " ".join(
+        "{}={}".format(name, value)
+        for name, value in sorted(result["parameters"].items())
+    )
+    return "{} {}".format(result["benchmark"], parameters)
+
+
+if __name__ == "__main__":
+    main()
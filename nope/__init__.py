@@ -2,11 +2,16 @@ import zuice
 
 from . import platforms, injection
 from .check import SourceChecker
+from .parallel import ParallelSourceChecker
 
 
-def check(path):
-    checker = injection.create_injector().get(SourceChecker)
-    return checker.check(path)
+def check(path, cache_dir=None, jobs=1, search_paths=None, emit_interface=False):
+    injector = injection.create_injector(cache_dir, search_paths)
+    
+    if jobs > 1:
+        return injector.get(ParallelSourceChecker).check(path, jobs=jobs, emit_interface=emit_interface)
+    else:
+        return injector.get(SourceChecker).check(path, emit_interface=emit_interface)
 
 
 def compile(source_path, destination_dir, platform):
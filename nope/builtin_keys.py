@@ -0,0 +1,82 @@
+from . import types, builtin_types, builtins
+
+
+# Builtin types live for as long as the process, so rather than being copied,
+# they're referred to by stable keys, such as when writing entries to the
+# check cache or writing interfaces.
+
+
+_objects = None
+
+
+def objects_by_key():
+    return _builtin_objects_by_key().copy()
+
+
+def object_for_key(key):
+    return _builtin_objects_by_key()[key]
+
+
+def _builtin_objects_by_key():
+    global _objects
+    
+    if _objects is None:
+        _objects = {}
+        
+        for module in [types, builtin_types]:
+            for name, value in vars(module).items():
+                if _is_builtin_type_value(value):
+                    _objects[("builtin", module.__name__, name)] = value
+        
+        for index, tuple_type in enumerate(builtin_types._tuple_types):
+            _objects[("builtin", "tuple", index)] = tuple_type
+        
+        for name, value in builtins._builtin_types.items():
+            _objects[("builtin", "builtins", name)] = value
+        
+        for name, module in builtins.builtin_modules.items():
+            _objects[("builtin", "module", name)] = module.type
+    
+    return _objects
+
+
+_keys = None
+
+
+def key_for_object(value):
+    return _builtin_keys_by_id().get(id(value))
+
+
+def is_builtin(value):
+    return id(value) in _builtin_keys_by_id()
+
+
+def _builtin_keys_by_id():
+    global _keys
+    
+    if _keys is None:
+        _keys = dict(
+            (id(value), key)
+            for key, value in _builtin_objects_by_key().items()
+        )
+    
+    return _keys
+
+
+def has_identity(value):
+    return (
+        types.is_class_type(value) or
+        types.is_structural_type(value) or
+        types.is_generic_type(value) or
+        types.is_generic_func(value) or
+        types.is_formal_parameter(value)
+    )
+
+
+def _is_builtin_type_value(value):
+    return (
+        has_identity(value) or
+        types.is_meta_type(value) or
+        types.is_func_type(value) or
+        types.is_instantiated_type(value)
+    )
@@ -2,52 +2,158 @@ import collections
 
 import zuice
 
-from . import loop_control, errors, paths
+from . import errors, paths, interfaces
+from .modules import InterfaceModule
 from .source import SourceTree
 
 
+CheckCacheDir = zuice.key("CheckCacheDir")
+
+
 class ModuleChecker(object):
-    def __init__(self, source_tree, type_checker):
+    def __init__(self, source_tree, type_checker, check_cache=None):
         self._source_tree = source_tree
         self._type_checker = type_checker
+        self._check_cache = check_cache
         self._check_results = {}
+        self._dependencies = {}
+        self._importers = {}
+        self._checking = []
+        self._body_checked_paths = None
+    
+    # Modules outside of the given paths, such as the modules they import
+    # from elsewhere, only have their interfaces checked: their function
+    # bodies aren't checked since only their types are needed.
+    def check_bodies_only_in(self, paths):
+        self._body_checked_paths = set(paths)
     
     def check(self, module):
-        self._check_result(module)
+        self._check_result(module, check_bodies=True)
     
-    def _check_result(self, module):
+    def _check_result(self, module, check_bodies):
         # TODO: circular import detection
         if module not in self._check_results:
-            self._check_results[module] = self._uncached_check(module)
-        return self._check_results[module]
+            self._check_results[module] = self._cached_check(module, check_bodies)
+        elif check_bodies and not self._check_results[module][2]:
+            self._replace_check_result(module, lambda: self._cached_check(module, check_bodies))
+        module_type, type_lookup, bodies_checked = self._check_results[module]
+        return module_type, type_lookup
+    
+    def _should_check_bodies(self, module):
+        return self._body_checked_paths is None or module.path in self._body_checked_paths
     
     def type_of_module(self, module):
-        module_type, type_lookup = self._check_result(module)
+        if isinstance(module, InterfaceModule):
+            # Interfaces have already been checked, so only need recording as
+            # dependencies of the modules that import them
+            module_type = module.type
+            self._dependencies[module] = set(module.dependencies)
+        else:
+            module_type, type_lookup = self._check_result(module, self._should_check_bodies(module))
+        
+        if self._checking:
+            importer = self._checking[-1]
+            self._importers.setdefault(module.path, set()).add(importer.path)
+            dependencies = self._dependencies[importer]
+            dependencies.add(module)
+            dependencies.update(self._dependencies[module])
+        
         return module_type
     
+    def dependencies(self, module):
+        return self._dependencies.get(module, set())
+    
+    def invalidate(self, path):
+        invalidated_paths = set()
+        paths_to_invalidate = [path]
+        
+        while paths_to_invalidate:
+            path = paths_to_invalidate.pop()
+            if path not in invalidated_paths:
+                invalidated_paths.add(path)
+                paths_to_invalidate.extend(self._importers.pop(path, []))
+        
+        for module in list(self._check_results):
+            if module.path in invalidated_paths:
+                del self._check_results[module]
+        
+        return invalidated_paths
+    
     def type_lookup(self, module):
-        module_type, type_lookup = self._check_result(module) 
+        module_type, type_lookup = self._check_result(module, check_bodies=True)
+        if type_lookup is None:
+            # Modules loaded from the check cache have no type lookup
+            self._replace_check_result(module, lambda: self._uncached_check(module, check_bodies=True))
+            module_type, type_lookup, bodies_checked = self._check_results[module]
         return type_lookup
     
-    def _uncached_check(self, module):
-        loop_control.check_loop_control(module.node, in_loop=False)
-        return self._type_checker.check_module(module, self)
+    # Checking a module again creates new types for the classes it defines,
+    # so modules that have already been checked against the old types are
+    # invalidated, and checked again when they're next needed
+    def _replace_check_result(self, module, check):
+        self.invalidate(module.path)
+        self._check_results[module] = check()
+    
+    def _cached_check(self, module, check_bodies):
+        if self._check_cache is None:
+            return self._uncached_check(module, check_bodies)
+        
+        cached = self._check_cache.load(module.path, self._type_of_module_path, bodies_checked=check_bodies)
+        if cached is None:
+            module_type, type_lookup, bodies_checked = self._uncached_check(module, check_bodies)
+            self._check_cache.save(
+                module.path,
+                module_type,
+                [dependency.path for dependency in self._dependencies[module]],
+                bodies_checked=bodies_checked,
+            )
+            return module_type, type_lookup, bodies_checked
+        else:
+            module_type, dependency_paths, bodies_checked = cached
+            self._dependencies[module] = set(map(self._module_at, dependency_paths))
+            for dependency_path in dependency_paths:
+                self._importers.setdefault(dependency_path, set()).add(module.path)
+            return module_type, None, bodies_checked
+    
+    def _type_of_module_path(self, path):
+        module = self._module_at(path)
+        if isinstance(module, InterfaceModule):
+            return module.type
+        
+        module_type, type_lookup = self._check_result(module, self._should_check_bodies(module))
+        return module_type
+    
+    def _module_at(self, path):
+        if interfaces.is_interface_path(path):
+            return interfaces.load(path)
+        else:
+            return self._source_tree.module(path)
+    
+    def _uncached_check(self, module, check_bodies):
+        self._dependencies[module] = set()
+        self._checking.append(module)
+        try:
+            module_type, type_lookup = self._type_checker.check_module(module, self, check_bodies=check_bodies)
+            return module_type, type_lookup, check_bodies
+        finally:
+            self._checking.pop()
 
 
 class SourceChecker(zuice.Base):
     _source_tree = zuice.dependency(SourceTree)
     _module_checker = zuice.dependency(ModuleChecker)
     
-    def check(self, path):
-        if isinstance(path, str):
-            roots = [path]
-        else:
-            roots = path
+    def check(self, path, emit_interface=False):
+        checked_paths = source_paths(path)
+        self._module_checker.check_bodies_only_in(checked_paths)
         
         try:
-            for source_path in _source_paths(roots):
+            for source_path in checked_paths:
                 module = self._source_tree.module(source_path)
                 self._module_checker.check(module)
+            
+            if emit_interface:
+                interfaces.write_interfaces(checked_paths, self._source_tree, self._module_checker)
         except (errors.TypeCheckError, SyntaxError) as error:
             return Result(is_valid=False, error=error, value=None)
         
@@ -57,9 +163,16 @@ class SourceChecker(zuice.Base):
 Result = collections.namedtuple("Result", ["is_valid", "error", "value"])
 
 
-def _source_paths(roots):
+def source_paths(path):
+    if isinstance(path, str):
+        roots = [path]
+    else:
+        roots = path
+    
+    # Interfaces are written next to the source, but aren't source themselves
     return set(
         path
         for root in roots
         for path in paths.find_files(root)
+        if not interfaces.is_interface_path(path)
     )
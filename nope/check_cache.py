@@ -0,0 +1,301 @@
+import os
+import io
+import sys
+import pickle
+import hashlib
+
+from . import types, builtin_keys, interfaces, files
+
+
+_format_version = 3
+
+
+# Each entry records the hash of the module's source along with the hashes of
+# every module it transitively imports, so an entry is only used if none of
+# those files have changed since it was written. Entries also record the
+# search paths, and which of the paths that the module's imports could have
+# resolved to existed, so that an entry isn't used if an import would now
+# resolve to a different module, such as a new module shadowing an import.
+#
+# Types have identity, so types exported by other modules are stored as
+# references to those modules rather than copies, as are types loaded from
+# interfaces. If a module's type refers to a type owned by another module that
+# can't be referenced in this way, the module isn't cached.
+#
+# Entries also record whether the module's function bodies were checked, so
+# that an entry written when only the module's interface was needed isn't used
+# when the whole module needs checking.
+class FileSystemCheckCache(object):
+    def __init__(self, cache_dir, resolution_cache):
+        self._cache_dir = cache_dir
+        self._resolution_cache = resolution_cache
+        self._hashes = {}
+        self._exports = {}
+        self._exports_by_key = {}
+        self._owners = {}
+    
+    def load(self, path, type_of_dependency, bodies_checked=True):
+        if path is None:
+            return None
+        
+        entry = _read_entry(self._cache_dir, path)
+        if entry is None or not self._is_up_to_date(path, entry):
+            return None
+        
+        if bodies_checked and not entry["bodies_checked"]:
+            return None
+        
+        dependency_paths = [
+            dependency_path
+            for dependency_path, dependency_hash in entry["dependencies"]
+        ]
+        
+        for dependency_path in dependency_paths:
+            type_of_dependency(dependency_path)
+        
+        objects = builtin_keys.objects_by_key()
+        objects.update(self._exports_by_key)
+        try:
+            module_type = _TypeUnpickler(io.BytesIO(entry["type"]), objects).load()
+        except Exception:
+            return None
+        
+        self._add_module(path, module_type)
+        return module_type, dependency_paths, entry["bodies_checked"]
+    
+    def save(self, path, module_type, dependency_paths, bodies_checked=True):
+        self._add_module(path, module_type)
+        
+        if path is None:
+            return
+        
+        source_hash = self._hash(path)
+        dependencies = [
+            (dependency_path, self._hash(dependency_path))
+            for dependency_path in sorted(dependency_paths)
+        ]
+        if source_hash is None or any(dependency_hash is None for _, dependency_hash in dependencies):
+            return
+        
+        output = io.BytesIO()
+        try:
+            _TypePickler(output, self, path).dump(module_type)
+        except (_UncacheableError, pickle.PicklingError, AttributeError, TypeError):
+            return
+        
+        entry = {
+            "version": _format_version,
+            "checker": _checker_fingerprint(),
+            "hash": source_hash,
+            "dependencies": dependencies,
+            "search_paths": self._resolution_cache.search_paths(),
+            "imports": self._resolution_cache.import_candidates(path),
+            "bodies_checked": bodies_checked,
+            "type": output.getvalue(),
+        }
+        _write_entry(self._cache_dir, path, entry)
+    
+    def _add_module(self, path, module_type):
+        for attr in module_type.attrs:
+            self._add_export(attr.type, ("export", path, attr.name, False))
+            if types.is_meta_type(attr.type):
+                self._add_export(attr.type.type, ("export", path, attr.name, True))
+        
+        try:
+            _OwnershipPickler(self, path).dump(module_type)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            pass
+    
+    # Only types with identity are referred to by export. Other types, such as
+    # functions, are shared between modules whenever they're equal, so they're
+    # written in full rather than as a reference to whichever module
+    # happened to export them first.
+    def _add_export(self, value, key):
+        if not (builtin_keys.has_identity(value) or types.is_meta_type(value)):
+            return
+        
+        if id(value) not in self._exports and not builtin_keys.is_builtin(value):
+            self._exports[id(value)] = (value, key)
+            self._exports_by_key[key] = value
+    
+    def _is_up_to_date(self, path, entry):
+        return (
+            entry.get("version") == _format_version and
+            entry.get("checker") == _checker_fingerprint() and
+            entry.get("hash") == self._hash(path) and
+            all(
+                self._hash(dependency_path) == dependency_hash
+                for dependency_path, dependency_hash in entry.get("dependencies", [])
+            ) and
+            entry.get("search_paths") == self._resolution_cache.search_paths() and
+            all(
+                self._resolution_cache.is_file(candidate_path) == is_file
+                for candidate_path, is_file in entry.get("imports", [])
+            )
+        )
+    
+    def _hash(self, path):
+        if path not in self._hashes:
+            self._hashes[path] = files.file_hash(path)
+        
+        return self._hashes[path]
+
+
+# Parse entries hold the module's tree after transformation. An entry is only
+# used if the file's size, modification time and hash all match the snapshot
+# of the file that was parsed to produce it.
+class FileSystemParseCache(object):
+    def __init__(self, cache_dir):
+        self._cache_dir = os.path.join(cache_dir, "parse")
+    
+    def load(self, path, snapshot):
+        entry = _read_entry(self._cache_dir, path)
+        if entry is None or entry.get("version") != _format_version or entry.get("checker") != _checker_fingerprint():
+            return None
+        
+        if entry.get("stat") != snapshot.stat or entry.get("hash") != snapshot.hash:
+            return None
+        
+        try:
+            return pickle.loads(entry["tree"])
+        except Exception:
+            return None
+    
+    def save(self, path, snapshot, module_node):
+        try:
+            tree = pickle.dumps(module_node, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError, RuntimeError):
+            return
+        
+        entry = {
+            "version": _format_version,
+            "checker": _checker_fingerprint(),
+            "stat": snapshot.stat,
+            "hash": snapshot.hash,
+            "tree": tree,
+        }
+        _write_entry(self._cache_dir, path, entry)
+
+
+def _entry_path(cache_dir, path):
+    key = hashlib.sha1(os.path.abspath(path).encode("utf8")).hexdigest()
+    return os.path.join(cache_dir, key)
+
+
+def _read_entry(cache_dir, path):
+    try:
+        with open(_entry_path(cache_dir, path), "rb") as entry_file:
+            return pickle.load(entry_file)
+    except Exception:
+        # Missing, corrupt and incompatible entries are all cache misses
+        return None
+
+
+def _write_entry(cache_dir, path, entry):
+    files.write_atomically(
+        _entry_path(cache_dir, path),
+        lambda entry_file: pickle.dump(entry, entry_file, protocol=pickle.HIGHEST_PROTOCOL),
+        binary=True,
+    )
+
+
+class _UncacheableError(Exception):
+    pass
+
+
+class _TypePickler(pickle.Pickler):
+    def __init__(self, output, cache, path):
+        super().__init__(output, protocol=pickle.HIGHEST_PROTOCOL)
+        self._cache = cache
+        self._path = path
+    
+    def persistent_id(self, value):
+        pid = self._reference(value)
+        if pid is not None:
+            return pid
+        
+        owner = self._cache._owners.get(id(value))
+        if owner is not None and owner[1] != self._path:
+            raise _UncacheableError()
+        
+        return None
+    
+    def _reference(self, value):
+        builtin_key = builtin_keys.key_for_object(value)
+        if builtin_key is not None:
+            return builtin_key
+        
+        interface_reference = interfaces.reference(value)
+        if interface_reference is not None:
+            return ("interface", ) + interface_reference
+        
+        export = self._cache._exports.get(id(value))
+        if export is not None and export[1][1] != self._path:
+            return export[1]
+        
+        if types.is_instantiated_type(value):
+            return ("instantiate", value.generic_type, value.type_params)
+        
+        return None
+
+
+class _OwnershipPickler(_TypePickler):
+    # Walks the types reachable from a module's type, recording the module as
+    # the owner of any types with identity that aren't already owned.
+    
+    def __init__(self, cache, path):
+        super().__init__(_NullFile(), cache, path)
+    
+    def persistent_id(self, value):
+        pid = self._reference(value)
+        if pid is not None:
+            return pid
+        
+        if builtin_keys.has_identity(value):
+            value, owner_path = self._cache._owners.setdefault(id(value), (value, self._path))
+            if owner_path != self._path or types.is_generic_type(value) or types.is_generic_func(value):
+                return ("opaque", )
+        
+        return None
+
+
+class _NullFile(object):
+    def write(self, data):
+        pass
+
+
+class _TypeUnpickler(pickle.Unpickler):
+    def __init__(self, input_file, objects):
+        super().__init__(input_file)
+        self._objects = objects
+    
+    def persistent_load(self, pid):
+        if pid[0] == "instantiate":
+            _, generic_type, type_params = pid
+            return generic_type.instantiate(type_params)
+        elif pid[0] == "interface":
+            _, path, index = pid
+            return interfaces.load_reference(path, index)
+        else:
+            return self._objects[pid]
+
+
+_fingerprint = None
+
+
+def _checker_fingerprint():
+    # Entries written by a different version of nope can't be trusted
+    global _fingerprint
+    
+    if _fingerprint is None:
+        fingerprint = hashlib.sha1(sys.version.encode("utf8"))
+        nope_dir = os.path.dirname(os.path.abspath(__file__))
+        for root, dirnames, filenames in os.walk(nope_dir):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith(".py"):
+                    stat = os.stat(os.path.join(root, filename))
+                    fingerprint.update("{}:{}:{};".format(filename, stat.st_size, stat.st_mtime).encode("utf8"))
+        _fingerprint = fingerprint.hexdigest()
+    
+    return _fingerprint
@@ -206,11 +206,23 @@ class Desugarrer(zuice.Base):
         ])
     
     def _if(self, node):
-        return cc.if_(
-            self._condition(node.condition),
-            self.desugar(node.true_body),
-            self.desugar(node.false_body),
-        )
+        # Each elif is nested in the false body of the previous if, so long
+        # if/elif ladders are desugared in a loop rather than recursively
+        ladder = [node]
+        while len(ladder[-1].false_body) == 1 and isinstance(ladder[-1].false_body[0], nodes.IfElse):
+            ladder.append(ladder[-1].false_body[0])
+        
+        branches = [
+            (self._condition(if_node.condition), self.desugar(if_node.true_body))
+            for if_node in ladder
+        ]
+        false_body = self.desugar(ladder[-1].false_body)
+        
+        for condition, true_body in reversed(branches[1:]):
+            false_body = [cc.if_(condition, true_body, false_body)]
+        
+        condition, true_body = branches[0]
+        return cc.if_(condition, true_body, false_body)
     
     def _while(self, loop):
         condition = self._condition(loop.condition)
@@ -406,7 +418,23 @@ class Desugarrer(zuice.Base):
             raise Exception("Unhandled case")
     
     def _binary_operation(self, node):
-        left = self.desugar(node.left)
+        # Long chains such as a + b + c + ... nest on the left, so the left
+        # operands are desugared innermost first in a loop rather than
+        # recursively. Boolean operators desugar their left operand twice, so
+        # chains stop at them.
+        operations = []
+        left = node.left
+        while isinstance(left, nodes.BinaryOperation) and left.operator not in ["bool_and", "bool_or"]:
+            operations.append(left)
+            left = left.left
+        
+        cc_left = self.desugar(left)
+        for operation in reversed(operations):
+            cc_left = self._desugar_operation(operation, cc_left)
+        
+        return self._desugar_operation(node, cc_left)
+    
+    def _desugar_operation(self, node, left):
         right = self.desugar(node.right)
         if node.operator == "is":
             return cc.is_(left, right)
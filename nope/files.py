@@ -1,5 +1,7 @@
 import os
 import shutil
+import hashlib
+import collections
 
 from .walk import walk_tree
 
@@ -23,3 +25,49 @@ def mkdir_p(path):
 
 def replace_extension(filename, new_extension):
     return filename[:filename.rindex(".")] + "." + new_extension
+
+
+# Other processes may be reading the file at the same time, so the contents are
+# written to a temporary file that then replaces the file in one step
+def write_atomically(path, write, binary=False):
+    mkdir_p(os.path.dirname(os.path.abspath(path)))
+    temporary_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary_path, "wb" if binary else "w") as output_file:
+        write(output_file)
+    os.replace(temporary_path, path)
+
+
+def file_stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+# The contents of a file along with its size and modification time. The file is
+# statted before it's read, so a change made while reading leaves the stat out
+# of date rather than matching the new contents.
+FileSnapshot = collections.namedtuple("FileSnapshot", ["stat", "contents", "hash"])
+
+
+def read_snapshot(path):
+    stat = file_stat(path)
+    if stat is None:
+        return None
+    
+    try:
+        with open(path, "rb") as source_file:
+            contents = source_file.read()
+    except IOError:
+        return None
+    
+    return FileSnapshot(stat, contents, hashlib.sha1(contents).hexdigest())
+
+
+def file_hash(path):
+    try:
+        with open(path, "rb") as source_file:
+            return hashlib.sha1(source_file.read()).hexdigest()
+    except IOError:
+        return None
@@ -62,3 +62,53 @@ class ComputedNodeDict(object):
             self._values[key] = self._generate_value(key)
         
         return self._values[key]
+    
+    def __contains__(self, key):
+        return key in self._values
+    
+    def __setitem__(self, key, value):
+        self._values[key] = value
+
+
+# A NodeDict that stores values directly against node IDs. NodeDict calls a
+# key function and stores (key, value) pairs, which makes each lookup
+# noticeably slower, and lookups are the hot path of type checking. See the
+# node_lookup benchmarks.
+class NodeTable(object):
+    @staticmethod
+    def create(values):
+        if isinstance(values, NodeTable):
+            return values
+        else:
+            table = NodeTable()
+            for key, value in values:
+                table[key] = value
+            return table
+    
+    def __init__(self):
+        self._values = {}
+        self._keys = []
+    
+    def __setitem__(self, key, value):
+        node_id = key.node_id
+        if node_id not in self._values:
+            self._keys.append(key)
+        self._values[node_id] = value
+    
+    def __getitem__(self, key):
+        try:
+            return self._values[key.node_id]
+        except KeyError:
+            raise KeyError("node_id == {}".format(key.node_id))
+    
+    def __contains__(self, key):
+        return key.node_id in self._values
+    
+    def get(self, key, default=None):
+        return self._values.get(key.node_id, default)
+    
+    def keys(self):
+        return list(self._keys)
+    
+    def __bool__(self):
+        return bool(self._keys)
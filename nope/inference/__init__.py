@@ -1,19 +1,27 @@
 import zuice
 
-from .. import types, name_declaration, name_resolution, name_binding, builtins, module_resolution, modules
+from .. import types, name_declaration, name_resolution, name_binding, loop_control, builtins, module_resolution, modules, profiling
 from .expressions import ExpressionTypeInferer
 from .statements import StatementTypeChecker
-from ..identity_dict import NodeDict
+from ..identity_dict import NodeTable
 from .context import Context
 
 
+_CheckBodies = zuice.key("CheckBodies")
+
+
 class TypeChecker(zuice.Base):
     _injector = zuice.dependency(zuice.Injector)
     
-    def check_module(self, module, module_types):
+    # When check_bodies is false, only the module's interface is checked:
+    # function bodies are skipped, since the module's type is found from the
+    # signatures of its functions, the attributes of its classes and the rest
+    # of the module's statements. The returned type lookup is then None.
+    def check_module(self, module, module_types, check_bodies=True):
         module_checker = self._injector.get(_TypeCheckerForModule, {
             modules.Module: module,
             modules.ModuleTypes: module_types,
+            _CheckBodies: check_bodies,
         })
         return module_checker.check()
 
@@ -25,17 +33,19 @@ class _TypeCheckerForModule(zuice.Base):
     _module_exports = zuice.dependency(modules.ModuleExports)
     _module = zuice.dependency(modules.Module)
     _module_types = zuice.dependency(modules.ModuleTypes)
+    _check_bodies = zuice.dependency(_CheckBodies)
     
     @zuice.init
     def init(self):
-        self._type_lookup = NodeDict()
+        self._type_lookup = NodeTable()
         self._expression_type_inferer = ExpressionTypeInferer(self._type_lookup)
         self._statement_type_checker = StatementTypeChecker(
             self._declaration_finder,
             self._expression_type_inferer,
             self._module_resolver,
             self._module_types,
-            self._module
+            self._module,
+            check_bodies=self._check_bodies,
         )
     
     def type_lookup(self):
@@ -48,25 +58,34 @@ class _TypeCheckerForModule(zuice.Base):
         self._statement_type_checker.update_context(statement, context)
 
     def check(self):
+        with profiling.phase("inference", self._module.path):
+            return self._check()
+    
+    def _check(self):
         module = self._module
-        references = self._name_resolver.resolve(module.node)
+        references = self._name_resolver.resolve(module.node, passes=[
+            loop_control.loop_control_pass(),
+        ])
     
         context = module_context(references)
         self.update_context(module.node.body, context)
         context.update_deferred()
         
-        for reference in references:
-            self._type_lookup[reference] = context.lookup(reference)
+        if self._check_bodies:
+            for reference in references:
+                self._type_lookup[reference] = context.lookup(reference)
         
-        exported_declarations = self._module_exports.declarations(module.node)
+        exported_declarations = self._module_exports.declarations(module)
         
         builtin_is_definitely_bound = builtins.module_bindings(references)
-        bindings = name_binding.check_bindings(
-            module.node,
-            references=references,
-            type_lookup=self.type_lookup(),
-            is_definitely_bound=builtin_is_definitely_bound,
-        )
+        with profiling.phase("name_binding"):
+            bindings = name_binding.check_bindings(
+                module.node,
+                references=references,
+                type_lookup=self.type_lookup(),
+                is_definitely_bound=builtin_is_definitely_bound,
+                check_bodies=self._check_bodies,
+            )
         
         module_type = types.module(module.path, [
             types.attr(declaration.name, context.lookup_declaration(declaration))
@@ -76,7 +95,10 @@ class _TypeCheckerForModule(zuice.Base):
         
         self._type_lookup[module.node] = module_type
         
-        return module_type, self.type_lookup()
+        if self._check_bodies:
+            return module_type, self.type_lookup()
+        else:
+            return module_type, None
         
 
 def module_context(references):
@@ -2,12 +2,15 @@ from .. import errors, types
 from ..identity_dict import NodeDict
 
 
+_unbound = object()
+
+
 class Context(object):
     @staticmethod
     def create(references, declaration_types):
         return Context(
             references=references,
-            declaration_types=declaration_types.copy(),
+            declaration_types=_DeclarationTypes.create(references, declaration_types),
             deferred=NodeDict(),
             return_type=None,
             is_module_scope=False)
@@ -20,26 +23,26 @@ class Context(object):
         self._deferred = deferred
     
     def update_type(self, node, type_):
-        declaration = self._references.referenced_declaration(node)
-        self._update_declaration_type(node, declaration, type_)
-    
-    def _update_declaration_type(self, node, declaration, type_):
-        existing_type = self._declaration_types.get(declaration)
+        slot = self._references.referenced_slot(node)
+        existing_type = self._declaration_types.get(slot.number)
         if existing_type is None:
-            self._declaration_types[declaration] = type_
+            self._declaration_types[slot.number] = type_
         elif not types.is_sub_type(existing_type, type_):
             raise errors.UnexpectedTargetTypeError(node, value_type=type_, target_type=existing_type)
     
     def lookup(self, node, allow_unbound=False):
-        declaration = self._references.referenced_declaration(node)
+        slot = self._references.referenced_slot(node)
+        type_ = self._declaration_types.get(slot.number, _unbound)
         
-        if declaration in self._declaration_types or allow_unbound:
-            return self._declaration_types.get(declaration)
+        if type_ is not _unbound:
+            return type_
+        elif allow_unbound:
+            return None
         else:
             raise errors.UnboundLocalError(node, node.name)
     
     def lookup_declaration(self, declaration):
-        return self._declaration_types[declaration]
+        return self._declaration_types[self._references.declaration_slot(declaration).number]
     
     def referenced_declaration(self, node):
         return self._references.referenced_declaration(node)
@@ -73,12 +76,12 @@ class Context(object):
     
     def instantiate_types(self, types):
         override_declaration_types = dict(
-            (self.referenced_declaration(node), type_)
+            (self._references.referenced_slot(node).number, type_)
             for node, type_ in types
         )
         return Context(
             self._references,
-            _OverrideDict(self._declaration_types, dict(override_declaration_types)),
+            self._declaration_types.override(override_declaration_types),
             self._deferred,
             return_type=self.return_type,
             is_module_scope=self.is_module_scope,
@@ -101,19 +104,55 @@ class Context(object):
                 update()
 
 
-class _OverrideDict(object):
-    def __init__(self, values, overrides):
+# Declaration types are stored in an array indexed by the slot number that
+# name resolution gave each declaration. Only the builtins that the module
+# refers to have slots, so the types of just those builtins are copied into
+# the array. Overrides of the usual types of declarations, such as the type
+# parameters of a generic type while it's instantiated, are looked up first.
+# Nested overrides are flattened into a single layer, so lookups don't get
+# slower the more deeply instantiations are nested. The array grows if
+# declarations are given slots after the types are created.
+class _DeclarationTypes(object):
+    @staticmethod
+    def create(references, builtins):
+        values = [_unbound] * references.slot_count()
+        for declaration, slot in references.builtin_slots():
+            values[slot.number] = builtins.get(declaration, _unbound)
+        return _DeclarationTypes({}, values)
+    
+    def __init__(self, overrides, values):
+        self._overrides = overrides
         self._values = values
-        self._overrides = overrides.copy()
-    
-    def __contains__(self, key):
-        return key in self._values or key in self._overrides
-    
-    def get(self, key):
-        return self._overrides.get(key, self._values.get(key))
     
-    def __getitem__(self, key):
-        if key in self._overrides:
-            return self._overrides[key]
-        return self._values[key]
+    def override(self, overrides):
+        if self._overrides:
+            combined_overrides = self._overrides.copy()
+            combined_overrides.update(overrides)
+        else:
+            combined_overrides = overrides
+        return _DeclarationTypes(combined_overrides, self._values)
     
+    def get(self, number, default=None):
+        if self._overrides and number in self._overrides:
+            return self._overrides[number]
+        
+        if number < len(self._values):
+            value = self._values[number]
+        else:
+            value = _unbound
+        
+        if value is _unbound:
+            return default
+        else:
+            return value
+    
+    def __getitem__(self, number):
+        value = self.get(number, _unbound)
+        if value is _unbound:
+            raise KeyError(number)
+        return value
+    
+    def __setitem__(self, number, value):
+        if number >= len(self._values):
+            self._values.extend([_unbound] * (number + 1 - len(self._values)))
+        self._values[number] = value
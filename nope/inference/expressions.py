@@ -1,4 +1,5 @@
 from .. import nodes, types, errors
+from ..identity_dict import NodeDict
 from . import ephemeral
 from .assignment import Assignment
 
@@ -6,6 +7,7 @@ from .assignment import Assignment
 class ExpressionTypeInferer(object):
     def __init__(self, type_lookup):
         self._type_lookup = type_lookup
+        self._left_operand_types = NodeDict()
         
         self._inferers = {
             nodes.NoneLiteral: self._infer_none,
@@ -30,7 +32,10 @@ class ExpressionTypeInferer(object):
         }
     
     def infer(self, expression, context, hint=None, required_type=None):
-        expression_type = self._inferers[type(expression)](expression, context, required_type or hint)
+        if self._left_operand_types and expression in self._left_operand_types:
+            expression_type = self._left_operand_types.pop(expression)
+        else:
+            expression_type = self._inferers[type(expression)](expression, context, required_type or hint)
         
         if required_type is not None and not types.is_sub_type(required_type, expression_type):
             raise errors.UnexpectedValueTypeError(expression,
@@ -287,6 +292,21 @@ class ExpressionTypeInferer(object):
         
 
     def _infer_binary_operation(self, node, context, hint):
+        # Long chains such as a + b + c + ... nest on the left, so the types
+        # of the left operands are found innermost first in a loop rather
+        # than each operation recursively inferring its left operand
+        operations = []
+        left = node.left
+        while isinstance(left, nodes.BinaryOperation):
+            operations.append(left)
+            left = left.left
+        
+        for operation in reversed(operations):
+            self._left_operand_types[operation] = self._infer_operation(operation, context)
+        
+        return self._infer_operation(node, context)
+    
+    def _infer_operation(self, node, context):
         if node.operator in ["bool_and", "bool_or"]:
             return types.common_super_type([
                 self.infer(node.left, context),
@@ -2,17 +2,19 @@ import os
 import functools
 
 from .. import nodes, types, returns, errors, builtins
+from ..modules import BuiltinModule
 from . import ephemeral
 from .assignment import Assignment
 from .classes import ClassDefinitionTypeChecker
 
 
 class StatementTypeChecker(object):
-    def __init__(self, declaration_finder, expression_type_inferer, module_resolver, module_types, module):
+    def __init__(self, declaration_finder, expression_type_inferer, module_resolver, module_types, module, check_bodies=True):
         self._expression_type_inferer = expression_type_inferer
         self._module_resolver = module_resolver
         self._module_types = module_types
         self._module = module
+        self._check_bodies = check_bodies
         
         class_definition_type_checker = ClassDefinitionTypeChecker(
             self,
@@ -88,10 +90,11 @@ class StatementTypeChecker(object):
     def _check_function_def(self, node, context):
         func_type = self.infer_function_def(node, context)
         context.update_type(node, func_type)
-        context.add_deferred(
-            node,
-            functools.partial(self._check_function_def_body, node, func_type, context)
-        )
+        if self._check_bodies:
+            context.add_deferred(
+                node,
+                functools.partial(self._check_function_def_body, node, func_type, context)
+            )
     
     def _check_function_def_body(self, node, func_type, context):
         return_type = func_type.return_type
@@ -181,9 +184,16 @@ class StatementTypeChecker(object):
     
     
     def _check_if_else(self, node, context):
-        self._infer(node.condition, context)
-        self._check_list(node.true_body, context)
-        self._check_list(node.false_body, context)
+        # Each elif is nested in the false body of the previous if, so long
+        # if/elif ladders are checked in a loop rather than recursively
+        while True:
+            self._infer(node.condition, context)
+            self._check_list(node.true_body, context)
+            if len(node.false_body) == 1 and isinstance(node.false_body[0], nodes.IfElse):
+                node = node.false_body[0]
+            else:
+                self._check_list(node.false_body, context)
+                return
 
     def _check_while_loop(self, node, context):
         self._infer(node.condition, context)
@@ -318,7 +328,7 @@ class StatementTypeChecker(object):
             error.node = node
             raise error
         
-        if hasattr(resolved_import.module, "type"):
+        if isinstance(resolved_import.module, BuiltinModule):
             module_type = resolved_import.module.type
         else:
             module_type = self._module_types.type_of_module(resolved_import.module)
@@ -1,21 +1,23 @@
 import zuice
 
 from .name_declaration import DeclarationFinder
-from .check import ModuleChecker
-from .source import SourceTree, CachedSourceTree, TransformingSourceTree, FileSystemSourceTree
-from . import environment, builtins, inference, types, transformers
-from .modules import Module
+from .check import ModuleChecker, CheckCacheDir
+from .check_cache import FileSystemCheckCache, FileSystemParseCache
+from .source import SourceTree, CachedSourceTree, TransformingSourceTree, FileSystemSourceTree, ParseCachingSourceTree
+from . import environment, builtins, inference, types, transformers, profiling
+from .modules import Module, ModuleExports
 from .desugar import Desugarrer
-from .module_resolution import ModuleSearchPaths
+from .module_resolution import ModuleSearchPaths, ModuleResolutionCache
 
 
-def create_bindings():
+def create_bindings(cache_dir=None, search_paths=None):
     # TODO: set default lifetime of singleton
     
     declaration_finder = DeclarationFinder()
     
     bindings = zuice.Bindings()
     bindings.bind(DeclarationFinder).to_instance(declaration_finder)
+    bindings.bind(ModuleExports).to_instance(ModuleExports(declaration_finder))
     bindings.bind(SourceTree).to_provider(_source_tree_provider).singleton()
     bindings.bind(environment.Builtins).to_instance(builtins)
     bindings.bind(environment.InitialDeclarations).to_provider(lambda injector:
@@ -25,39 +27,50 @@ def create_bindings():
         injector.get(environment.Builtins).builtin_modules
     )
     bindings.bind(ModuleChecker).to_provider(lambda injector:
-        ModuleChecker(injector.get(SourceTree), injector.get(inference.TypeChecker))
+        ModuleChecker(
+            injector.get(SourceTree),
+            injector.get(inference.TypeChecker),
+            _check_cache(injector.get(CheckCacheDir), injector.get(ModuleResolutionCache)),
+        )
     )
+    bindings.bind(CheckCacheDir).to_instance(cache_dir)
     bindings.bind(types.TypeLookup).to_provider(_type_lookup_provider)
-    bindings.bind(ModuleSearchPaths).to_instance([])
+    bindings.bind(ModuleSearchPaths).to_instance(search_paths or [])
+    bindings.bind(ModuleResolutionCache).to_provider(lambda injector:
+        ModuleResolutionCache(injector.get(ModuleSearchPaths))
+    ).singleton()
+    bindings.bind(transformers.ClassBuilders).to_instance(transformers.default_class_builders)
     
     return bindings
 
 
+def _check_cache(cache_dir, resolution_cache):
+    if cache_dir is None:
+        return None
+    else:
+        return FileSystemCheckCache(cache_dir, resolution_cache)
+
+
 def _type_lookup_provider(injector):
     return injector.get(ModuleChecker).type_lookup(injector.get(Module))
 
 
-def create_injector():
-    bindings = create_bindings()
+def create_injector(cache_dir=None, search_paths=None):
+    bindings = create_bindings(cache_dir, search_paths)
     return zuice.Injector(bindings)
 
 
 def _source_tree_provider(injector):
-    return CachedSourceTree(
-        TransformingSourceTree(
-            TransformingSourceTree(
-                FileSystemSourceTree(),
-                create_injector().get(transformers.ClassBuilderTransform, {
-                    transformers.ModuleName: "collections",
-                    transformers.FuncName: "namedtuple",
-                })
-            ),
-            create_injector().get(transformers.ClassBuilderTransform, {
-                transformers.ModuleName: "dodge",
-                transformers.FuncName: "data_class",
-            })
-        )
+    source_tree = TransformingSourceTree(
+        FileSystemSourceTree(),
+        create_injector().get(transformers.ClassBuilderTransform)
     )
+    
+    cache_dir = injector.get(CheckCacheDir)
+    if cache_dir is not None:
+        source_tree = ParseCachingSourceTree(source_tree, FileSystemParseCache(cache_dir))
+    
+    return CachedSourceTree(source_tree)
 
 
 class CouscousTree(zuice.Base):
@@ -69,5 +82,6 @@ class CouscousTree(zuice.Base):
         if module is None:
             return None
         else:
-            desugarrer = self._desugarrer_factory({Module: module})
-            return desugarrer.desugar(module)
+            with profiling.phase("desugar", path):
+                desugarrer = self._desugarrer_factory({Module: module})
+                return desugarrer.desugar(module)
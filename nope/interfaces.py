@@ -0,0 +1,504 @@
+import os
+import json
+import hashlib
+import collections
+
+from . import types, builtin_keys, errors, files
+from .modules import InterfaceModule
+from .types.generics import Variance
+
+
+# Interfaces hold the types of a module's exports so that a checked library
+# can be used without checking its source again. They're written next to the
+# source of each checked module, and used in place of that source when the
+# module is found on a search path.
+#
+# An interface is a JSON document. Types with identity, such as classes, are
+# defined once in the interface's table of types and referred to by their
+# index in that table, so that recursive and shared types keep their identity.
+# Types defined by another interface are referred to by that interface's path
+# and the index in its table, and builtin types by their builtin keys. Other
+# types, such as functions and unions, are written out in full.
+#
+# The interface also holds a hash of the source it was written from, and a
+# hash of each interface that it refers to types in. If that source is later
+# changed, the interface is ignored. If an interface it refers to has changed,
+# the indexes it refers to may no longer be the same types, so the interface
+# is also ignored. An interface without its source, such as that of a library
+# distributed without source, is used unless an interface it refers to has
+# changed.
+
+extension = ".nopei"
+
+_format = "nope-interface"
+_format_version = 3
+
+
+def interface_path(source_path):
+    return os.path.splitext(source_path)[0] + extension
+
+
+def is_interface_path(path):
+    return path.endswith(extension)
+
+
+def _source_path(path):
+    return os.path.splitext(path)[0] + ".py"
+
+
+# Interfaces are loaded at most once per process, unless they change, so that
+# every module importing an interface sees the same types. When an interface
+# changes or is removed, the types of the previous load are forgotten.
+_loaded = {}
+_loading = set()
+_references = {}
+
+
+_Loaded = collections.namedtuple("_Loaded", ["stats", "module", "interface_hash", "imports"])
+
+
+_Reference = collections.namedtuple("_Reference", ["value", "path", "index", "interface_hash"])
+
+
+def load(path):
+    key = os.path.abspath(path)
+    stat = files.file_stat(path)
+    if stat is None:
+        _forget(key)
+        return None
+    
+    stats = (stat, files.file_stat(_source_path(path)))
+    loaded = _loaded.get(key)
+    if loaded is None or loaded.stats != stats or _imports_changed(loaded.imports):
+        if key in _loading:
+            raise errors.ImportError(None, "Interface '{}' imports itself".format(path))
+        
+        _loading.add(key)
+        try:
+            module, interface_hash, imports = _read(path)
+        finally:
+            _loading.remove(key)
+        
+        _forget(key)
+        if module is not None:
+            for index, value in enumerate(module.defined_types):
+                _references[id(value)] = _Reference(value, module.path, index, interface_hash)
+        loaded = _loaded[key] = _Loaded(stats, module, interface_hash, imports)
+    
+    return loaded.module
+
+
+def _forget(key):
+    loaded = _loaded.pop(key, None)
+    if loaded is not None and loaded.module is not None:
+        for value in loaded.module.defined_types:
+            _references.pop(id(value), None)
+
+
+# Imported interfaces are compared by the hash of their last load, so that
+# checking an interface that is already loaded only needs their stats
+def _imports_changed(imports):
+    for imported_path, imported_hash in imports.items():
+        load(imported_path)
+        imported = _loaded.get(imported_path)
+        if imported is None or imported.interface_hash != imported_hash:
+            return True
+    
+    return False
+
+
+def reference(value):
+    value_reference = _references.get(id(value))
+    if value_reference is None:
+        return None
+    else:
+        return value_reference.path, value_reference.index
+
+
+def load_reference(path, index):
+    module = load(path)
+    if module is None:
+        raise errors.ImportError(None,
+            "Could not find interface '{}', or its source has changed since it was written".format(path))
+    return module.defined_types[index]
+
+
+def _read(path):
+    with open(path, "rb") as interface_file:
+        contents = interface_file.read()
+    interface_hash = _hash(contents)
+    
+    try:
+        interface = json.loads(contents.decode("utf8"))
+    except ValueError:
+        raise errors.ImportError(None, "Interface '{}' is not valid".format(path))
+    
+    if not isinstance(interface, dict) or interface.get("format") != _format or interface.get("version") != _format_version:
+        raise errors.ImportError(None,
+            "Interface '{}' was written by an incompatible version of nope".format(path))
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    imports = dict(
+        (os.path.normpath(os.path.join(directory, relative_path)), imported_hash)
+        for relative_path, imported_hash in interface.get("imports", {}).items()
+    )
+    
+    source_hash = files.file_hash(_source_path(path))
+    if source_hash is not None and source_hash != interface.get("source_hash"):
+        return None, interface_hash, imports
+    
+    if _imports_changed(imports):
+        if source_hash is None:
+            raise errors.ImportError(None,
+                "Interface '{}' refers to an interface that has changed since it was written".format(path))
+        else:
+            return None, interface_hash, imports
+    
+    return _Decoder(path).decode_module(interface), interface_hash, imports
+
+
+def _hash(contents):
+    return hashlib.sha1(contents).hexdigest()
+
+
+def write_interfaces(paths, source_tree, module_checker):
+    checked_modules = [source_tree.module(path) for path in paths]
+    
+    # Modules depend on every module they transitively import, so a module
+    # always has more dependencies than the modules it imports. Writing
+    # interfaces in order of the number of dependencies means that types are
+    # defined by the interface of the module they were first found in.
+    checked_modules.sort(key=lambda module: (len(module_checker.dependencies(module)), module.path))
+    
+    writer = _InterfaceWriter()
+    for module in checked_modules:
+        writer.write(interface_path(module.path), module_checker.type_of_module(module), files.file_hash(module.path))
+
+
+class _InterfaceWriter(object):
+    def __init__(self):
+        self._references = {}
+    
+    def write(self, path, module_type, source_hash):
+        encoder = _Encoder(path, self._reference)
+        interface = encoder.encode_module(module_type)
+        interface["source_hash"] = source_hash
+        contents = json.dumps(interface, separators=(",", ":")).encode("utf8")
+        files.write_atomically(path, lambda interface_file: interface_file.write(contents), binary=True)
+        
+        interface_hash = _hash(contents)
+        for index, value in enumerate(encoder.defined_types):
+            self._references[id(value)] = _Reference(value, path, index, interface_hash)
+    
+    def _reference(self, value):
+        value_reference = self._references.get(id(value))
+        if value_reference is None:
+            value_reference = _references.get(id(value))
+        return value_reference
+
+
+_variance_names = {
+    Variance.Invariant: "invariant",
+    Variance.Covariant: "covariant",
+    Variance.Contravariant: "contravariant",
+}
+
+
+class _Encoder(object):
+    def __init__(self, path, reference):
+        self._directory = os.path.dirname(os.path.abspath(path))
+        self._reference = reference
+        self._definitions = []
+        self.defined_types = []
+        self._indexes = {}
+        self._instantiations = {}
+        self._imports = {}
+        # Values are kept alive so that their ids aren't reused while encoding
+        self._values = []
+    
+    def encode_module(self, module_type):
+        attrs = self._encode_attrs(module_type.attrs)
+        return {
+            "format": _format,
+            "version": _format_version,
+            "attrs": attrs,
+            "types": self._definitions,
+            "imports": self._imports,
+        }
+    
+    def _encode_attrs(self, attrs):
+        return [
+            [attr.name, self._encode(attr.type), attr.read_only]
+            for attr in attrs
+        ]
+    
+    def _encode(self, value):
+        builtin_key = builtin_keys.key_for_object(value)
+        if builtin_key is not None:
+            return list(builtin_key)
+        
+        if id(value) in self._indexes:
+            return ["ref", self._indexes[id(value)]]
+        
+        if id(value) in self._instantiations:
+            return self._instantiations[id(value)]
+        
+        value_reference = self._reference(value)
+        if value_reference is not None:
+            relative_path = os.path.relpath(os.path.abspath(value_reference.path), self._directory)
+            self._imports[relative_path] = value_reference.interface_hash
+            return ["import", relative_path, value_reference.index]
+        
+        if types.is_class_type(value):
+            return ["ref", self._define_class(value)]
+        elif types.is_structural_type(value):
+            return ["ref", self._define_structural_type(value)]
+        elif types.is_formal_parameter(value):
+            return ["ref", self._define_formal_parameter(value)]
+        elif types.is_generic_type(value):
+            return ["ref", self._define_generic_type(value)]
+        elif types.is_instantiated_type(value):
+            return [
+                "instantiate",
+                self._encode(value.generic_type),
+                [self._encode(param) for param in value.type_params],
+            ]
+        elif types.is_generic_func(value):
+            return [
+                "generic_func",
+                [self._encode(param) for param in value.formal_type_params],
+                self._encode_func(value),
+            ]
+        elif types.is_func_type(value):
+            return self._encode_func(value)
+        elif types.is_union_type(value):
+            return ["union"] + [self._encode(member) for member in value._types]
+        elif types.is_overloaded_func_type(value):
+            return ["overloaded_func"] + [self._encode(member) for member in value._types]
+        elif types.is_meta_type(value):
+            return ["meta", self._encode(value.type), self._encode_attrs(value.attrs)]
+        elif types.is_module(value):
+            return ["module", value.name, self._encode_attrs(value.attrs)]
+        else:
+            raise errors.UnsupportedError("Cannot write type to interface: {}".format(value))
+    
+    def _encode_func(self, func_type):
+        return [
+            "func",
+            [[arg.name, self._encode(arg.type), arg.optional] for arg in func_type.args],
+            self._encode(func_type.return_type),
+        ]
+    
+    def _define(self, value):
+        # Types are added to the table before their contents are encoded so
+        # that they can refer to themselves
+        index = len(self._definitions)
+        self._indexes[id(value)] = index
+        self._definitions.append(None)
+        self.defined_types.append(value)
+        return index
+    
+    def _define_class(self, class_type):
+        index = self._define(class_type)
+        self._definitions[index] = {
+            "kind": "class",
+            "name": class_type.name,
+            "attrs": self._encode_attrs(class_type.attrs),
+            "base_classes": [self._encode(base_class) for base_class in class_type.base_classes],
+        }
+        return index
+    
+    def _define_structural_type(self, structural_type):
+        index = self._define(structural_type)
+        self._definitions[index] = {
+            "kind": "structural",
+            "name": structural_type.name,
+            "attrs": self._encode_attrs(structural_type.attrs),
+        }
+        return index
+    
+    def _define_formal_parameter(self, formal_parameter):
+        index = self._define(formal_parameter)
+        self._definitions[index] = {
+            "kind": "param",
+            "name": str(formal_parameter),
+            "variance": _variance_names[formal_parameter.variance],
+        }
+        return index
+    
+    def _define_generic_type(self, generic_type):
+        # The attributes of a generic type are written for its instantiation
+        # with its own formal parameters, which are substituted when the
+        # generic type is instantiated after being loaded
+        params = [self._encode(param) for param in generic_type.params]
+        underlying_type = generic_type.instantiate(generic_type.params).reify()
+        if types.is_class_type(underlying_type):
+            underlying_kind = "class"
+        elif types.is_structural_type(underlying_type):
+            underlying_kind = "structural"
+        else:
+            raise errors.UnsupportedError("Cannot write type to interface: {}".format(generic_type))
+        
+        index = self._define(generic_type)
+        self._instantiations[id(underlying_type)] = ["instantiate", ["ref", index], params]
+        self._values.append(underlying_type)
+        self._definitions[index] = {
+            "kind": "generic",
+            "name": generic_type.name,
+            "underlying": underlying_kind,
+            "params": params,
+            "attrs": self._encode_attrs(underlying_type.attrs),
+        }
+        return index
+
+
+_formal_parameters = {
+    "invariant": types.invariant,
+    "covariant": types.covariant,
+    "contravariant": types.contravariant,
+}
+
+
+_underlying_types = {
+    "class": lambda name: types.class_type(name),
+    "structural": lambda name: types.structural_type(name),
+}
+
+
+class _Decoder(object):
+    def __init__(self, path):
+        self._path = path
+        self._directory = os.path.dirname(os.path.abspath(path))
+        self._defined_types = []
+        self._dependencies = set()
+    
+    def decode_module(self, interface):
+        try:
+            definitions = interface["types"]
+            
+            # Types are created before any of their contents are read so that
+            # types can refer to each other
+            for definition in definitions:
+                self._defined_types.append(self._create(definition))
+            
+            for defined_type, definition in zip(self._defined_types, definitions):
+                self._complete(defined_type, definition)
+            
+            module_type = types.module(self._path, self._decode_attrs(interface["attrs"], {}))
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise errors.ImportError(None, "Interface '{}' is not valid".format(self._path))
+        
+        return InterfaceModule(self._path, module_type, self._defined_types, self._dependencies)
+    
+    def _create(self, definition):
+        kind = definition["kind"]
+        if kind == "class":
+            return types.class_type(definition["name"])
+        elif kind == "structural":
+            return types.structural_type(definition["name"])
+        elif kind == "param":
+            return _formal_parameters[definition["variance"]](definition["name"])
+        elif kind == "generic":
+            return self._create_generic_type(definition)
+        else:
+            raise ValueError("Unknown kind of type: {}".format(kind))
+    
+    def _create_generic_type(self, definition):
+        params = [self._decode(param, {}) for param in definition["params"]]
+        create_underlying_type = _underlying_types[definition["underlying"]]
+        
+        def complete_type(new_type, *actual_params):
+            type_map = dict(zip(params, actual_params))
+            new_type.attrs = types.attrs_from_iterable(self._decode_attrs(definition["attrs"], type_map))
+        
+        return types.generic(
+            definition["name"],
+            params,
+            lambda name, *actual_params: create_underlying_type(name),
+            complete_type=complete_type,
+        )
+    
+    def _complete(self, defined_type, definition):
+        kind = definition["kind"]
+        if kind in ["class", "structural"]:
+            defined_type.attrs = types.attrs_from_iterable(self._decode_attrs(definition["attrs"], {}))
+        if kind == "class":
+            defined_type.base_classes = [
+                self._decode(base_class, {})
+                for base_class in definition["base_classes"]
+            ]
+    
+    def _decode_attrs(self, attrs, type_map):
+        return [
+            types.attr(name, self._decode(value, type_map), read_only=read_only)
+            for name, value, read_only in attrs
+        ]
+    
+    def _decode(self, value, type_map):
+        kind = value[0]
+        if kind == "builtin":
+            return builtin_keys.object_for_key(tuple(value))
+        elif kind == "ref":
+            return self._substitute(self._defined_types[value[1]], type_map)
+        elif kind == "import":
+            _, relative_path, index = value
+            return self._substitute(self._import(relative_path, index), type_map)
+        elif kind == "instantiate":
+            _, generic_type, params = value
+            return self._decode(generic_type, type_map).instantiate([
+                self._decode(param, type_map)
+                for param in params
+            ])
+        elif kind == "generic_func":
+            return self._decode_generic_func(value, type_map)
+        elif kind == "func":
+            return self._decode_func(value, type_map)
+        elif kind == "union":
+            return types.union(*[self._decode(member, type_map) for member in value[1:]])
+        elif kind == "overloaded_func":
+            return types.overloaded_func(*[self._decode(member, type_map) for member in value[1:]])
+        elif kind == "meta":
+            _, meta_type, attrs = value
+            return types.meta_type(self._decode(meta_type, type_map), self._decode_attrs(attrs, type_map))
+        elif kind == "module":
+            _, name, attrs = value
+            return types.module(name, self._decode_attrs(attrs, type_map))
+        else:
+            raise ValueError("Unknown kind of type: {}".format(kind))
+    
+    def _substitute(self, value, type_map):
+        if types.is_formal_parameter(value):
+            return type_map.get(value, value)
+        else:
+            return value
+    
+    def _decode_func(self, value, type_map):
+        _, args, return_type = value
+        return types.func(
+            [
+                types.func_arg(name, self._decode(arg_type, type_map), optional)
+                for name, arg_type, optional in args
+            ],
+            self._decode(return_type, type_map),
+        )
+    
+    def _decode_generic_func(self, value, type_map):
+        _, params, signature = value
+        formal_params = [self._decode(param, {}) for param in params]
+        
+        def create_func(*actual_params):
+            func_type_map = dict(type_map)
+            func_type_map.update(zip(formal_params, actual_params))
+            return self._decode_func(signature, func_type_map)
+        
+        return types.generic_func(formal_params, create_func)
+    
+    def _import(self, relative_path, index):
+        path = os.path.normpath(os.path.join(self._directory, relative_path))
+        module = load(path)
+        if module is None:
+            raise errors.ImportError(None, "Could not find interface '{}'".format(path))
+        
+        self._dependencies.add(module)
+        self._dependencies.update(module.dependencies)
+        return module.defined_types[index]
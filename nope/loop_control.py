@@ -1,39 +1,43 @@
-from . import structure, nodes, errors
+from . import structure, nodes, errors, passes
 from .dispatch import TypeDispatch
 
 
 def check_loop_control(node, in_loop, in_finally=False):
-    return _check_loop_control(node, in_loop, in_finally)
+    passes.run_passes(node, [loop_control_pass(in_loop, in_finally)])
 
 
-def _check_children(node, in_loop, in_finally):
-    for child in structure.children(node):
-        _check_loop_control(child, in_loop, in_finally)
+def loop_control_pass(in_loop=False, in_finally=False):
+    return _visit, (in_loop, in_finally)
 
 
-def _check_loop(node, in_loop, in_finally):
-    _check_loop_body(node.body)
-    _check_statements(node.else_body, in_loop, in_finally)
+def _visit_loop_body(node, context):
+    return True, False
 
 
-def _check_loop_body(statements):
-    for statement in statements:
-        _check_loop_control(statement, True, False)
+def _visit_finally_body(node, context):
+    in_loop, in_finally = context
+    return in_loop, True
 
 
-def _check_statements(statements, in_loop, in_finally):
-    for statement in statements:
-        _check_loop_control(statement, in_loop, in_finally)
+def _visit_scope(node, context):
+    if isinstance(node.parent, (nodes.FunctionDef, nodes.ClassDefinition)):
+        return False, False
+    else:
+        return context
 
 
-def _check_break(node, in_loop, in_finally):
+def _check_break(node, context):
+    in_loop, in_finally = context
     _assert_in_loop(node, in_loop, "break")
+    return context
 
 
-def _check_continue(node, in_loop, in_finally):
+def _check_continue(node, context):
+    in_loop, in_finally = context
     if in_finally:
         raise errors.InvalidStatementError(node, "'continue' not supported inside 'finally' clause")
     _assert_in_loop(node, in_loop, "continue")
+    return context
 
 
 def _assert_in_loop(node, in_loop, name):
@@ -41,27 +45,14 @@ def _assert_in_loop(node, in_loop, name):
         raise errors.InvalidStatementError(node, "'{}' outside loop".format(name))
 
 
-def _check_try(node, in_loop, in_finally):
-    _check_statements(node.body, in_loop, in_finally)
-    for handler in node.handlers:
-        _check_statements(handler.body, in_loop, in_finally)
-    _check_statements(node.finally_body, in_loop, True)
+def _visit_other(node, context):
+    return context
 
 
-def _check_function_definition(node, in_loop, in_finally):
-    _check_statements(node.body, False, False)
-
-
-def _check_class_definition(node, in_loop, in_finally):
-    _check_statements(node.body, False, False)
-
-
-_check_loop_control = TypeDispatch({
-    nodes.WhileLoop: _check_loop,
-    nodes.ForLoop: _check_loop,
+_visit = TypeDispatch({
+    structure.LoopBody: _visit_loop_body,
+    structure.FinallyBody: _visit_finally_body,
+    structure.Scope: _visit_scope,
     nodes.BreakStatement: _check_break,
     nodes.ContinueStatement: _check_continue,
-    nodes.TryStatement: _check_try,
-    nodes.FunctionDef: _check_function_definition,
-    nodes.ClassDefinition: _check_class_definition,
-}, default=_check_children)
+}, default=_visit_other)
@@ -1,11 +1,22 @@
+import os
+import io
+import sys
+import signal
 import argparse
+import traceback
 
 import nope
-from nope import textseek, platforms, errors
+from nope import textseek, platforms, errors, injection, server, profiling, types
 from nope.inference import ephemeral
+from nope.watch import Watcher
 
 
 def main():
+    args = _create_parser().parse_args()
+    exit(args.func(args) or 0)
+
+
+def _create_parser():
     parser = argparse.ArgumentParser()
     subparsers = parser.add_subparsers(dest="command")
     subparsers.required = True
@@ -14,9 +25,8 @@ def main():
         subparser = subparsers.add_parser(command.name)
         subparser.set_defaults(func=command.execute)
         command.create_parser(subparser)
-        
-    args = parser.parse_args()
-    exit(args.func(args) or 0)
+    
+    return parser
 
 
 class CheckCommand(object):
@@ -25,10 +35,55 @@ class CheckCommand(object):
     @staticmethod
     def create_parser(parser):
         parser.add_argument("path", nargs="+")
+        parser.add_argument("--cache-dir")
+        parser.add_argument("--jobs", type=int, default=1)
+        parser.add_argument("--search-path", action="append", default=[], dest="search_paths")
+        parser.add_argument("--emit-interface", action="store_true")
+        parser.add_argument("--server", metavar="SOCKET")
+        _add_profile_arguments(parser)
     
     @staticmethod
     def execute(args):
-        result = nope.check(args.path)
+        if args.server is not None:
+            return _forward_to_server(args.server)
+        
+        return _profiled(args, lambda:
+            CheckCommand.report(nope.check(
+                args.path,
+                cache_dir=args.cache_dir,
+                jobs=args.jobs,
+                search_paths=args.search_paths,
+                emit_interface=args.emit_interface,
+            ))
+        )
+    
+    @staticmethod
+    def execute_in_session(session, args):
+        # The server's session has its own cache and search paths, and checks
+        # modules in its own process, so these options can't be honoured
+        unsupported_options = [
+            option
+            for option, is_set in [
+                ("--cache-dir", args.cache_dir is not None),
+                ("--jobs", args.jobs != 1),
+                ("--search-path", bool(args.search_paths)),
+            ]
+            if is_set
+        ]
+        if unsupported_options:
+            print(
+                "{} cannot be used with --server. Pass --search-path when starting the server instead.".format(
+                    ", ".join(unsupported_options)),
+                file=sys.stderr,
+            )
+            return 2
+        
+        return _profiled(args, lambda:
+            CheckCommand.report(session.check(args.path, emit_interface=args.emit_interface))
+        )
+    
+    @staticmethod
+    def report(result):
         if not result.is_valid:
             _print_error(result.error)
             return 1
@@ -42,21 +97,179 @@ class CompileCommand(object):
         parser.add_argument("path")
         parser.add_argument("--backend", required=True, choices=platforms.names())
         parser.add_argument("--output-dir", required=True)
+        parser.add_argument("--server", metavar="SOCKET")
+        _add_profile_arguments(parser)
     
     @staticmethod
     def execute(args):
+        if args.server is not None:
+            return _forward_to_server(args.server)
+        
+        return _profiled(args, lambda: CompileCommand.compile(nope.compile, args))
+    
+    @staticmethod
+    def execute_in_session(session, args):
+        return _profiled(args, lambda: CompileCommand.compile(session.compile, args))
+    
+    @staticmethod
+    def compile(compile, args):
         try:
-            nope.compile(args.path, args.output_dir, args.backend)
+            compile(args.path, args.output_dir, args.backend)
         except errors.TypeCheckError as error:
             _print_error(error)
             return 1
 
 
+class WatchCommand(object):
+    name = "watch"
+    
+    @staticmethod
+    def create_parser(parser):
+        parser.add_argument("path", nargs="+")
+        parser.add_argument("--interval", type=float, default=0.5)
+    
+    @staticmethod
+    def execute(args):
+        def on_result(result):
+            if result.is_valid:
+                print("No errors")
+            else:
+                _print_error(result.error)
+            print()
+        
+        watcher = injection.create_injector().get(Watcher)
+        try:
+            watcher.watch(args.path, on_result, interval=args.interval)
+        except KeyboardInterrupt:
+            pass
+
+
+class ServerCommand(object):
+    name = "server"
+    
+    @staticmethod
+    def create_parser(parser):
+        parser.add_argument("socket")
+        parser.add_argument("--search-path", action="append", default=[], dest="search_paths")
+    
+    @staticmethod
+    def execute(args):
+        # The working directory changes to match each request, so search paths
+        # are made absolute first
+        search_paths = list(map(os.path.abspath, args.search_paths))
+        session = injection.create_injector(search_paths=search_paths).get(server.Session)
+        check_server = server.create_server(args.socket, lambda request: _handle_request(session, request))
+        signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+        try:
+            check_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            check_server.server_close()
+            os.remove(args.socket)
+
+
 _commands = [
     CheckCommand,
     CompileCommand,
+    WatchCommand,
+    ServerCommand,
 ]
 
+
+_session_commands = dict(
+    (command.name, command)
+    for command in [CheckCommand, CompileCommand]
+)
+
+
+def _add_profile_arguments(parser):
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--profile-json", metavar="PATH")
+
+
+def _profiled(args, run):
+    if not args.profile and args.profile_json is None:
+        return run()
+    
+    # Only phases run in this process are recorded, so modules checked by
+    # other processes when using --jobs are missing from the report
+    instantiation_stats_before = types.instantiation_cache_stats()
+    with profiling.profile(profiling.Profiler()) as profiler:
+        exit_code = run()
+    instantiation_stats = types.instantiation_cache_stats()
+    
+    if args.profile:
+        print()
+        profiler.print_report()
+        print()
+        print("Generic instantiations: {} hits, {} misses, {} evictions, {} live".format(
+            instantiation_stats.hits - instantiation_stats_before.hits,
+            instantiation_stats.misses - instantiation_stats_before.misses,
+            instantiation_stats.evictions - instantiation_stats_before.evictions,
+            instantiation_stats.size,
+        ))
+    
+    if args.profile_json is not None:
+        with open(args.profile_json, "w") as json_file:
+            profiler.write_json(json_file)
+    
+    return exit_code
+
+
+# scripts/nope forwards requests in the same way without importing nope, so
+# the format of requests should be kept in sync with it
+def _forward_to_server(socket_path):
+    response = server.send_request(socket_path, {
+        "cwd": os.getcwd(),
+        "argv": sys.argv[1:],
+    })
+    print(response["output"], end="")
+    return response["exit_code"]
+
+
+def _handle_request(session, request):
+    # Requests are handled one at a time, so the working directory and output
+    # streams of the server can be switched to match the client's
+    cwd = request["cwd"]
+    os.chdir(cwd)
+    
+    output = io.StringIO()
+    original_stdout, original_stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = output
+    try:
+        exit_code = _execute_request(session, cwd, request["argv"])
+    except SystemExit as error:
+        exit_code = error.code
+    except Exception:
+        traceback.print_exc(file=output)
+        exit_code = 1
+    finally:
+        sys.stdout, sys.stderr = original_stdout, original_stderr
+    
+    return {"exit_code": exit_code, "output": output.getvalue()}
+
+
+def _execute_request(session, cwd, argv):
+    args = _create_parser().parse_args(argv)
+    if args.command not in _session_commands:
+        print("{} cannot be used with --server".format(args.command))
+        return 2
+    
+    # The session keeps modules from earlier requests, which may have come from
+    # other working directories, so paths are made absolute
+    if isinstance(args.path, list):
+        args.path = [_absolute_path(cwd, path) for path in args.path]
+    else:
+        args.path = _absolute_path(cwd, args.path)
+    
+    return _session_commands[args.command].execute_in_session(session, args) or 0
+
+
+def _absolute_path(cwd, path):
+    return os.path.normpath(os.path.join(cwd, path))
+
+
 def _print_error(error):
     if isinstance(error, SyntaxError):
         _print_location(error)
@@ -3,16 +3,139 @@ import collections
 
 import zuice
 
-from . import errors, environment, modules
+from . import errors, environment, modules, interfaces
 from .source import SourceTree
 
 
 ModuleSearchPaths = zuice.key("ModuleSearchPaths")
 
 
+# Resolving an import means looking for several possible files for each search
+# path, so rather than checking each possible path, each directory is listed
+# once and kept for the rest of the session, as are the
+# paths that each import resolves to. Since the search paths are fixed for the
+# session, an import resolves to the same paths wherever it's imported from,
+# unless it's relative or in an executable module, in which case the directory
+# of the importing module is also searched. The paths are kept rather than the
+# modules so that changed modules are loaded again by the source tree.
+class ModuleResolutionCache(object):
+    def __init__(self, search_paths, list_directory=None, is_file=None):
+        if list_directory is None:
+            list_directory = _list_directory
+        if is_file is None:
+            is_file = os.path.isfile
+        
+        self._search_paths = search_paths
+        self._list_directory = list_directory
+        self._path_is_file = is_file
+        self._listings = {}
+        self._resolutions = {}
+        self._imports = {}
+    
+    def search_paths(self):
+        return list(self._search_paths)
+    
+    def module_paths(self, module_dir, names):
+        key = (module_dir, tuple(names))
+        paths = self._resolutions.get(key)
+        if paths is None:
+            paths = self._resolutions[key] = tuple(self._find_module_paths(module_dir, names))
+        return paths
+    
+    # The imports that each module has resolved are recorded so that the
+    # check cache can tell whether a module's imports would still resolve to
+    # the same paths, such as when a new module would shadow an import
+    def add_import(self, importing_path, module_dir, names):
+        self._imports.setdefault(importing_path, set()).add((module_dir, tuple(names)))
+    
+    def import_candidates(self, importing_path):
+        candidate_paths = set()
+        for module_dir, names in self._imports.get(importing_path, ()):
+            for module_path, interface_path in self._candidate_paths(module_dir, names):
+                candidate_paths.add(module_path)
+                if interface_path is not None:
+                    candidate_paths.add(interface_path)
+        
+        return [(path, self.is_file(path)) for path in sorted(candidate_paths)]
+    
+    def directories(self):
+        return list(self._listings)
+    
+    def invalidate(self, path):
+        self._listings.pop(_directory_key(path), None)
+        self._listings.pop(_directory_key(os.path.dirname(path)), None)
+        self._resolutions.clear()
+        self._imports.pop(path, None)
+    
+    def _find_module_paths(self, module_dir, names):
+        # The same file can be found more than once, such as when an
+        # executable module is in a directory on the search path
+        module_paths = collections.OrderedDict()
+        
+        for module_path, interface_path in self._candidate_paths(module_dir, names):
+            # Modules on search paths are loaded from their interface, if
+            # one has been written, rather than being checked again
+            if interface_path is not None and self.is_file(interface_path):
+                module_paths.setdefault(os.path.abspath(module_path), (module_path, interface_path))
+            elif self.is_file(module_path):
+                module_paths.setdefault(os.path.abspath(module_path), (module_path, None))
+        
+        return module_paths.values()
+    
+    def _candidate_paths(self, module_dir, names):
+        if module_dir is not None:
+            for module_path in _possible_module_paths_under_search_path(module_dir, names):
+                yield module_path, None
+        
+        # Relative imports are only resolved against the directory of the
+        # importing module
+        if names[0] not in [".", ".."]:
+            for search_path in self._search_paths:
+                for module_path in _possible_module_paths_under_search_path(search_path, names):
+                    yield module_path, interfaces.interface_path(module_path)
+    
+    # Listings hold the names of every entry in the directory, so an entry is
+    # only checked to be a file, rather than a directory, once an import
+    # refers to it. The answer is kept along with the listing.
+    def is_file(self, path):
+        directory, name = os.path.split(path)
+        directory = _directory_key(directory)
+        listing = self._listings.get(directory)
+        if listing is None:
+            listing = self._listings[directory] = (self._list_directory(directory), {})
+        
+        names, is_file = listing
+        if name not in names:
+            return False
+        if name not in is_file:
+            is_file[name] = self._path_is_file(path)
+        return is_file[name]
+
+
+# The current directory is listed as os.curdir rather than an empty path so
+# that it can be watched for changes
+def _directory_key(directory):
+    return directory or os.curdir
+
+
+def _list_directory(directory):
+    try:
+        return frozenset(os.listdir(directory))
+    except OSError:
+        return frozenset()
+
+
+def _possible_module_paths_under_search_path(search_path, names):
+    import_path = os.path.normpath(os.path.join(search_path, *names))
+    return (
+        os.path.join(import_path, "__init__.py"),
+        import_path + ".py"
+    )
+
+
 class ModuleResolverFactory(zuice.Base):
     _injector = zuice.dependency(zuice.Injector)
-
+    
     def for_module(self, module):
         return self._injector.get(ModuleResolver, {modules.Module: module})
 
@@ -22,7 +145,7 @@ class ModuleResolver(zuice.Base):
     _builtin_modules = zuice.dependency(environment.BuiltinModules)
     _module_exports = zuice.dependency(modules.ModuleExports)
     _module = zuice.dependency(modules.Module)
-    _search_paths = zuice.dependency(ModuleSearchPaths)
+    _resolution_cache = zuice.dependency(ModuleResolutionCache)
     
     def resolve_import_value(self, names, value_name):
         imported_module = self.resolve_import_path(names)
@@ -47,10 +170,10 @@ class ModuleResolver(zuice.Base):
                 raise errors.ModuleNotFoundError(None, message)
     
     def _module_declares_name(self, imported_module, name):
-        if isinstance(imported_module, modules.BuiltinModule):
+        if isinstance(imported_module, (modules.BuiltinModule, modules.InterfaceModule)):
             module_names = imported_module.type.attrs.names()
         else:
-            module_names = self._module_exports.names(imported_module.node)
+            module_names = self._module_exports.exports(imported_module)
         
         return name in module_names
     
@@ -59,37 +182,41 @@ class ModuleResolver(zuice.Base):
         if name in self._builtin_modules:
             return self._builtin_modules[name]
         
-        module_paths = self._possible_module_paths(self._module.path, names)
-        modules = list(filter(None, map(self._source_tree.module, module_paths)))
+        possible_modules = list(filter(None, self._possible_modules(names)))
         
-        if len(modules) > 1:
+        if len(possible_modules) > 1:
             raise errors.ImportError(None,
                 "Import is ambiguous, possible module paths: " +
-                    ", ".join("'{}'".format(module.path) for module in modules)
+                    ", ".join("'{}'".format(module.path) for module in possible_modules)
             )
-        elif len(modules) == 0:
+        elif len(possible_modules) == 0:
             raise errors.ModuleNotFoundError(None, "Could not find module '{}'".format(name))
         else:
-            module, = modules
-            if module.node.is_executable:
+            module, = possible_modules
+            if isinstance(module, modules.LocalModule) and module.node.is_executable:
                 raise errors.ImportError(None, "Cannot import executable modules")
             else:
                 return module
-
-
-    def _possible_module_paths(self, module_path, names):
+    
+    
+    def _possible_modules(self, names):
         if names[0] in [".", ".."] or self._module.node.is_executable:
-            yield from self._possible_module_paths_under_search_path(os.path.dirname(module_path), names)
+            module_dir = os.path.dirname(self._module.path)
+        else:
+            module_dir = None
         
-        for search_path in self._search_paths:
-            yield from self._possible_module_paths_under_search_path(search_path, names)
-    
-    def _possible_module_paths_under_search_path(self, search_path, names):
-        import_path = os.path.normpath(os.path.join(search_path, *names))
-        return (
-            os.path.join(import_path, "__init__.py"),
-            import_path + ".py"
-        )
+        self._resolution_cache.add_import(self._module.path, module_dir, names)
+        for module_path, interface_path in self._resolution_cache.module_paths(module_dir, names):
+            # Interfaces that are out of date with their source are ignored
+            if interface_path is None:
+                interface_module = None
+            else:
+                interface_module = interfaces.load(interface_path)
+            
+            if interface_module is None:
+                yield self._source_tree.module(module_path)
+            else:
+                yield interface_module
 
 
 ResolvedImport = collections.namedtuple("ResolvedImport",
@@ -33,16 +33,43 @@ class BuiltinModule(Module):
         return os.path.join(os.path.dirname(__file__), "../stdlib", self.name + ".py")
 
 
+# A module loaded from an interface written by "nope check --emit-interface".
+# Its type is already known, so it has no tree to check.
+class InterfaceModule(Module):
+    def __init__(self, path, type_, defined_types, dependencies):
+        self.path = path
+        self.type = type_
+        self.defined_types = defined_types
+        self.dependencies = dependencies
+    
+    def __repr__(self):
+        return "InterfaceModule({})".format(repr(self.path))
+
+
+# The exports of each module are found once and then shared by name resolution
+# and type inference. Exports are kept for each path, and a changed module is
+# parsed into a new node, so only the exports of the latest tree of each
+# module are kept.
 class ModuleExports(zuice.Base):
     _declaration_finder = zuice.dependency(name_declaration.DeclarationFinder)
     
-    def names(self, module_node):
-        return [
-            declaration.name
-            for declaration in self.declarations(module_node)
-        ]
+    @zuice.init
+    def init(self):
+        self._exports = {}
     
-    def declarations(self, module_node):
+    def exports(self, module):
+        entry = self._exports.get(module.path)
+        if entry is None or entry[0] is not module.node:
+            entry = self._exports[module.path] = (module.node, Exports(self._find_export_declarations(module.node)))
+        return entry[1]
+    
+    def names(self, module):
+        return self.exports(module).names
+    
+    def declarations(self, module):
+        return self.exports(module).declarations
+    
+    def _find_export_declarations(self, module_node):
         export_declarations = self._export_declarations(module_node.body)
         module_declarations = self._declaration_finder.declarations_in(module_node)
         
@@ -78,6 +105,16 @@ class ModuleExports(zuice.Base):
         )
 
 
+class Exports(object):
+    def __init__(self, declarations):
+        self.declarations = declarations
+        self.names = [declaration.name for declaration in declarations]
+        self._names = frozenset(self.names)
+    
+    def __contains__(self, name):
+        return name in self._names
+
+
 def _extract_string_value_from_literal(statement, node):
     if isinstance(node, nodes.StringLiteral):
         return node.value
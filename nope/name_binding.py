@@ -3,12 +3,12 @@ from .lists import filter_by_type
 from .dispatch import TypeDispatch
 
 
-def check_bindings(node, references, type_lookup, is_definitely_bound):
-    context = _Context(references, is_definitely_bound, {})
-    checker = _BindingChecker(type_lookup)
+def check_bindings(node, references, type_lookup, is_definitely_bound, check_bodies=True):
+    context = _Context.create(references, is_definitely_bound)
+    checker = _BindingChecker(type_lookup, check_bodies)
     checker.process_bindings(node, context)
     context.update_deferred()
-    return Bindings(references, context._is_definitely_bound)
+    return Bindings(references, context)
 
 
 class _BindingChecker(object):
@@ -21,10 +21,13 @@ class _BindingChecker(object):
         nodes.SelfTypeDefinition,
     ])
     
-    def __init__(self, type_lookup):
+    def __init__(self, type_lookup, check_bodies):
         self._type_lookup = type_lookup
+        self._check_bodies = check_bodies
         self._update_bindings = TypeDispatch({
             structure.Branch: self._update_branch_node,
+            structure.LoopBody: self._update_branch_node,
+            structure.FinallyBody: self._update_branch_node,
             structure.ExhaustiveBranches: self._update_exhaustive_branches,
             structure.Delete: self._update_delete,
             nodes.Target: self._update_target_node,
@@ -33,18 +36,40 @@ class _BindingChecker(object):
         }, default=self._update_children)
     
     def process_bindings(self, node, context):
+        self._run([(self._process_node, node, context)])
+    
+    
+    # Pending work is kept on an explicit stack rather than the Python stack
+    # so that deeply nested expressions and long if/elif ladders can be
+    # checked. Each item is a function with the node and context to call it
+    # with, and any items that a function pushes are run before the items
+    # that were already on the stack.
+    def _run(self, stack):
+        while stack:
+            func, node, context = stack.pop()
+            func(node, context, stack)
+    
+    def _process_node(self, node, context, stack):
         if isinstance(node, nodes.VariableReference):
             self._check_variable_reference(node, context)
         
-        self._update_bindings(node, context)
-        
         if type(node) in self._binding_nodes:
-            context.bind(node)
+            stack.append((self._bind, node, context))
+        
+        self._update_bindings(node, context, stack)
+    
+    def _bind(self, node, context, stack):
+        context.bind(node)
 
 
-    def _update_children(self, node, context):
-        for child in structure.children(node, self._type_lookup):
-            self.process_bindings(child, context)
+    def _update_children(self, node, context, stack):
+        self._push_nodes(structure.children(node, self._type_lookup), context, stack)
+    
+    def _push_nodes(self, nodes, context, stack):
+        stack.extend(
+            (self._process_node, node, context)
+            for node in reversed(tuple(nodes))
+        )
 
 
     def _check_variable_reference(self, node, context):
@@ -52,80 +77,109 @@ class _BindingChecker(object):
             raise errors.UnboundLocalError(node, node.name)
     
     
-    def _update_branch_node(self, node, context):
-        branch_context = self._update_branched_nodes(node.body, context)
+    def _update_branch_node(self, node, context, stack):
+        branch_context = context.enter_branch()
+        stack.append((self._after_branch, branch_context, context))
+        self._push_nodes(node.body, branch_context, stack)
+    
+    def _after_branch(self, branch_context, context, stack):
         context.after_branch(branch_context)
-        
+
+    def _update_exhaustive_branches(self, node, context, stack):
+        # Branch contexts are views of the context they were entered from, so
+        # they can all be entered before any of the branches are checked
+        branch_contexts = [context.enter_branch() for branch in node.branches]
+        stack.append((self._unify, branch_contexts, context))
+        for branch, branch_context in reversed(list(zip(node.branches, branch_contexts))):
+            self._push_nodes(branch, branch_context, stack)
     
-    def _update_branched_nodes(self, nodes, context):
-        branch_context = context.enter_branch()
-        self._update_statements(nodes, branch_context)
-        return branch_context
-
-    def _update_exhaustive_branches(self, node, context):
-        branch_contexts = [
-            self._update_branched_nodes(branch, context)
-            for branch in node.branches
-        ]
+    def _unify(self, branch_contexts, context, stack):
         context.unify(branch_contexts)
 
-    def _update_delete(self, node, context):
+    def _update_delete(self, node, context, stack):
         assert isinstance(node.target, nodes.VariableReference)
         
         context.delete(node.target)
 
-    def _update_target(self, target, context):
+    def _update_target(self, target, context, stack):
         if isinstance(target, nodes.TupleLiteral):
-            for element in target.elements:
-                self._update_target(element, context)
+            stack.extend(
+                (self._update_target, element, context)
+                for element in reversed(target.elements)
+            )
         else:
             if isinstance(target, nodes.VariableReference):
                 context.bind(target)
-            self.process_bindings(target, context)
+            stack.append((self._process_node, target, context))
     
     
-    def _update_target_node(self, node, context):
-        self._update_target(node.value, context)
+    def _update_target_node(self, node, context, stack):
+        self._update_target(node.value, context, stack)
 
 
-    def _update_function_definition(self, node, context):
+    def _update_function_definition(self, node, context, stack):
         context.bind(node)
-        context.add_deferred(node, lambda: self._update_function_definition_body(node, context))
+        if self._check_bodies:
+            context.add_deferred(node, lambda: self._update_function_definition_body(node, context))
         
     
     def _update_function_definition_body(self, node, context):
         body_context = context.enter_new_namespace()
+        stack = []
+        self._push_nodes(node.body, body_context, stack)
+        stack.append((self._process_node, node.args, body_context))
         if node.type is not None:
-            self.process_bindings(node.type, body_context)
-        self.process_bindings(node.args, body_context)
-        self._update_statements(node.body, body_context)
+            stack.append((self._process_node, node.type, body_context))
+        self._run(stack)
 
 
-    def _update_class_definition(self, node, context):
+    def _update_class_definition(self, node, context, stack):
         body_context = context.enter_new_namespace()
-        self.process_bindings(node.self_type, body_context)
-        self.process_bindings(node.type_params, body_context)
-        self._update_statements(node.body, body_context)
+        stack.append((self._add_class_deferred, node, context))
+        self._push_nodes(node.body, body_context, stack)
+        stack.append((self._process_node, node.type_params, body_context))
+        stack.append((self._process_node, node.self_type, body_context))
+    
+    def _add_class_deferred(self, node, context, stack):
+        context.bind(node)
         context.add_deferred(node, lambda: self._update_class_on_reference(node, context))
     
     def _update_class_on_reference(self, node, context):
-        context.bind(node)
         methods = filter_by_type(nodes.FunctionDef, node.body)
         for method in methods:
             context.is_definitely_bound(method)
-    
-    
-    def _update_statements(self, statements, context):
-        for statement in statements:
-            self.process_bindings(statement, context)
 
 
 
+# Declarations are given dense indices, and the set of definitely bound
+# declarations is held as an integer with a bit for each declaration, so that
+# branches can be merged using bitwise operations.
+#
+# Each context also records the declarations that were bound and unbound
+# in that context, rather than in the context it was entered from. A context
+# sees later changes to the contexts it was entered from, which matters when
+# checking the body of a function after the function has been defined, so the
+# bound declarations are recalculated from those records before entering the
+# body of a function or class.
 class _Context(object):
-    def __init__(self, references, is_definitely_bound, deferred):
+    @staticmethod
+    def create(references, is_definitely_bound):
+        context = _Context(references, None, {}, {})
+        for declaration, is_bound in is_definitely_bound.items():
+            if is_bound:
+                context._bind_declaration(declaration)
+            else:
+                context._unbind_declaration(declaration)
+        return context
+    
+    def __init__(self, references, parent, deferred, declaration_bits):
         self._references = references
-        self._is_definitely_bound = is_definitely_bound
+        self._parent = parent
         self._deferred = deferred
+        self._declaration_bits = declaration_bits
+        self._bound = 0 if parent is None else parent._bound
+        self._assigned = 0
+        self._unassigned = 0
     
     def is_definitely_bound(self, node):
         declaration = self._references.referenced_declaration(node)
@@ -134,46 +188,75 @@ class _Context(object):
     def is_declaration_definitely_bound(self, declaration):
         if declaration in self._deferred:
             self._deferred.pop(declaration)()
-            
-        return self._is_definitely_bound.get(declaration, False)
+        
+        return self._is_bit_bound(self._declaration_bits.get(declaration, 0))
+    
+    def _is_bit_bound(self, bit):
+        return (self._bound & bit) != 0
     
     def bind(self, node):
-        declaration = self._references.referenced_declaration(node)
-        self._is_definitely_bound[declaration] = True
+        self._bind_declaration(self._references.referenced_declaration(node))
     
+    def _bind_declaration(self, declaration):
+        self._assign(self._bit(declaration))
     
     def delete(self, node):
-        declaration = self._references.referenced_declaration(node)
-        self._is_definitely_bound[declaration] = False
+        self._unbind_declaration(self._references.referenced_declaration(node))
+    
+    def _unbind_declaration(self, declaration):
+        self._unassign(self._bit(declaration))
+    
+    def _assign(self, bits):
+        self._bound |= bits
+        self._assigned |= bits
+        self._unassigned &= ~bits
+    
+    def _unassign(self, bits):
+        self._bound &= ~bits
+        self._unassigned |= bits
+        self._assigned &= ~bits
+    
+    def _bit(self, declaration):
+        bit = self._declaration_bits.get(declaration)
+        if bit is None:
+            bit = self._declaration_bits[declaration] = 1 << len(self._declaration_bits)
+        return bit
     
     def enter_branch(self):
-        return _Context(self._references, DiffingDict(self._is_definitely_bound), self._deferred)
+        return _Context(self._references, self, self._deferred, self._declaration_bits)
     
     def enter_new_namespace(self):
-        is_definitely_bound = DiffingDict(self._is_definitely_bound)
-        return _Context(self._references, is_definitely_bound, self._deferred)
+        self._recalculate_bound()
+        return _Context(self._references, self, self._deferred, self._declaration_bits)
+    
+    def _recalculate_bound(self):
+        contexts = []
+        context = self
+        while context is not None:
+            contexts.append(context)
+            context = context._parent
+        
+        bound = 0
+        for context in reversed(contexts):
+            bound = (bound & ~context._unassigned) | context._assigned
+            context._bound = bound
     
     def unify(self, contexts):
-        is_definitely_bound_mappings = [
-            context._is_definitely_bound._new
-            for context in contexts
-        ]
-        # We can pick an arbitrary mapping since if it's missing a name,
+        # We can pick an arbitrary context since if it's missing a name,
         # we already know that name is not definitely bound
-        mapping = is_definitely_bound_mappings[0]
+        first_context = contexts[0]
+        declarations = (first_context._assigned | first_context._unassigned) & ~self._bound
         
-        for declaration in mapping:
-            if not self._is_definitely_bound.get(declaration, False):
-                self._is_definitely_bound[declaration] = all(
-                    mapping.get(declaration, False)
-                    for mapping in is_definitely_bound_mappings
-                )
+        assigned_in_all_contexts = first_context._assigned
+        for context in contexts[1:]:
+            assigned_in_all_contexts &= context._assigned
+        
+        self._assign(declarations & assigned_in_all_contexts)
+        self._unassign(declarations & ~assigned_in_all_contexts)
     
     
     def after_branch(self, branch_context):
-        for declaration, is_bound in branch_context._is_definitely_bound._new.items():
-            if not is_bound:
-                self._is_definitely_bound[declaration] = False
+        self._unassign(branch_context._unassigned)
     
     def add_deferred(self, node, update):
         declaration = self._references.referenced_declaration(node)
@@ -185,47 +268,13 @@ class _Context(object):
 
 
 class Bindings(object):
-    def __init__(self, references, is_definitely_bound):
+    def __init__(self, references, context):
         self._references = references
-        self._is_definitely_bound = is_definitely_bound
+        self._context = context
     
     def is_definitely_bound(self, node):
         declaration = self._references.referenced_declaration(node)
         return self.is_declaration_definitely_bound(declaration)
     
     def is_declaration_definitely_bound(self, declaration):
-        return self._is_definitely_bound.get(declaration, False)
-
-
-class DiffingDict(object):
-    def __init__(self, original, new=None):
-        if new is None:
-            new = {}
-        
-        self._original = original
-        self._new = new
-    
-    def __iter__(self):
-        return iter(list(self._original) + list(self._new))
-    
-    def __getitem__(self, key):
-        if key in self._new:
-            return self._new[key]
-        else:
-            return self._original[key]
-    
-    def get(self, key, default=None):
-        return self._new.get(key, self._original.get(key, default))
-    
-    def __setitem__(self, key, value):
-        self._new[key] = value
-    
-    def __contains__(self, key):
-        return key in self._new or key in self._original
-
-
-def _copy_dict(values):
-    if isinstance(values, dict):
-        return values.copy()
-    else:
-        return values.flattened_copy()
+        return self._context._is_bit_bound(self._context._declaration_bits.get(declaration, 0))
@@ -3,8 +3,17 @@ from .identity_dict import ComputedNodeDict
 
 
 def _declare(node, declarations):
-    _declare_targets(node, declarations)
-    _declare_children(node, declarations)
+    # Uses an explicit stack so that deeply nested trees don't exhaust the
+    # Python stack
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        _declare_targets(node, declarations)
+        stack.extend(
+            child
+            for child in reversed(tuple(structure.scoped_children(node)))
+            if not structure.is_scope(child)
+        )
 
 
 def _declare_targets(node, declarations):
@@ -13,12 +22,6 @@ def _declare_targets(node, declarations):
         declarations.declare(target_name, target_node, target_type=target_type)
 
 
-def _declare_children(node, declarations):
-    for child in structure.scoped_children(node):
-        if not structure.is_scope(child):
-            _declare(child, declarations)
-
-
 def _targets(node):
     if isinstance(node, nodes.Target):
         return _left_value_to_targets(node.value), VariableDeclarationNode
@@ -119,6 +122,12 @@ class DeclarationFinder(object):
 
     def declarations_in(self, node):
         return self._node_to_declarations[node]
+    
+    def add_declarations(self, node, declarations):
+        # Declarations that have already been found are kept since
+        # declarations are compared by identity
+        if node not in self._node_to_declarations:
+            self._node_to_declarations[node] = declarations
         
 
     def _generate_declarations(self, node):
@@ -130,6 +139,33 @@ class DeclarationFinder(object):
         return declarations.build()
 
 
+# Finds the declarations in every scope of a tree as part of a single traversal
+# of the tree, rather than traversing each scope when its declarations are
+# first needed
+class DeclarationsPass(object):
+    def __init__(self, declaration_finder):
+        self._declaration_finder = declaration_finder
+        self._scopes = []
+    
+    def visitor(self):
+        # Declarations of the root node itself belong to a scope outside of the
+        # tree, so they're discarded
+        return self._visit, DeclarationsBuilder()
+    
+    def _visit(self, node, declarations):
+        if structure.is_scope(node):
+            declarations = DeclarationsBuilder()
+            self._scopes.append((node.parent, declarations))
+        else:
+            _declare_targets(node, declarations)
+        
+        return declarations
+    
+    def finish(self):
+        for node, declarations in self._scopes:
+            self._declaration_finder.add_declarations(node, declarations.build())
+
+
 def find_declarations(node):
     declarations = DeclarationsBuilder()
     _declare(node, declarations)
@@ -1,7 +1,10 @@
+import collections
+
 import zuice
 
-from nope import nodes, errors, name_declaration, structure, environment
-from nope.identity_dict import NodeDict
+from nope import nodes, errors, name_declaration, structure, environment, profiling
+from nope.identity_dict import NodeTable
+from nope.passes import run_passes
 from .dispatch import TypeDispatch
 
 
@@ -9,41 +12,136 @@ class NameResolver(zuice.Base):
     _declaration_finder = zuice.dependency(name_declaration.DeclarationFinder)
     _initial_declarations = zuice.dependency(environment.InitialDeclarations)
     
-    def resolve(self, node):
-        references = NodeDict()
-        context = _Context(self._declaration_finder, self._initial_declarations, references)
-        _resolve(node, context)
-        return References(references)
+    def resolve(self, node, passes=()):
+        # Other passes can be given so that they're run in the same traversal
+        # of the tree
+        with profiling.phase("name_resolution"):
+            declarations_pass = name_declaration.DeclarationsPass(self._declaration_finder)
+            references_pass = _ReferencesPass()
+            run_passes(node, [declarations_pass.visitor(), references_pass.visitor()] + list(passes))
+            declarations_pass.finish()
+            
+            references = NodeTable()
+            reference_slots = NodeTable()
+            slots = _Slots()
+            context = _Context.create(self._declaration_finder, self._initial_declarations, references, reference_slots, slots)
+            references_pass.resolve(context)
+            return References(references, reference_slots, slots)
+
+
+# Each declaration is given a slot. The depth is the number of scopes
+# enclosing the declaration, with the builtins at depth zero, and the index is
+# the position of the declaration amongst the declarations in the same scope,
+# so values can be stored in an array for each frame. Builtins are indexed in
+# the order that the module first refers to them. The number is unique within
+# the module, so values for the whole module can be stored in a single array,
+# as is done during type inference.
+Slot = collections.namedtuple("Slot", ["depth", "index", "number"])
 
 
 class References(object):
-    def __init__(self, references):
-        self._references = NodeDict.create(references)
+    def __init__(self, references, reference_slots, slots):
+        self._references = references
+        self._reference_slots = reference_slots
+        self._slots = slots
     
     def referenced_declaration(self, reference):
         return self._references[reference]
     
+    def referenced_slot(self, reference):
+        return self._reference_slots[reference]
+    
+    def declaration_slot(self, declaration):
+        return self._slots.slot(declaration)
+    
+    def builtin_slots(self):
+        return self._slots.builtin_items()
+    
+    def slot_count(self):
+        return len(self._slots)
+    
     def __iter__(self):
         return iter(self._references.keys())
 
 
-def _resolve(node, context):
-    if node is None:
-        return
-    elif structure.is_scope(node):
-        scope_context = context.enter_scope(node)
-        _resolve(node.body, scope_context)
-    else:
+# Builtins are only given slots once they're referenced, so that a module
+# only has slots for the builtins that it uses. The declarations in any other
+# scope are given slots when the scope is entered, before any references in
+# the scope are resolved, so a declaration without a slot is a builtin.
+class _Slots(object):
+    def __init__(self):
+        self._slots = {}
+        self._builtin_slots = []
+    
+    def add_scope(self, depth, declarations):
+        for index, declaration in enumerate(declarations):
+            if declaration not in self._slots:
+                self._slots[declaration] = Slot(depth, index, len(self._slots))
+    
+    def referenced_slot(self, declaration):
+        slot = self._slots.get(declaration)
+        if slot is None:
+            slot = self._slots[declaration] = Slot(0, len(self._builtin_slots), len(self._slots))
+            self._builtin_slots.append((declaration, slot))
+        return slot
+    
+    def slot(self, declaration):
+        return self._slots[declaration]
+    
+    def builtin_items(self):
+        return list(self._builtin_slots)
+    
+    def __len__(self):
+        return len(self._slots)
+
+
+# Declarations can be referenced before they're declared, so references are
+# collected during the traversal and only resolved once the declarations in
+# every scope have been found
+class _ReferencesPass(object):
+    def __init__(self):
+        self._references = []
+    
+    def visitor(self):
+        return self._visit, _ResolutionScope(None, None)
+    
+    def _visit(self, node, scope):
+        if structure.is_scope(node):
+            return _ResolutionScope(node, scope)
+        
         if name_declaration.declaration_type(node) is not None or isinstance(node, nodes.VariableReference):
-            context.add_reference(node, node.name)
+            self._references.append((node, scope))
         
-        for child in structure.scoped_children(node):
-            _resolve(child, context)
+        return scope
+    
+    def resolve(self, context):
+        for node, scope in self._references:
+            scope.context(context).add_reference(node, node.name)
+
+
+class _ResolutionScope(object):
+    def __init__(self, scope, parent):
+        self._scope = scope
+        self._parent = parent
+        self._context = None
+    
+    def context(self, root_context):
+        if self._context is None:
+            if self._parent is None:
+                self._context = root_context
+            else:
+                self._context = self._parent.context(root_context).enter_scope(self._scope)
+        
+        return self._context
 
 
 class _Context(object):
-    def __init__(self, declaration_finder, declarations, references, declarations_for_functions=None):
-        assert isinstance(references, NodeDict)
+    @staticmethod
+    def create(declaration_finder, declarations, references, reference_slots, slots):
+        return _Context(declaration_finder, declarations, references, reference_slots, slots, depth=0)
+    
+    def __init__(self, declaration_finder, declarations, references, reference_slots, slots, depth, declarations_for_functions=None):
+        assert isinstance(references, NodeTable)
         
         if declarations_for_functions is None:
             declarations_for_functions = declarations
@@ -52,6 +150,9 @@ class _Context(object):
         self._declarations = declarations
         self._declarations_for_functions = declarations_for_functions
         self._references = references
+        self._reference_slots = reference_slots
+        self._slots = slots
+        self._depth = depth
     
     def is_declared(self, name):
         return self._declarations.is_declared(name)
@@ -59,16 +160,23 @@ class _Context(object):
     def add_reference(self, reference, name):
         if not self.is_declared(name):
             raise errors.UndefinedNameError(reference, name)
-            
-        self._references[reference] = self._declarations.declaration(name)
+        
+        declaration = self._declarations.declaration(name)
+        self._references[reference] = declaration
+        self._reference_slots[reference] = self._slots.referenced_slot(declaration)
     
     def enter_scope(self, scope):
+        depth = self._depth + 1
+        self._slots.add_scope(depth, self._declaration_finder.declarations_in(scope.parent))
         declarations_for_scope = self._declarations_for_scope(scope)
         
         return _Context(
             declaration_finder=self._declaration_finder,
             declarations=declarations_for_scope,
             references=self._references,
+            reference_slots=self._reference_slots,
+            slots=self._slots,
+            depth=depth,
             declarations_for_functions=self._declarations_for_functions_in_scope(scope, declarations_for_scope),
         )
     
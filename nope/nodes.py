@@ -1,19 +1,93 @@
 import sys
 import itertools
 
-import dodge
-
 
 _node_id_counter = itertools.count()
 
 
 class Node(object):
+    # Trees for every module in a program are kept in memory, so nodes use
+    # slots rather than a per-instance dict. Nodes are given a location by the
+    # parser, ephemeral nodes are given a root node during inference, and
+    # structure stores each node's children the first time they're needed.
+    __slots__ = ("node_id", "location", "_ephemeral_root_node", "_scoped_children")
+    
     def __init__(self):
         self.node_id = next(_node_id_counter)
+    
+    def __getstate__(self):
+        return dict(
+            (slot, getattr(self, slot))
+            for node_type in type(self).__mro__
+            for slot in getattr(node_type, "__slots__", ())
+            if slot not in _unpickled_slots and hasattr(self, slot)
+        )
+    
+    def __setstate__(self, state):
+        # Nodes are identified by node_id, so unpickled nodes need new IDs to
+        # avoid clashing with nodes created in this process
+        self.node_id = next(_node_id_counter)
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+
+_unpickled_slots = set(["node_id", "_scoped_children"])
 
 
 def _create_node(name, fields):
-    return dodge.data_class(name, fields, bases=(Node, ))
+    fields = tuple(fields)
+    
+    def __init__(self, *args, **kwargs):
+        self.node_id = next(_node_id_counter)
+        
+        if len(args) > len(fields):
+            raise TypeError("{0}.__init__ takes {1} positional arguments but {2} were given".format(
+                name, len(fields), len(args)))
+        
+        for field, value in zip(fields, args):
+            setattr(self, field, value)
+        
+        for field in fields[len(args):]:
+            if field not in kwargs:
+                raise TypeError("Missing argument: '{0}'".format(field))
+            setattr(self, field, kwargs.pop(field))
+        
+        for field in kwargs:
+            raise TypeError("{0}.__init__ does not take keyword argument '{1}'".format(name, field))
+    
+    def __eq__(self, other):
+        if isinstance(other, node_type):
+            return all(
+                getattr(self, field) == getattr(other, field)
+                for field in fields
+            )
+        else:
+            return NotImplemented
+    
+    def __ne__(self, other):
+        return not (self == other)
+    
+    def __repr__(self):
+        return "{0}({1})".format(name, ", ".join(
+            repr(getattr(self, field))
+            for field in fields
+        ))
+    
+    node_type = type(name, (Node, ), {
+        "__slots__": fields,
+        "_fields": fields,
+        "__init__": __init__,
+        "__eq__": __eq__,
+        "__ne__": __ne__,
+        "__repr__": __repr__,
+        "__str__": __repr__,
+        "__module__": __name__,
+    })
+    return node_type
+
+
+def fields(node):
+    return node._fields
 
 
 NoneLiteral = _create_node("NoneLiteral", [])
@@ -120,6 +194,8 @@ structural_type = StructuralTypeDefinition = _create_node("StructuralTypeDefinit
 Import = _create_node("Import", ["names"])
 ImportFrom = _create_node("ImportFrom", ["module", "names"])
 class ImportAlias(_create_node("ImportAlias", ["original_name", "asname"])):
+    __slots__ = ()
+    
     @property
     def name(self):
         if self.asname is None:
@@ -0,0 +1,154 @@
+import tempfile
+import concurrent.futures
+
+import zuice
+
+from . import errors, nodes, structure, injection
+from .check import SourceChecker, ModuleChecker, CheckCacheDir, Result, source_paths
+from .modules import LocalModule
+from .module_resolution import ModuleResolverFactory, ModuleSearchPaths
+from .source import SourceTree
+
+
+class ParallelSourceChecker(zuice.Base):
+    _cache_dir = zuice.dependency(CheckCacheDir)
+    _search_paths = zuice.dependency(ModuleSearchPaths)
+    _injector = zuice.dependency(zuice.Injector)
+    
+    def check(self, path, jobs, emit_interface=False):
+        # Workers pass the types of the modules they've checked to each other
+        # through the check cache, so we need one even if the caller doesn't
+        if self._cache_dir is None:
+            with tempfile.TemporaryDirectory() as cache_dir:
+                return self._check(path, jobs, cache_dir, emit_interface)
+        else:
+            return self._check(path, jobs, self._cache_dir, emit_interface)
+    
+    def _check(self, path, jobs, cache_dir, emit_interface):
+        checked_paths = source_paths(path)
+        
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            dependencies, failed_paths = _import_graph(executor, checked_paths, cache_dir, self._search_paths)
+            if not failed_paths:
+                failed_paths = _check_in_parallel(executor, dependencies, cache_dir, checked_paths, self._search_paths)
+        
+        if failed_paths:
+            # Check the failed module again in this process to get the error,
+            # loading the modules it depends on from the cache
+            serial_checker = self._injector.get(SourceChecker, {CheckCacheDir: cache_dir})
+            return serial_checker.check(sorted(failed_paths))
+        elif emit_interface:
+            # Interfaces are written from the types of the checked modules,
+            # which are loaded from the cache
+            serial_checker = self._injector.get(SourceChecker, {CheckCacheDir: cache_dir})
+            return serial_checker.check(path, emit_interface=True)
+        else:
+            return Result(is_valid=True, error=None, value=None)
+
+
+# The import graph is found by the workers, each parsing a module and
+# resolving its imports. Parsed modules are saved to the parse cache, so they
+# aren't parsed again when they're checked.
+def _import_graph(executor, paths, cache_dir, search_paths):
+    dependencies = {}
+    failed_paths = set()
+    found_paths = set(paths)
+    running = dict(
+        (executor.submit(_find_imported_paths, path, cache_dir, search_paths), path)
+        for path in sorted(found_paths)
+    )
+    
+    while running:
+        finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in finished:
+            path = running.pop(future)
+            imported_paths = future.result()
+            if imported_paths is None:
+                failed_paths.add(path)
+            else:
+                dependencies[path] = imported_paths
+            
+            if not failed_paths:
+                for imported_path in sorted(dependencies[path] - found_paths):
+                    found_paths.add(imported_path)
+                    running[executor.submit(_find_imported_paths, imported_path, cache_dir, search_paths)] = imported_path
+    
+    return dependencies, failed_paths
+
+
+def _check_in_parallel(executor, dependencies, cache_dir, checked_paths, search_paths):
+    remaining = dict(
+        (path, set(imported_paths))
+        for path, imported_paths in dependencies.items()
+    )
+    running = {}
+    failed_paths = set()
+    
+    while (remaining and not failed_paths) or running:
+        if not failed_paths:
+            ready_paths = [path for path, imported_paths in remaining.items() if not imported_paths]
+            if not ready_paths and not running:
+                # Circular imports: schedule everything that's left
+                ready_paths = list(remaining)
+            
+            for path in sorted(ready_paths):
+                del remaining[path]
+                running[executor.submit(_check_module, path, cache_dir, checked_paths, search_paths)] = path
+        
+        finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in finished:
+            path = running.pop(future)
+            if not future.result():
+                failed_paths.add(path)
+            for imported_paths in remaining.values():
+                imported_paths.discard(path)
+    
+    return failed_paths
+
+
+def _find_imported_paths(path, cache_dir, search_paths):
+    injector = injection.create_injector(cache_dir, search_paths)
+    try:
+        module = injector.get(SourceTree).module(path)
+    except (errors.TypeCheckError, SyntaxError):
+        return None
+    
+    module_resolver = injector.get(ModuleResolverFactory).for_module(module)
+    imported_paths = set()
+    
+    def add_import(resolve):
+        try:
+            imported_module = resolve()
+        except (errors.TypeCheckError, SyntaxError):
+            # Leave the error to be reported when the module is checked
+            return
+        
+        if isinstance(imported_module, LocalModule):
+            imported_paths.add(imported_module.path)
+    
+    for node in structure.descendants(module.node):
+        if isinstance(node, nodes.Import):
+            for alias in node.names:
+                parts = alias.original_name_parts
+                for index in range(len(parts)):
+                    add_import(lambda: module_resolver.resolve_import_path(parts[:index + 1]))
+        elif isinstance(node, nodes.ImportFrom):
+            for alias in node.names:
+                add_import(lambda: module_resolver.resolve_import_value(node.module, alias.original_name).module)
+    
+    return imported_paths
+
+
+def _check_module(path, cache_dir, checked_paths, search_paths):
+    injector = injection.create_injector(cache_dir, search_paths)
+    module_checker = injector.get(ModuleChecker)
+    module_checker.check_bodies_only_in(checked_paths)
+    try:
+        module = injector.get(SourceTree).module(path)
+        if path in checked_paths:
+            module_checker.check(module)
+        else:
+            module_checker.type_of_module(module)
+        return True
+    except (errors.TypeCheckError, SyntaxError):
+        return False
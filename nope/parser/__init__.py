@@ -3,14 +3,20 @@ import io
 
 from . import transform
 from .typing import parse_notes
-from .. import nodes
+from .. import nodes, profiling
 
 
 def parse(source, filename=None):
+    with profiling.phase("parse", filename):
+        return _parse(source, filename)
+
+
+def _parse(source, filename):
     if source.startswith("#:nope treat-as-empty"):
         return nodes.module([])
     try:
-        notes = parse_notes(io.StringIO(source))
+        with profiling.phase("parse_notes"):
+            notes = parse_notes(io.StringIO(source))
         note_seeker = NoteSeeker(notes)
         
         python_ast = ast.parse(source)
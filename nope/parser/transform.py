@@ -1,4 +1,5 @@
 import ast
+import sys
 
 from .. import nodes as _nodes
 
@@ -23,10 +24,47 @@ class _NodeBuilder(object):
 
 
 class _Location(object):
+    # Every node has a location, so the line number and offset are packed into
+    # a single int, and filenames are interned so that they're shared when
+    # trees are loaded from elsewhere
+    __slots__ = ("filename", "_position")
+    
     def __init__(self, filename, lineno, offset):
+        if filename is not None:
+            filename = sys.intern(filename)
         self.filename = filename
-        self.lineno = lineno
-        self.offset = offset
+        
+        if lineno is None:
+            self._position = None
+        else:
+            self._position = (lineno << _offset_bits) | offset
+    
+    def __getstate__(self):
+        return self.filename, self._position
+    
+    def __setstate__(self, state):
+        filename, self._position = state
+        if filename is not None:
+            filename = sys.intern(filename)
+        self.filename = filename
+    
+    @property
+    def lineno(self):
+        if self._position is None:
+            return None
+        else:
+            return self._position >> _offset_bits
+    
+    @property
+    def offset(self):
+        if self._position is None:
+            return None
+        else:
+            return self._position & _offset_mask
+
+
+_offset_bits = 32
+_offset_mask = (1 << _offset_bits) - 1
 
 
 class Converter(object):
@@ -95,6 +133,9 @@ class Converter(object):
 
     
     def convert(self, node, allowed=None):
+        return self._convert(node, self._converters.get(type(node)), allowed)
+    
+    def _convert(self, node, converter, allowed=None):
         filename = self._filename
         lineno, col_offset = self._node_location(node)
         
@@ -104,11 +145,10 @@ class Converter(object):
             type_definition = self._comment_seeker.consume_type_definition(lineno, col_offset)
             field_definition = self._comment_seeker.consume_field(lineno, col_offset)
             
-            converter = self._converters.get(type(node))
             if converter is None:
                 raise SyntaxError("syntax node not supported: {0}".format(type(node).__name__))
                 
-            nope_node = self._converters[type(node)](node)
+            nope_node = converter(node)
             
             if type_definition is not None:
                 assert nope_node == self._nodes.assign([self._nodes.ref(type_definition.name)], self._nodes.none())
@@ -240,11 +280,23 @@ class Converter(object):
     
     
     def _if(self, node):
-        return self._nodes.if_(
-            self.convert(node.test),
-            self._statements(node.body),
-            self._statements(node.orelse),
-        )
+        # Each elif is nested in the else branch of the previous if, so long
+        # if/elif ladders are converted in a loop rather than recursively
+        ladder = [node]
+        while len(ladder[-1].orelse) == 1 and isinstance(ladder[-1].orelse[0], ast.If):
+            ladder.append(ladder[-1].orelse[0])
+        
+        branches = [
+            (self.convert(if_node.test), self._statements(if_node.body))
+            for if_node in ladder
+        ]
+        false_body = self._statements(ladder[-1].orelse)
+        
+        for if_node, (condition, true_body) in reversed(list(zip(ladder[1:], branches[1:]))):
+            false_body = [self._convert(if_node, lambda if_node: self._nodes.if_(condition, true_body, false_body))]
+        
+        condition, true_body = branches[0]
+        return self._nodes.if_(condition, true_body, false_body)
     
     
     def _while(self, node):
@@ -406,7 +458,23 @@ class Converter(object):
     
     
     def _bin_op(self, node):
-        return self._operator(node.op)(self.convert(node.left), self.convert(node.right))
+        # Generated code can contain long chains such as a + b + c + ...,
+        # which nest on the left, so the left operands are converted in a loop
+        # rather than recursively
+        operations = []
+        left = node.left
+        while isinstance(left, ast.BinOp):
+            operations.append(left)
+            left = left.left
+        
+        left_node = self.convert(left)
+        for operation in reversed(operations):
+            left_node = self._convert(operation, lambda operation: self._binary_operation(operation, left_node))
+        
+        return self._binary_operation(node, left_node)
+    
+    def _binary_operation(self, node, left):
+        return self._operator(node.op)(left, self.convert(node.right))
     
     
     def _unary_op(self, node):
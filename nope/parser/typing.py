@@ -1,8 +1,5 @@
-import tokenize
-import token
-
-from funcparserlib.lexer import make_tokenizer
-from funcparserlib.parser import (some, many, maybe, finished, forward_decl, skip)
+import re
+import functools
 
 from .. import nodes
 
@@ -41,184 +38,295 @@ def parse_notes(source):
 
 
 def _notes(source):
-    tokens = tokenize.generate_tokens(source.readline)
-    lines = []
-    note_position = None
-    
-    for token_type, token_str, position, _, _ in tokens:
-        line = _extract_note_line(token_type, token_str)
-        if line is not None:
-            lines.append(line)
-            if note_position is None:
-                note_position = position
-        elif lines and _is_part_of_node(token_type):
-            note = " ".join(lines).strip()
+    source = source.read()
+    if "#:" not in source:
+        # Every note contains "#:", so there's no need to scan the source
+        return
+    
+    lines = _LineCounter(source)
+    position = 0
+    
+    while True:
+        match = _comment_or_string.search(source, position)
+        if match is None:
+            return
+        position = match.end()
+        
+        if match.group().startswith("#:"):
+            note_position = lines.position(match.start())
+            note_lines = []
+            while match is not None:
+                if match.group().startswith("#:"):
+                    note_lines.append(match.group()[2:])
+                position = _whitespace.match(source, match.end()).end()
+                match = _comment.match(source, position)
+            
+            # The note is attached to the next token. Scanning resumes from
+            # the start of that token in case it's a string.
+            note = " ".join(note_lines).strip()
             for prefix, rule in _note_parsers.items():
                 if note.startswith(prefix):
-                    yield position, (note_position, prefix, _parse(note[len(prefix):], rule))
-                    
-            lines = []
-            note_position = None
-
-
-def _extract_note_line(token_type, token_str):
-    if token_type == tokenize.COMMENT and token_str.startswith("#:"):
-        return token_str[2:]
-
-
-def _is_part_of_node(token_type):
-    return token_type not in (
-        token.NEWLINE, token.INDENT, token.DEDENT, tokenize.NL, tokenize.COMMENT
-    )
+                    try:
+                        parsed_note = _parse(note[len(prefix):], rule)
+                    except SyntaxError as error:
+                        error.lineno, error.offset = note_position
+                        raise
+                    yield lines.position(position), (note_position, prefix, parsed_note)
+
+
+# Notes are found by scanning for comments and strings rather than tokenizing
+# the entire source: strings are the only tokens that can contain "#"
+# without it starting a comment.
+_comment = re.compile(r"#[^\r\n]*")
+
+_comment_or_string = re.compile(r"""
+    \#[^\r\n]*
+    | '''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''
+    | \"\"\"[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*\"\"\"
+    | '[^\n'\\]*(?:\\.[^\n'\\]*)*'
+    | "[^\n"\\]*(?:\\.[^\n"\\]*)*"
+""", re.VERBOSE | re.DOTALL)
+
+_whitespace = re.compile(r"(?:\s|\\\r?\n)*")
+
+
+class _LineCounter(object):
+    def __init__(self, source):
+        self._source = source
+        self._offset = 0
+        self._lineno = 1
+        self._line_start = 0
+    
+    def position(self, offset):
+        # Positions are requested in order, so only the newlines since the
+        # previous request need counting
+        newlines = self._source.count("\n", self._offset, offset)
+        if newlines:
+            self._lineno += newlines
+            self._line_start = self._source.rfind("\n", self._offset, offset) + 1
+        self._offset = offset
+        
+        if offset == len(self._source) and not self._source.endswith("\n"):
+            # tokenize puts the end marker at the start of an extra line
+            return self._lineno + 1, 0
+        else:
+            return self._lineno, offset - self._line_start
 
 
 def parse_explicit_type(sig_str):
-    return _parse(sig_str, _explicit_type)
+    return _parse(sig_str, "explicit_type")
 
 
 def _parse(string, rule):
-    tokens = _tokenize_type_string(string)
-    return rule.parse(tokens)
-
-
-def _token_type(token_type):
-    return some(lambda token: token.type == token_type)
-
-
-def _make_name(result):
-    return result.value
-
+    # Each note is parsed into a builder that creates new nodes whenever it's
+    # called. Repeated notes reuse the builder, but nodes are never shared.
+    return _compile(rule, string)()
 
-def _make_type_ref(result):
-    return nodes.ref(result)
 
+@functools.lru_cache(maxsize=4096)
+def _compile(rule, string):
+    parser = _NoteParser(_tokenize_type_string(string))
+    builder = getattr(parser, rule)()
+    parser.finish()
+    return builder
 
-def _make_apply(result):
-    return nodes.type_apply(result[0], result[1])
 
-
-def _make_params(result):
-    if result is None:
-        return result
-    else:
-        return [nodes.formal_type_parameter(result[0])]
-
-
-def _make_arg(result):
-    return nodes.signature_arg(result[1], result[2], optional=result[0] is not None)
+class _NoteParser(object):
+    def __init__(self, tokens):
+        self._tokens = tokens
+        self._index = 0
     
-
-def _make_signature(result):
-    return nodes.signature(
-        type_params=result[0],
-        args=result[1],
-        returns=result[3],
-    )
-
-
-def _make_union_type(result):
-    if len(result) == 1:
-        return result[0]
-    else:
-        return nodes.type_union(result)
-
-
-def _make_type_definition(result):
-    return nodes.type_definition(result[0], result[1])
-
-
-def _make_structural_type_definition(result):
-    return nodes.structural_type(result[0], result[1])
-
-
-def _make_generic(result):
-    return list(map(nodes.formal_type_parameter, result))
-
-
-def _create_type_rules():
-    comma = _token_type("comma")
-    colon = _token_type("colon")
-    question_mark = _token_type("question-mark")
-    bar = _token_type("bar")
-    equals = _token_type("equals")
+    def explicit_type(self):
+        if self._peek(1) == "=>":
+            return self._signature()
+        
+        if self._peek() == "->":
+            args = []
+        else:
+            args = self._args()
+        
+        if self._peek() == "->":
+            return self._signature_with_args(None, args)
+        elif len(args) == 1 and args[0].is_plain_type:
+            return args[0].type
+        else:
+            self._fail()
     
-    attr_name = type_name = arg_name = _token_type("name") >> _make_name
-
-    primary_type = forward_decl()
-    union_type = _one_or_more_with_separator(primary_type, bar) >> _make_union_type
-    type_ = union_type
+    def type_definition(self):
+        name = self._name()
+        self._expect("=")
+        value = self._type()
+        return lambda: nodes.type_definition(name, value())
+    
+    def structural_type_definition(self):
+        name = self._name()
+        self._expect(":")
+        attrs = []
+        while self._peek() is not None:
+            attr_name = self._name()
+            self._expect(":")
+            attrs.append((attr_name, self.explicit_type()))
+        
+        return lambda: nodes.structural_type(name, [
+            (attr_name, attr_type())
+            for attr_name, attr_type in attrs
+        ])
+    
+    def generic(self):
+        names = [self._name()]
+        while self._accept(","):
+            names.append(self._name())
+        
+        return lambda: list(map(nodes.formal_type_parameter, names))
+    
+    def finish(self):
+        if self._peek() is not None:
+            self._fail()
+    
+    def _signature(self):
+        if self._peek(1) == "=>":
+            type_param = self._name()
+            self._next()
+        else:
+            type_param = None
+        
+        if self._peek() == "->":
+            args = []
+        else:
+            args = self._args()
+        
+        return self._signature_with_args(type_param, args)
+    
+    def _signature_with_args(self, type_param, args):
+        self._expect("->")
+        returns = self._type()
+        
+        def build():
+            if type_param is None:
+                type_params = None
+            else:
+                type_params = [nodes.formal_type_parameter(type_param)]
+            
+            return nodes.signature(
+                type_params=type_params,
+                args=[arg.build() for arg in args],
+                returns=returns(),
+            )
+        
+        return build
     
-    type_ref = type_name >> _make_type_ref
-    applied_type = (
-        type_ref +
-        skip(_token_type("open")) +
-        _one_or_more_with_separator(type_, comma) +
-        skip(_token_type("close"))
-    ) >> _make_apply
+    def _args(self):
+        args = [self._arg()]
+        while self._accept(","):
+            args.append(self._arg())
+        return args
     
-    arg = (maybe(question_mark) + maybe(arg_name + skip(colon)) + type_) >> _make_arg
+    def _arg(self):
+        optional = self._accept("?")
+        if _is_name(self._peek()) and self._peek(1) == ":":
+            name = self._name()
+            self._next()
+        else:
+            name = None
+        
+        return _ArgBuilder(name, self._type(), optional)
+    
+    def _type(self):
+        types = [self._primary_type()]
+        while self._accept("|"):
+            types.append(self._primary_type())
+        
+        if len(types) == 1:
+            return types[0]
+        else:
+            return lambda: nodes.type_union([type_() for type_ in types])
     
-    generic_params = maybe(type_name + _token_type("fat-arrow")) >> _make_params
-    args = _zero_or_more_with_separator(arg, comma)
-    signature = (generic_params + args + _token_type("arrow") + type_) >> _make_signature
-    sub_signature = (_token_type("paren-open") + signature + _token_type("paren-close")) >> (lambda result: result[1])
+    def _primary_type(self):
+        if self._accept("("):
+            signature = self._signature()
+            self._expect(")")
+            return signature
+        
+        name = self._name()
+        if self._accept("["):
+            params = [self._type()]
+            while self._accept(","):
+                params.append(self._type())
+            self._expect("]")
+            return lambda: nodes.type_apply(nodes.ref(name), [param() for param in params])
+        else:
+            return functools.partial(nodes.ref, name)
     
-    primary_type.define(sub_signature | applied_type | type_ref)
-    explicit_type = signature | type_
+    def _name(self):
+        token = self._next()
+        if not _is_name(token):
+            self._fail()
+        return token
     
-    type_definition = (type_name + skip(equals) + type_ + skip(finished))  >> _make_type_definition
+    def _expect(self, expected):
+        if self._next() != expected:
+            self._fail()
     
-    structural_type_attr = (attr_name + skip(colon) + explicit_type) >> tuple
-    structural_type_attrs = many(structural_type_attr)
+    def _accept(self, token):
+        if self._peek() == token:
+            self._index += 1
+            return True
+        else:
+            return False
     
-    structural_type_definition = (type_name + skip(colon) + structural_type_attrs + skip(finished)) >> _make_structural_type_definition
+    def _peek(self, offset=0):
+        index = self._index + offset
+        if index < len(self._tokens):
+            return self._tokens[index]
+        else:
+            return None
     
-    generic = (_one_or_more_with_separator(type_name, comma) + skip(finished)) >> _make_generic
+    def _next(self):
+        token = self._peek()
+        self._index += 1
+        return token
     
-    return explicit_type + skip(finished), type_definition, structural_type_definition, generic
+    def _fail(self):
+        token = self._peek(-1) if self._index > len(self._tokens) else self._peek()
+        if token is None:
+            raise SyntaxError("invalid type note: unexpected end of note")
+        else:
+            raise SyntaxError("invalid type note: unexpected token '{}'".format(token))
 
 
-def _one_or_more_with_separator(repeated, separator):
-    return (repeated + many(skip(separator) + repeated)) >> _make_separated
+class _ArgBuilder(object):
+    def __init__(self, name, type_, optional):
+        self.name = name
+        self.type = type_
+        self.optional = optional
+        self.is_plain_type = name is None and not optional
+    
+    def build(self):
+        return nodes.signature_arg(self.name, self.type(), optional=self.optional)
 
-def _zero_or_more_with_separator(repeated, separator):
-    return maybe(_one_or_more_with_separator(repeated, separator))
 
-def _make_separated(result):
-    if result[1]:
-        return [result[0]] + result[1]
-    else:
-        return [result[0]]
+def _is_name(token):
+    return token is not None and (token[0].isalpha() or token[0] == "_")
 
 
-_explicit_type, _type_definition, _structural_type_definition, _generic  = _create_type_rules()
-    
-    
 def _tokenize_type_string(sig_str):
-    specs = [
-        ('space', (r'[ \t]+', )),
-        ('name', (r'[A-Za-z_][A-Za-z_0-9]*', )),
-        ('fat-arrow', (r'=>', )),
-        ('arrow', (r'->', )),
-        ('comma', (r',', )),
-        ('open', (r'\[', )),
-        ('close', (r'\]', )),
-        ('paren-open', (r'\(', )),
-        ('paren-close', (r'\)', )),
-        ('colon', (r':', )),
-        ('question-mark', (r'\?', )),
-        ('bar', (r'\|', )),
-        ('equals', (r'=', )),
-    ]
-    ignore = ['space']
-    tokenizer = make_tokenizer(specs)
-    return [token for token in tokenizer(sig_str) if token.type not in ignore]
+    tokens = []
+    for match in _type_token.finditer(sig_str):
+        token, invalid_character = match.groups()
+        if invalid_character is not None:
+            raise SyntaxError("invalid type note: unexpected character '{}'".format(invalid_character))
+        tokens.append(token)
+    
+    return tokens
+
+
+_type_token = re.compile(r"[ \t]*(?:([A-Za-z_][A-Za-z_0-9]*|=>|->|[,\[\]():?|=])|([^ \t]))")
 
 
 _note_parsers = {
-    "type": _type_definition,
-    "structural-type": _structural_type_definition,
-    "generic": _generic,
-    ":": _explicit_type,
-    "field": _explicit_type,
+    "type": "type_definition",
+    "structural-type": "structural_type_definition",
+    "generic": "generic",
+    ":": "explicit_type",
+    "field": "explicit_type",
 }
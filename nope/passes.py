@@ -0,0 +1,30 @@
+from . import structure
+
+
+# Runs several analyses over a tree in a single traversal.
+#
+# Each pass is a pair of a visit function and the pass's context for the root
+# node. The visit function is called with every node in the tree, including
+# the structural nodes from the structure module, along with the pass's
+# context for that node, and returns the pass's context for the node's
+# children. Passes see each node in the order they're given.
+def run_passes(node, passes):
+    # Uses an explicit stack rather than recursion so that very deep trees,
+    # such as long chains of binary operations, can be traversed
+    stack = [(node, list(passes))]
+    while stack:
+        node, node_passes = stack.pop()
+        child_passes = [
+            (visit, visit(node, context))
+            for visit, context in node_passes
+        ]
+        
+        if structure.is_scope(node):
+            children = [node.body]
+        else:
+            children = tuple(structure.scoped_children(node))
+        
+        stack.extend(
+            (child, child_passes)
+            for child in reversed(children)
+        )
@@ -5,7 +5,7 @@ import hashlib
 
 import zuice
 
-from ... import files
+from ... import files, profiling
 from ...walk import walk_tree
 from ...injection import CouscousTree
 from . import cs
@@ -79,16 +79,17 @@ class CodeGenerator(zuice.Base):
         return cs_filenames
     
     def _generate_cs_file(self, path, dest_path):
-        module = self._source_tree.module(path)
-        transformer = Transformer(
-            module_resolver=self._module_resolver_factory({Module: module}),
-            prelude=self._prelude,
-            path_hash=self._sha1_hash,
-        )
-        cs_module = transformer.transform(module)
-        
-        with open(dest_path, "w") as dest_cs_file:
-            cs.dump(cs_module, dest_cs_file)
+        with profiling.phase("codegen", path):
+            module = self._source_tree.module(path)
+            transformer = Transformer(
+                module_resolver=self._module_resolver_factory({Module: module}),
+                prelude=self._prelude,
+                path_hash=self._sha1_hash,
+            )
+            cs_module = transformer.transform(module)
+            
+            with open(dest_path, "w") as dest_cs_file:
+                cs.dump(cs_module, dest_cs_file)
     
     def _sha1_hash(self, value):
         return hashlib.sha1(value.encode("utf8")).hexdigest()
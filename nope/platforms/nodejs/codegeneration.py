@@ -4,7 +4,7 @@ import shutil
 
 import zuice
 
-from ... import files
+from ... import files, profiling
 from ...modules import Module
 from .transform import NodeTransformer
 from . import js, operations
@@ -42,15 +42,16 @@ class CodeGenerator(zuice.Base):
         walk_tree(stdlib_path, handle_dir, handle_file)
     
     def _generate_file(self, source_path, destination_root, relative_path):
-        destination_dir = os.path.dirname(os.path.join(destination_root, relative_path))
-        module = self._source_tree.module(source_path)
-        source_filename = os.path.basename(source_path)
-        dest_filename = _js_filename(source_filename)
-        dest_path = os.path.join(destination_dir, dest_filename)
-        with open(dest_path, "w") as dest_file:
-            _generate_prelude(dest_file, module.node.is_executable, relative_path)
-            node_transformer = self._node_transformer({Module: module})
-            js.dump(node_transformer.transform(module.node), dest_file, pretty_print=True)
+        with profiling.phase("codegen", source_path):
+            destination_dir = os.path.dirname(os.path.join(destination_root, relative_path))
+            module = self._source_tree.module(source_path)
+            source_filename = os.path.basename(source_path)
+            dest_filename = _js_filename(source_filename)
+            dest_path = os.path.join(destination_dir, dest_filename)
+            with open(dest_path, "w") as dest_file:
+                _generate_prelude(dest_file, module.node.is_executable, relative_path)
+                node_transformer = self._node_transformer({Module: module})
+                js.dump(node_transformer.transform(module.node), dest_file, pretty_print=True)
         
 
 def _write_nope_js(destination_dir):
@@ -1,4 +1,4 @@
-from .. import files
+from .. import files, profiling
 
 
 class Python3(object):
@@ -7,4 +7,5 @@ class Python3(object):
     extension = "py"
     
     def generate_code(self, source, destination_dir):
-        files.copy_recursive(source, destination_dir)
+        with profiling.phase("codegen", source):
+            files.copy_recursive(source, destination_dir)
@@ -0,0 +1,115 @@
+import time
+import json
+import collections
+import contextlib
+
+
+PhaseStats = collections.namedtuple("PhaseStats", ["phase", "path", "count", "total_time", "self_time"])
+
+
+# Records the wall time spent in each phase of checking and compiling,
+# broken down by module. Phases nest (for instance, checking a module may
+# parse the modules it imports), so the self time of a phase excludes time
+# spent in phases started within it. Phases started without a path inherit
+# the path of the enclosing phase.
+class Profiler(object):
+    def __init__(self):
+        self._stats = {}
+        self._active = []
+    
+    @contextlib.contextmanager
+    def phase(self, name, path=None):
+        if path is None and self._active:
+            path = self._active[-1][1]
+        
+        frame = [name, path, 0]
+        self._active.append(frame)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self._active.pop()
+            if self._active:
+                self._active[-1][2] += elapsed
+            
+            count, total_time, self_time = self._stats.get((name, path), (0, 0, 0))
+            self._stats[(name, path)] = (count + 1, total_time + elapsed, self_time + elapsed - frame[2])
+    
+    def stats(self):
+        return sorted(
+            (
+                PhaseStats(phase, path, count, total_time, self_time)
+                for (phase, path), (count, total_time, self_time) in self._stats.items()
+            ),
+            key=lambda stats: stats.self_time,
+            reverse=True,
+        )
+    
+    def phase_totals(self):
+        totals = {}
+        for stats in self.stats():
+            count, total_time, self_time = totals.get(stats.phase, (0, 0, 0))
+            totals[stats.phase] = (count + stats.count, total_time + stats.total_time, self_time + stats.self_time)
+        
+        return sorted(
+            (
+                PhaseStats(phase, None, count, total_time, self_time)
+                for phase, (count, total_time, self_time) in totals.items()
+            ),
+            key=lambda stats: stats.self_time,
+            reverse=True,
+        )
+    
+    def print_report(self):
+        print("Phases:")
+        _print_stats(self.phase_totals())
+        print()
+        print("Modules:")
+        _print_stats(self.stats())
+    
+    def write_json(self, output_file):
+        json.dump([stats._asdict() for stats in self.stats()], output_file, indent=4)
+
+
+def _print_stats(all_stats):
+    print("{:>10} {:>10} {:>8}  {}".format("self (s)", "total (s)", "count", "phase"))
+    for stats in all_stats:
+        if stats.path is None:
+            description = stats.phase
+        else:
+            description = "{} {}".format(stats.phase, stats.path)
+        print("{:10.4f} {:10.4f} {:8}  {}".format(stats.self_time, stats.total_time, stats.count, description))
+
+
+class _NullProfiler(object):
+    def phase(self, name, path=None):
+        return _null_phase
+
+
+class _NullPhase(object):
+    def __enter__(self):
+        pass
+    
+    def __exit__(self, *args):
+        pass
+
+
+_null_phase = _NullPhase()
+_profiler = _NullProfiler()
+
+
+def phase(name, path=None):
+    return _profiler.phase(name, path)
+
+
+@contextlib.contextmanager
+def profile(profiler):
+    global _profiler
+    
+    previous_profiler = _profiler
+    _profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _profiler = previous_profiler
@@ -0,0 +1,91 @@
+import os
+import json
+import socket
+import socketserver
+
+import zuice
+
+from . import platforms, interfaces
+from .check import ModuleChecker, source_paths
+from .source import SourceTree
+from .module_resolution import ModuleResolutionCache
+from .watch import Watcher
+
+
+# Keeps the parsed and checked modules from previous requests, along with
+# the builtins and platforms, so that each request only pays for the modules
+# that have changed since the last one
+class Session(zuice.Base):
+    _source_tree = zuice.dependency(SourceTree)
+    _module_checker = zuice.dependency(ModuleChecker)
+    _resolution_cache = zuice.dependency(ModuleResolutionCache)
+    _injector = zuice.dependency(zuice.Injector)
+    
+    @zuice.init
+    def init(self):
+        self._watcher = Watcher(
+            source_tree=self._source_tree,
+            module_checker=self._module_checker,
+            resolution_cache=self._resolution_cache,
+        )
+    
+    def check(self, path, emit_interface=False):
+        result = self._watcher.check(path)
+        if result.is_valid and emit_interface:
+            interfaces.write_interfaces(source_paths(path), self._source_tree, self._module_checker)
+        return result
+    
+    def compile(self, source_path, destination_dir, platform_name):
+        result = self.check(source_path)
+        
+        if not result.is_valid:
+            raise result.error
+        
+        platform_class = platforms.find_platform_by_name(platform_name)
+        platform = self._injector.get(platform_class, {ModuleChecker: self._module_checker})
+        platform.generate_code(source_path, destination_dir)
+
+
+def create_server(socket_path, handle_request):
+    if os.path.exists(socket_path):
+        _remove_stale_socket(socket_path)
+    
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            request = json.loads(self.rfile.readline().decode("utf8"))
+            response = handle_request(request)
+            self.wfile.write(json.dumps(response).encode("utf8"))
+    
+    return socketserver.UnixStreamServer(socket_path, RequestHandler)
+
+
+def send_request(socket_path, request):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode("utf8") + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        
+        response = []
+        while True:
+            data = client.recv(4096)
+            if not data:
+                break
+            response.append(data)
+        
+        return json.loads(b"".join(response).decode("utf8"))
+    finally:
+        client.close()
+
+
+def _remove_stale_socket(socket_path):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.remove(socket_path)
+        return
+    finally:
+        client.close()
+    
+    raise Exception("Server already running on {}".format(socket_path))
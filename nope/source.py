@@ -1,8 +1,9 @@
 import os
+import io
 
 import zuice
 
-from . import parser
+from . import parser, profiling, files
 from .modules import LocalModule
 
 
@@ -16,6 +17,12 @@ class CachedSourceTree(object):
             self._asts[path] = self._source_tree.module(path)
         
         return self._asts[path]
+    
+    def paths(self):
+        return list(self._asts)
+    
+    def invalidate(self, path):
+        self._asts.pop(path, None)
 
 
 class TransformingSourceTree(object):
@@ -24,11 +31,44 @@ class TransformingSourceTree(object):
         self._transform = transform
     
     def module(self, path):
-        module = self._source_tree.module(path)
+        return self._transformed(self._source_tree.module(path))
+    
+    def parse(self, path, contents):
+        return self._transformed(self._source_tree.parse(path, contents))
+    
+    def _transformed(self, module):
         if module is None:
             return None
         else:
-            return LocalModule(module.path, self._transform(module.node))
+            with profiling.phase("transform", module.path):
+                return LocalModule(module.path, self._transform(module.node))
+
+
+class ParseCachingSourceTree(object):
+    def __init__(self, source_tree, parse_cache):
+        self._source_tree = source_tree
+        self._parse_cache = parse_cache
+    
+    def module(self, path):
+        # The file is only read once, so the entry that's saved describes
+        # exactly the contents that were parsed
+        with profiling.phase("parse_cache", path):
+            snapshot = files.read_snapshot(path)
+            if snapshot is None:
+                module_node = None
+            else:
+                module_node = self._parse_cache.load(path, snapshot)
+        
+        if module_node is not None:
+            return LocalModule(path, module_node)
+        
+        if snapshot is None:
+            return self._source_tree.module(path)
+        
+        module = self._source_tree.parse(path, snapshot.contents)
+        with profiling.phase("parse_cache", path):
+            self._parse_cache.save(path, snapshot, module.node)
+        return module
 
 
 class FileSystemSourceTree(object):
@@ -36,9 +76,13 @@ class FileSystemSourceTree(object):
         if not os.path.exists(path) or not os.path.isfile(path):
             return None
                 
-        with open(path) as source_file:
-            module_node = parser.parse(source_file.read(), filename=path)
-            return LocalModule(path, module_node)
+        with open(path, "rb") as source_file:
+            return self.parse(path, source_file.read())
+    
+    def parse(self, path, contents):
+        # Decoded in the same way as reading the file in text mode
+        source = io.TextIOWrapper(io.BytesIO(contents)).read()
+        return LocalModule(path, parser.parse(source, filename=path))
 
 
 class CircularImportError(Exception):
@@ -16,6 +16,16 @@ class Branch(object):
         self.body = filter(None, body)
 
 
+# Loop and finally bodies are marked so that analyses can tell them apart
+# from other branches
+class LoopBody(Branch):
+    pass
+
+
+class FinallyBody(Branch):
+    pass
+
+
 class ExhaustiveBranches(object):
     def __init__(self, branches):
         self.branches = branches
@@ -34,23 +44,59 @@ def children(node, type_lookup=None):
 
 
 def descendants(node):
-    for child in children(node):
+    # Nodes are visited in pre-order using an explicit stack so that deeply
+    # nested trees don't exhaust the Python stack
+    stack = list(reversed(tuple(children(node))))
+    while stack:
+        child = stack.pop()
         yield child
-        yield from descendants(child)
+        stack.extend(reversed(tuple(children(child))))
 
 
 def scoped_children(node, type_lookup=None):
     if isinstance(node, nodes.WithStatement):
         return _with_statement(node, type_lookup)
+    elif isinstance(node, nodes.Node):
+        # Nodes aren't changed once they've been created, so the children of
+        # each node are only found once. Lists of children are flattened, and
+        # the structural nodes are kept so later traversals don't need to
+        # create them again.
+        try:
+            return node._scoped_children
+        except AttributeError:
+            children = node._scoped_children = _flatten(_children[type(node)](node))
+            return children
     else:
         return filter(None, _children[type(node)](node))
 
 
+def _flatten(children):
+    flattened = []
+    for child in children:
+        if child is None:
+            pass
+        elif isinstance(child, _sequence_types):
+            flattened.extend(_flatten(child))
+        else:
+            if isinstance(child, (Scope, Branch)):
+                child.body = _flatten(child.body)
+            elif isinstance(child, ExhaustiveBranches):
+                child.branches = tuple(map(_flatten, child.branches))
+            flattened.append(child)
+    
+    return tuple(flattened)
+
+
+_sequence_types = (list, tuple, type({}.values()))
+
+
 _children = {
     list: lambda node: node,
     tuple: lambda node: node,
     type({}.values()): lambda node: node,
     Branch: lambda node: node.body,
+    LoopBody: lambda node: node.body,
+    FinallyBody: lambda node: node.body,
     ExhaustiveBranches: lambda node: node.branches,
     Delete: lambda node: [node.target],
     
@@ -79,17 +125,17 @@ _children = {
     
     nodes.IfElse: lambda node: [node.condition, ExhaustiveBranches([node.true_body, node.false_body])],
     
-    nodes.WhileLoop: lambda node: [node.condition, Branch(node.body), Branch(node.else_body)],
+    nodes.WhileLoop: lambda node: [node.condition, LoopBody(node.body), Branch(node.else_body)],
     
     nodes.ForLoop: lambda node: [
         node.iterable,
-        Branch([nodes.Target(node.target), node.body]),
+        LoopBody([nodes.Target(node.target), node.body]),
         Branch(node.else_body),
     ],
     
     nodes.BreakStatement: lambda node: [],
     nodes.ContinueStatement: lambda node: [],
-    nodes.TryStatement: lambda node: [Branch(node.body), node.handlers, Branch(node.finally_body)],
+    nodes.TryStatement: lambda node: [Branch(node.body), node.handlers, FinallyBody(node.finally_body)],
     
     nodes.ExceptHandler: lambda node: [
         node.type,
@@ -1,53 +1,78 @@
 import zuice
-import dodge
 
-from . import builtins, name_resolution, nodes
+from . import name_declaration, name_resolution, nodes, structure
 
 
-ModuleName = zuice.key("ModuleName")
-FuncName = zuice.key("FuncName")
+ClassBuilders = zuice.key("ClassBuilders")
+
+default_class_builders = [
+    ("collections", "namedtuple"),
+    ("dodge", "data_class"),
+]
+
 
 class ClassBuilderTransform(zuice.Base):
     _name_resolver = zuice.dependency(name_resolution.NameResolver)
-    _module_name = zuice.dependency(ModuleName)
-    _func_name = zuice.dependency(FuncName)
+    _class_builders = zuice.dependency(ClassBuilders)
     
     def __call__(self, module_node):
+        # Class builders can only be called on modules that have been
+        # imported, so modules that don't import any of them are left alone
+        # without resolving names
+        imported_modules = self._imported_builder_modules(module_node)
+        if not imported_modules:
+            return module_node
+        
         references = self._name_resolver.resolve(module_node)
         
-        return self._transform(module_node, references)
+        return self._transform(module_node, _Context(references, imported_modules))
+    
+    def _imported_builder_modules(self, module_node):
+        builder_module_names = set(module_name for module_name, _ in self._class_builders)
+        imported_modules = {}
+        
+        for node in structure.descendants(module_node):
+            if isinstance(node, nodes.Import):
+                for alias in node.names:
+                    if alias.original_name in builder_module_names:
+                        imported_modules.setdefault(alias.name, set()).add(alias.original_name)
+        
+        return imported_modules
     
-    def _transform(self, node, references):
-        if self._is_class_builder_assignment(node, references):
-            return self._transform_assignment(node, references)
+    def _transform(self, node, context):
+        class_builder = self._find_class_builder(node, context)
+        if class_builder is None:
+            return self._map_nodes(node, context)
         else:
-            return self._map_nodes(node, references)
+            return self._transform_assignment(node, class_builder)
     
-    def _is_class_builder_assignment(self, node, references):
+    def _find_class_builder(self, node, context):
         if not isinstance(node, nodes.Assignment):
-            return False
+            return None
         
         if not isinstance(node.value, nodes.Call):
-            return False
+            return None
         
         call = node.value
         callee = call.func
         
         if not isinstance(callee, nodes.AttributeAccess):
-            return False
+            return None
         
         if not isinstance(callee.value, nodes.VariableReference):
-            return False
-        
-        if not references.referenced_declaration(callee.value) != builtins.builtin_modules[self._module_name]:
-            return False
+            return None
         
-        if callee.attr != self._func_name:
-            return False
+        module_names = context.imported_modules.get(callee.value.name, ())
+        for module_name in module_names:
+            if (module_name, callee.attr) in self._class_builders:
+                declaration = context.references.referenced_declaration(callee.value)
+                if isinstance(declaration, name_declaration.ImportDeclarationNode):
+                    return module_name, callee.attr
         
-        return True
+        return None
 
-    def _transform_assignment(self, node, references):
+    def _transform_assignment(self, node, class_builder):
+        module_name, func_name = class_builder
         call = node.value
         callee = call.func
         
@@ -65,7 +90,7 @@ class ClassBuilderTransform(zuice.Base):
         
         def _read_attribute(attribute_node):
             if not isinstance(attribute_node, nodes.FieldDefinition):
-                raise Exception("fields of {}.{} must be declared as a field using :field".format(self._module_name, self._func_name))
+                raise Exception("fields of {}.{} must be declared as a field using :field".format(module_name, func_name))
             
             name_node = attribute_node.name
             assert isinstance(name_node, nodes.StringLiteral)
@@ -102,13 +127,15 @@ class ClassBuilderTransform(zuice.Base):
             ]
         )
         
-    def _map_nodes(self, node, references):
-        fields = [
-            self._transform_field(getattr(node, field.name), references)
-            for field in dodge.fields(node)
-        ]
+    def _map_nodes(self, node, context):
+        fields = [getattr(node, field) for field in nodes.fields(node)]
+        new_fields = [self._transform_field(field, context) for field in fields]
+        
+        # Only rebuild nodes that contain a transformed node
+        if all(new_field is field for field, new_field in zip(fields, new_fields)):
+            return node
         
-        new_node = type(node)(*fields)
+        new_node = type(node)(*new_fields)
         # TODO: test location preservation
         location = getattr(node, "location", None)
         if location is not None:
@@ -116,17 +143,31 @@ class ClassBuilderTransform(zuice.Base):
         
         return new_node
     
-    def _transform_field(self, field, references):
-        if isinstance(field, tuple):
-            return tuple(self._transform_field(element, references) for element in field)
-        if isinstance(field, list):
-            return [self._transform_field(element, references) for element in field]
+    def _transform_field(self, field, context):
+        if isinstance(field, (list, tuple)):
+            elements = [self._transform_field(element, context) for element in field]
+            if all(new_element is element for element, new_element in zip(field, elements)):
+                return field
+            elif isinstance(field, tuple):
+                return tuple(elements)
+            else:
+                return elements
         elif isinstance(field, dict):
-            return dict(
-                (key, self._transform_field(value, references))
+            values = dict(
+                (key, self._transform_field(value, context))
                 for key, value in field.items()
             )
+            if all(values[key] is value for key, value in field.items()):
+                return field
+            else:
+                return values
         elif isinstance(field, (type(None), bool, int, str)):
             return field
         else:
-            return self._transform(field, references)
+            return self._transform(field, context)
+
+
+class _Context(object):
+    def __init__(self, references, imported_modules):
+        self.references = references
+        self.imported_modules = imported_modules
@@ -1,10 +1,12 @@
+import weakref
 import collections
 
 import zuice
 
-from ..identity_dict import NodeDict
+from ..identity_dict import NodeDict, NodeTable
 from .. import caching
 from ..iterables import find
+from . import attributes as _attributes
 from .attributes import attrs_from_iterable, Attribute, EmptyAttributes
 from .classes import class_type, is_class_type
 from .structural import structural_type, is_structural_type
@@ -12,6 +14,7 @@ from .generics import (
     generic, unnamed_generic, generic_class, generic_structural_type, generic_func,
     invariant, covariant, contravariant, Variance as _Variance,
     is_formal_parameter, is_generic_type, is_instantiated_type, is_generic_func,
+    instantiation_cache_stats,
 )
 
 
@@ -22,22 +25,33 @@ MetaType = collections.namedtuple("MetaType", ["type", "attrs"])
     
 
 class _FunctionType(object):
+    _hash = None
+    
     def __init__(self, args, return_type):
         self.args = tuple(args)
         self.return_type = return_type
         self.attrs = EmptyAttributes()
     
     def __eq__(self, other):
+        if self is other:
+            return True
+        
         if not isinstance(other, _FunctionType):
             return False
         
-        return (self.args, self.return_type) == (other.args, other.return_type)
+        return hash(self) == hash(other) and (self.args, self.return_type) == (other.args, other.return_type)
     
     def __neq__(self, other):
         return not (self == other)
     
     def __hash__(self):
-        return hash((self.args, self.return_type))
+        if self._hash is None:
+            self._hash = hash((self.args, self.return_type))
+        return self._hash
+    
+    def __getstate__(self):
+        # Hashes of strings differ between processes
+        return _without_cached_values(self.__dict__)
     
     def __str__(self):
         args_str = ", ".join(map(str, self.args))
@@ -48,12 +62,17 @@ class _FunctionType(object):
 
 
 class _FunctionTypeArgument(object):
+    _hash = None
+    
     def __init__(self, name, type_, optional):
         self.name = name
         self.type = type_
         self.optional = optional
     
     def __eq__(self, other):
+        if self is other:
+            return True
+        
         if not isinstance(other, _FunctionTypeArgument):
             return False
         
@@ -63,7 +82,12 @@ class _FunctionTypeArgument(object):
         return not (self == other)
     
     def __hash__(self):
-        return hash((self.name, self.type, self.optional))
+        if self._hash is None:
+            self._hash = hash((self.name, self.type, self.optional))
+        return self._hash
+    
+    def __getstate__(self):
+        return _without_cached_values(self.__dict__)
     
     def __str__(self):
         if self.name is None:
@@ -77,18 +101,37 @@ class _FunctionTypeArgument(object):
             return with_name
 
 
+# Function, argument and union types are hash-consed: creating a type that's
+# structurally identical to an existing type returns the existing type, so
+# repeated signatures share memory and usually compare by identity. Types that
+# are equal but not identical, such as unions with members in a different
+# order, or types loaded from the check cache, still compare structurally.
+_interned_types = weakref.WeakValueDictionary()
+
+
+def _intern(key, create):
+    interned_type = _interned_types.get(key)
+    if interned_type is None:
+        interned_type = _interned_types[key] = create()
+    return interned_type
+
+
 def func(args, return_type):
     def convert_arg(arg):
         if isinstance(arg, _FunctionTypeArgument):
             return arg
         else:
-            return _FunctionTypeArgument(None, arg, optional=False)
+            return func_arg(None, arg)
     
-    return _FunctionType(list(map(convert_arg, args)), return_type)
+    args = tuple(map(convert_arg, args))
+    return _intern(("func", args, return_type), lambda: _FunctionType(args, return_type))
 
 
 def func_arg(name, type, optional=False):
-    return _FunctionTypeArgument(name, type, optional=optional)
+    return _intern(
+        ("func_arg", name, type, optional),
+        lambda: _FunctionTypeArgument(name, type, optional=optional),
+    )
 
 
 def is_func_type(type_):
@@ -98,6 +141,9 @@ def is_func_type(type_):
 
 
 class _UnionTypeBase(object):
+    _hash = None
+    _type_set = None
+    
     def __init__(self, types):
         self._types = tuple(types)
         self.attrs = EmptyAttributes()
@@ -109,15 +155,35 @@ class _UnionTypeBase(object):
         return "{}({})".format(self._union_type_name, ", ".join(map(repr, self._types)))
     
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, _UnionTypeBase):
             return False
-        return (self._union_type_name, frozenset(self._types)) == (other._union_type_name, frozenset(other._types))
+        return (self._union_type_name, self._types_as_set()) == (other._union_type_name, other._types_as_set())
     
     def __hash__(self):
-        return hash((self._union_type_name, frozenset(self._types)))
+        if self._hash is None:
+            self._hash = hash((self._union_type_name, self._types_as_set()))
+        return self._hash
     
     def __neq__(self, other):
         return not (self == other)
+    
+    def __getstate__(self):
+        return _without_cached_values(self.__dict__)
+    
+    def _types_as_set(self):
+        if self._type_set is None:
+            self._type_set = frozenset(self._types)
+        return self._type_set
+
+
+def _without_cached_values(state):
+    return dict(
+        (key, value)
+        for key, value in state.items()
+        if key not in ["_hash", "_type_set"]
+    )
 
 
 class _UnionType(_UnionTypeBase):
@@ -138,7 +204,8 @@ def union(*types):
     if len(unique_types) == 1:
         return next(iter(unique_types))
     else:
-        return _UnionType(list(unique_types.keys()))
+        union_types = tuple(unique_types.keys())
+        return _intern(("union", union_types), lambda: _UnionType(union_types))
 
 
 def is_union_type(type_):
@@ -156,7 +223,7 @@ def remove(original, to_remove):
 def overloaded_func(*func_types):
     for func_type in func_types:
         assert is_func_type(func_type)
-    return _OverloadedFunctionType(func_types)
+    return _intern(("overloaded_func", func_types), lambda: _OverloadedFunctionType(func_types))
 
 
 def is_overloaded_func_type(type_):
@@ -167,13 +234,95 @@ def is_equivalent_type(first_type, second_type):
     return is_sub_type(first_type, second_type) and is_sub_type(second_type, first_type)
 
 
+SubTypeCacheStats = collections.namedtuple("SubTypeCacheStats", ["hits", "misses", "size"])
+
+
+class _SubTypeCache(object):
+    # Results of sub-typing queries without unification, shared between calls.
+    # Types are held weakly so that the cache doesn't keep alive types, such as
+    # generic instantiations, that are otherwise unused. Types that can't be
+    # held weakly, such as meta types, aren't cached.
+    #
+    # Adding attributes to a type can change the result of a query that
+    # compared attributes, so those results are only used until attributes are
+    # next added to any type. Other results, such as those between classes,
+    # don't depend on attributes, so are kept.
+    
+    def __init__(self, max_size):
+        self._max_size = max_size
+        self._results = weakref.WeakKeyDictionary()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+    
+    def get(self, super_type, sub_type):
+        try:
+            result, attrs_version = self._results[super_type][sub_type]
+        except (KeyError, TypeError):
+            self._misses += 1
+            return _missing
+        
+        if attrs_version is not None and attrs_version != _attributes.version():
+            self._misses += 1
+            return _missing
+        
+        self._hits += 1
+        return result
+    
+    def put(self, super_type, sub_type, result, depends_on_attrs):
+        if self._size >= self._max_size:
+            self._results.clear()
+            self._size = 0
+        
+        if depends_on_attrs:
+            attrs_version = _attributes.version()
+        else:
+            attrs_version = None
+        
+        try:
+            results_for_super_type = self._results.get(super_type)
+            if results_for_super_type is None:
+                results_for_super_type = self._results[super_type] = weakref.WeakKeyDictionary()
+            results_for_super_type[sub_type] = (result, attrs_version)
+        except TypeError:
+            return
+        
+        self._size += 1
+    
+    def stats(self):
+        return SubTypeCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            size=sum(len(results) for results in self._results.values()),
+        )
+
+
+_missing = object()
+_sub_type_cache = _SubTypeCache(max_size=100000)
+
+
+def sub_type_cache_stats():
+    return _sub_type_cache.stats()
+
+
 def is_sub_type(super_type, sub_type, unify=None):
-    if unify is None:
-        unify = set()
-    else:
-        unify = set(unify)
+    if unify:
+        result, depends_on_attrs = _is_sub_type(super_type, sub_type, set(unify))
+        return result
+    
+    result = _sub_type_cache.get(super_type, sub_type)
+    if result is _missing:
+        result, depends_on_attrs = _is_sub_type(super_type, sub_type, set())
+        _sub_type_cache.put(super_type, sub_type, result, depends_on_attrs)
+    return result
+
+
+# Returns whether the types are sub-types, along with whether that depended on
+# the attributes of any type
+def _is_sub_type(super_type, sub_type, unify):
     
     constraints = Constraints()
+    attrs_compared = []
 
     def is_matching_type(formal_type_param, super_type_param, sub_type_param):
         if formal_type_param.variance == _Variance.Covariant:
@@ -238,6 +387,7 @@ def is_sub_type(super_type, sub_type, unify=None):
             return True
         
         if is_structural_type(super_type):
+            attrs_compared.append(super_type)
             return all(
                 attr.name in sub_type.attrs and is_sub_type(attr.type, sub_type.attrs.type_of(attr.name))
                 for attr in super_type.attrs
@@ -259,9 +409,9 @@ def is_sub_type(super_type, sub_type, unify=None):
 
     
     if is_sub_type(super_type, sub_type):
-        return constraints.resolve()
+        return constraints.resolve(), bool(attrs_compared)
     else:
-        return None
+        return None, bool(attrs_compared)
 
 
 def _instance_of_same_generic_type(first, second):
@@ -411,7 +561,7 @@ def is_module(value):
 
 class TypeLookup(object):
     def __init__(self, types):
-        assert isinstance(types, NodeDict)
+        assert isinstance(types, (NodeDict, NodeTable))
         
         self._types = types
     
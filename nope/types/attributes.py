@@ -9,6 +9,15 @@ class Attribute(object):
         return "_Attribute({}, {}, {})".format(self.name, self.type, self.read_only)
 
 
+# Incremented whenever attributes are added to a type, so that results that
+# depend on the attributes of types, such as sub-typing, can be discarded
+_version = 0
+
+
+def version():
+    return _version
+
+
 def attrs_from_iterable(attrs):
     return _Attributes(dict((attr.name, attr) for attr in (attrs or [])))
 
@@ -18,10 +27,13 @@ class _Attributes(object):
         self._attrs = attrs
     
     def add(self, name, type_, read_only=True):
+        global _version
+        
         if name in self._attrs:
             raise Exception("attribute '{0}' is already set: {1}".format(name, self._attrs[name]))
             
         self._attrs[name] = Attribute(name, type_, read_only=read_only)
+        _version += 1
     
     def get(self, name):
         return self._attrs.get(name)
@@ -12,6 +12,11 @@ class _ClassType(object):
     
     def __repr__(self):
         return str(self)
+    
+    def __reduce__(self):
+        # Restore the name before the attributes so that the class can be
+        # named when unpickling instantiations of generic types over itself
+        return (_ClassType, (self.name, None, None), self.__dict__)
 
 
 def is_class_type(type_):
@@ -1,3 +1,6 @@
+import weakref
+import collections
+
 from .attributes import EmptyAttributes, attrs_from_iterable
 from .classes import class_type
 from .structural import structural_type
@@ -18,10 +21,10 @@ class _GenericType(object):
         self.params = params
         self._create_type = create_type
         self._complete_type = complete_type
-        # TODO: the cache lives too long -- for instance,
-        # builtin types such as int will never evict anything from the cache,
-        # and will never be deleted, meaning it will grow on each compilation
-        self._generic_cache = {}
+    
+    @property
+    def name(self):
+        return self._name
     
     def __call__(self, *args):
         return self.instantiate(args)
@@ -32,16 +35,16 @@ class _GenericType(object):
         
         params = tuple(params)
         
-        if params not in self._generic_cache:
+        def create():
             new_type = self._create_type(_instantiated_type_name(self._name, params), *params)
-            self._generic_cache[params] = _InstantiatedType(
+            return _InstantiatedType(
                 self,
                 params,
                 new_type,
                 lambda: self._complete_type(new_type, *params),
             )
         
-        return self._generic_cache[params]
+        return _instantiation_cache.get(self, params, create)
     
     def is_instantiated_type(self, other):
         return (
@@ -54,7 +57,60 @@ def is_generic_type(type_):
     return isinstance(type_, _GenericType)
 
 
+InstantiationCacheStats = collections.namedtuple("InstantiationCacheStats", ["hits", "misses", "evictions", "size"])
+
+
+class _InstantiationCache(object):
+    # Instantiations are held weakly so that they're freed once nothing refers
+    # to them, even for builtin generic types that live forever. The most
+    # recently used instantiations are also held strongly so that they aren't
+    # rebuilt each time they're used.
+    
+    def __init__(self, max_recent):
+        self._max_recent = max_recent
+        self._instantiations = weakref.WeakValueDictionary()
+        self._recent = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    def get(self, generic_type, params, create):
+        key = (generic_type, params)
+        instantiated_type = self._instantiations.get(key)
+        
+        if instantiated_type is None:
+            self._misses += 1
+            instantiated_type = self._instantiations[key] = create()
+        else:
+            self._hits += 1
+        
+        self._recent[key] = instantiated_type
+        self._recent.move_to_end(key)
+        if len(self._recent) > self._max_recent:
+            self._recent.popitem(last=False)
+            self._evictions += 1
+        
+        return instantiated_type
+    
+    def stats(self):
+        return InstantiationCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._instantiations),
+        )
+
+
+_instantiation_cache = _InstantiationCache(max_recent=1000)
+
+
+def instantiation_cache_stats():
+    return _instantiation_cache.stats()
+
+
 class _InstantiatedType(object):
+    _hash = None
+    
     def __init__(self, generic_type, type_params, underlying_type, complete_type):
         self.generic_type = generic_type
         self.type_params = type_params
@@ -79,6 +135,26 @@ class _InstantiatedType(object):
     def reify(self):
         self._ensure_complete()
         return self._underlying_type
+    
+    def __eq__(self, other):
+        if self is other:
+            return True
+        
+        if not isinstance(other, _InstantiatedType):
+            return False
+        
+        return (
+            hash(self) == hash(other) and
+            (self.generic_type, self.type_params) == (other.generic_type, other.type_params)
+        )
+    
+    def __ne__(self, other):
+        return not (self == other)
+    
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self.generic_type, self.type_params))
+        return self._hash
         
     def __str__(self):
         return str(self._underlying_type)
@@ -0,0 +1,68 @@
+import time
+
+import zuice
+
+from . import files
+from .check import ModuleChecker, SourceChecker, source_paths
+from .source import SourceTree
+from .module_resolution import ModuleResolutionCache
+
+
+class Watcher(zuice.Base):
+    _source_tree = zuice.dependency(SourceTree)
+    _module_checker = zuice.dependency(ModuleChecker)
+    _resolution_cache = zuice.dependency(ModuleResolutionCache)
+    
+    @zuice.init
+    def init(self):
+        self._source_checker = SourceChecker(
+            source_tree=self._source_tree,
+            module_checker=self._module_checker,
+        )
+        self._file_stats = {}
+    
+    def watch(self, path, on_result, interval):
+        while True:
+            if self._changed_paths(self._current_file_stats(path)):
+                on_result(self.check(path))
+            time.sleep(interval)
+    
+    def check(self, path):
+        # Only the changed modules and the modules that import them are
+        # checked again, the rest are already in the module checker
+        file_stats = self._current_file_stats(path)
+        for changed_path in self._changed_paths(file_stats):
+            self._source_tree.invalidate(changed_path)
+            self._module_checker.invalidate(changed_path)
+            self._resolution_cache.invalidate(changed_path)
+        self._file_stats.update(file_stats)
+        
+        result = self._source_checker.check(path)
+        
+        # Start watching any modules that were loaded for the first time
+        for loaded_path, file_stat in self._current_file_stats(path).items():
+            self._file_stats.setdefault(loaded_path, file_stat)
+        
+        return result
+    
+    def _changed_paths(self, file_stats):
+        return set(
+            changed_path
+            for changed_path, file_stat in file_stats.items()
+            if file_stat != self._file_stats.get(changed_path)
+        )
+    
+    def _current_file_stats(self, path):
+        # Modules outside of the checked paths, such as those found on the
+        # search path, are watched once they've been loaded. Directories
+        # searched when resolving imports are watched so that modules added to
+        # them are found.
+        paths = (
+            set(source_paths(path)) |
+            set(self._source_tree.paths()) |
+            set(self._resolution_cache.directories())
+        )
+        return dict(
+            (source_path, files.file_stat(source_path))
+            for source_path in paths
+        )
@@ -27,7 +27,6 @@ setup(
     ],
     scripts=['scripts/nope'],
     install_requires=[
-        "funcparserlib==0.3.6",
         "dodge>=0.1.9,<0.2",
         "zuice>=0.3.0,<0.4",
     ],
@@ -0,0 +1,57 @@
+import os
+
+from nose.tools import istest, assert_equal
+import tempman
+
+import nope
+from benchmarks.generator import generate_program, program_options, generate_binary_chain_source, generate_long_module_source
+
+
+@istest
+def generated_program_type_checks():
+    _assert_generated_program_type_checks(program_options())
+
+
+@istest
+def generated_program_with_many_imports_and_deep_nesting_type_checks():
+    _assert_generated_program_type_checks(program_options(module_count=20, fan_out=5, function_size=50, nesting_depth=5))
+
+
+@istest
+def generated_program_without_classes_type_checks():
+    _assert_generated_program_type_checks(program_options(class_density=0, generic_density=0))
+
+
+@istest
+def generated_program_has_one_module_per_module_count():
+    with tempman.create_temp_dir() as temp_dir:
+        generate_program(temp_dir.path, program_options(module_count=7))
+        
+        module_names = os.listdir(os.path.join(temp_dir.path, "generated"))
+        assert_equal(8, len(module_names))
+
+
+def _assert_generated_program_type_checks(options):
+    with tempman.create_temp_dir() as temp_dir:
+        generate_program(temp_dir.path, options)
+        result = nope.check(temp_dir.path)
+        assert result.is_valid, result.error
+
+
+@istest
+def deep_binary_chain_type_checks():
+    _assert_source_type_checks(generate_binary_chain_source(5000))
+
+
+@istest
+def long_module_type_checks():
+    _assert_source_type_checks(generate_long_module_source(1000))
+
+
+def _assert_source_type_checks(source):
+    with tempman.create_temp_dir() as temp_dir:
+        path = os.path.join(temp_dir.path, "main.py")
+        with open(path, "w") as source_file:
+            source_file.write(source)
+        result = nope.check(path)
+        assert result.is_valid, result.error
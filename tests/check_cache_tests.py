@@ -0,0 +1,248 @@
+import os
+
+from nose.tools import istest, assert_equal, assert_is
+import tempman
+
+import nope
+from nope import injection, inference, types, nodes
+from nope.check import ModuleChecker
+from nope.check_cache import FileSystemCheckCache, FileSystemParseCache
+from nope.source import SourceTree, FileSystemSourceTree, ParseCachingSourceTree
+from nope.module_resolution import ModuleResolutionCache
+from .testing import write_file
+
+
+@istest
+def module_type_is_loaded_from_cache_if_source_is_unchanged():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "x = 1\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        _type_of_module(path, cache_dir)
+        module_type = _type_of_module(path, cache_dir, type_checker=_FailingTypeChecker())
+        
+        assert_is(types.int_type, module_type.attrs.type_of("x"))
+
+
+@istest
+def module_is_checked_if_source_has_changed():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "x = 1\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        _type_of_module(path, cache_dir)
+        write_file(temp_dir.path, "main.py", "x = 'one'\n")
+        module_type = _type_of_module(path, cache_dir)
+        
+        assert_is(types.str_type, module_type.attrs.type_of("x"))
+
+
+@istest
+def module_is_checked_if_imported_module_has_changed():
+    with tempman.create_temp_dir() as temp_dir:
+        write_file(temp_dir.path, "message.py", "value = 1\n")
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nfrom message import value\nx = value\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        _type_of_module(path, cache_dir)
+        write_file(temp_dir.path, "message.py", "value = 'one'\n")
+        module_type = _type_of_module(path, cache_dir)
+        
+        assert_is(types.str_type, module_type.attrs.type_of("x"))
+
+
+@istest
+def cached_module_types_refer_to_classes_in_imported_modules():
+    with tempman.create_temp_dir() as temp_dir:
+        message_path = write_file(temp_dir.path, "message.py", "class Message(object):\n    pass\n")
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nfrom message import Message\nx = Message()\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        _type_of_module(path, cache_dir)
+        
+        checker = _create_module_checker(cache_dir, type_checker=_FailingTypeChecker())
+        module_type = checker.type_of_module(checker.source_tree.module(path))
+        message_type = checker.type_of_module(checker.source_tree.module(message_path))
+        
+        assert_is(message_type.attrs.type_of("Message").type, module_type.attrs.type_of("x"))
+
+
+@istest
+def function_types_shared_by_unrelated_modules_are_not_cached_as_references_to_each_other():
+    with tempman.create_temp_dir() as temp_dir:
+        write_file(temp_dir.path, "__init__.py", "")
+        write_file(temp_dir.path, "a.py", "#:: int, str, bool -> int\ndef f(x, y, z):\n    return x\n")
+        write_file(temp_dir.path, "b.py", "#:: int, str, bool -> int\ndef g(x, y, z):\n    return x\n")
+        write_file(temp_dir.path, "c.py", "from .b import g\nh = g\n")
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nimport a\nimport c\nc.h(1, '', True)\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        assert nope.check(path, cache_dir=cache_dir).is_valid
+        write_file(temp_dir.path, "a.py", "#:: str -> str\ndef f(x):\n    return x\n")
+        result = nope.check(path, cache_dir=cache_dir)
+        
+        assert result.is_valid, result.error
+
+
+@istest
+def program_can_be_checked_using_cache_dir():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nprint(1)\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        assert nope.check(path, cache_dir=cache_dir).is_valid
+        assert nope.check(path, cache_dir=cache_dir).is_valid
+
+
+@istest
+def module_checked_without_function_bodies_is_checked_again_when_bodies_are_needed():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "x = 1\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        checker = _create_module_checker(cache_dir)
+        checker.check_bodies_only_in([])
+        checker.type_of_module(checker.source_tree.module(path))
+        
+        type_checker = _RecordingTypeChecker()
+        checker = _create_module_checker(cache_dir, type_checker=type_checker)
+        checker.check(checker.source_tree.module(path))
+        
+        assert_equal([(path, True)], type_checker.checked)
+
+
+@istest
+def module_is_checked_again_if_new_module_changes_resolution_of_its_import():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nimport message\n")
+        write_file(temp_dir.path, "message.py", "x = 1\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        assert nope.check(path, cache_dir=cache_dir).is_valid
+        os.mkdir(os.path.join(temp_dir.path, "message"))
+        write_file(os.path.join(temp_dir.path, "message"), "__init__.py", "x = 1\n")
+        result = nope.check(path, cache_dir=cache_dir)
+        
+        assert not result.is_valid
+        assert "Import is ambiguous" in str(result.error)
+
+
+@istest
+def module_is_checked_again_if_search_paths_have_changed():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "import message\ny = message.x + 1\n")
+        first_search_path = os.path.join(temp_dir.path, "first")
+        second_search_path = os.path.join(temp_dir.path, "second")
+        os.mkdir(first_search_path)
+        os.mkdir(second_search_path)
+        write_file(first_search_path, "message.py", "x = 1\n")
+        write_file(second_search_path, "message.py", "x = 'one'\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        assert nope.check(path, cache_dir=cache_dir, search_paths=[first_search_path]).is_valid
+        assert not nope.check(path, cache_dir=cache_dir, search_paths=[second_search_path]).is_valid
+
+
+@istest
+def module_tree_is_loaded_from_parse_cache_if_source_is_unchanged():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "x = 1\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        original = _parse_caching_source_tree(FileSystemSourceTree(), cache_dir).module(path)
+        cached = _parse_caching_source_tree(_FailingSourceTree(), cache_dir).module(path)
+        
+        assert_equal(original.node, cached.node)
+        assert_equal(path, cached.node.body[0].location.filename)
+
+
+@istest
+def module_is_parsed_if_source_has_changed_since_it_was_cached():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "x = 1\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        _parse_caching_source_tree(FileSystemSourceTree(), cache_dir).module(path)
+        write_file(temp_dir.path, "main.py", "x = 'one'\n")
+        module = _parse_caching_source_tree(FileSystemSourceTree(), cache_dir).module(path)
+        
+        assert_equal(nodes.str_literal("one"), module.node.body[0].value)
+
+
+@istest
+def nodes_loaded_from_parse_cache_have_new_node_ids():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "x = 1\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        original = _parse_caching_source_tree(FileSystemSourceTree(), cache_dir).module(path)
+        cached = _parse_caching_source_tree(_FailingSourceTree(), cache_dir).module(path)
+        
+        assert original.node.node_id != cached.node.node_id
+        assert original.node.body[0].node_id != cached.node.body[0].node_id
+
+
+@istest
+def module_is_parsed_if_source_changed_while_it_was_being_parsed():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "x = 1\n")
+        cache_dir = os.path.join(temp_dir.path, "cache")
+        
+        def change_source():
+            write_file(temp_dir.path, "main.py", "x = 'one'\n")
+        
+        _parse_caching_source_tree(_ChangingSourceTree(change_source), cache_dir).module(path)
+        module = _parse_caching_source_tree(FileSystemSourceTree(), cache_dir).module(path)
+        
+        assert_equal(nodes.str_literal("one"), module.node.body[0].value)
+
+
+def _parse_caching_source_tree(source_tree, cache_dir):
+    return ParseCachingSourceTree(source_tree, FileSystemParseCache(cache_dir))
+
+
+def _type_of_module(path, cache_dir, type_checker=None):
+    checker = _create_module_checker(cache_dir, type_checker)
+    return checker.type_of_module(checker.source_tree.module(path))
+
+
+def _create_module_checker(cache_dir, type_checker=None):
+    injector = injection.create_injector()
+    source_tree = injector.get(SourceTree)
+    if type_checker is None:
+        type_checker = injector.get(inference.TypeChecker)
+    
+    check_cache = FileSystemCheckCache(cache_dir, injector.get(ModuleResolutionCache))
+    checker = ModuleChecker(source_tree, type_checker, check_cache)
+    checker.source_tree = source_tree
+    return checker
+
+
+class _FailingTypeChecker(object):
+    def check_module(self, module, module_types, check_bodies=True):
+        assert False, "Expected {} to be loaded from cache".format(module.path)
+
+
+class _RecordingTypeChecker(object):
+    def __init__(self):
+        self.checked = []
+        self._type_checker = injection.create_injector().get(inference.TypeChecker)
+    
+    def check_module(self, module, module_types, check_bodies=True):
+        self.checked.append((module.path, check_bodies))
+        return self._type_checker.check_module(module, module_types, check_bodies=check_bodies)
+
+
+class _FailingSourceTree(object):
+    def module(self, path):
+        assert False, "Expected {} to be loaded from cache".format(path)
+
+
+class _ChangingSourceTree(object):
+    def __init__(self, change_source):
+        self._change_source = change_source
+    
+    def parse(self, path, contents):
+        module = FileSystemSourceTree().parse(path, contents)
+        self._change_source()
+        return module
@@ -0,0 +1,80 @@
+from nose.tools import istest, assert_equal, assert_raises
+
+from nope import nodes
+from nope.identity_dict import NodeTable
+
+
+@istest
+def value_can_be_retrieved_using_node():
+    first = nodes.ref("x")
+    second = nodes.ref("y")
+    table = NodeTable.create([(first, 1), (second, 2)])
+    
+    assert_equal(1, table[first])
+    assert_equal(2, table[second])
+
+
+@istest
+def nodes_without_values_are_not_in_table():
+    present = nodes.ref("x")
+    missing = nodes.ref("y")
+    table = NodeTable.create([(present, 1)])
+    
+    assert present in table
+    assert missing not in table
+    assert_equal(None, table.get(missing))
+    assert_raises(KeyError, lambda: table[missing])
+
+
+@istest
+def nodes_can_be_added_in_any_order():
+    node_list = [nodes.ref("x{}".format(index)) for index in range(100)]
+    table = NodeTable()
+    
+    for index in reversed(range(0, 100, 2)):
+        table[node_list[index]] = index
+    for index in range(1, 100, 2):
+        table[node_list[index]] = index
+    
+    assert_equal(list(range(100)), [table[node] for node in node_list])
+
+
+@istest
+def nodes_with_distant_ids_can_be_added():
+    first = nodes.ref("x")
+    for index in range(5000):
+        nodes.ref("y")
+    second = nodes.ref("z")
+    table = NodeTable.create([(first, 1), (second, 2)])
+    
+    assert_equal(1, table[first])
+    assert_equal(2, table[second])
+
+
+@istest
+def nodes_with_distant_ids_can_be_retrieved_after_table_grows_to_include_them():
+    node_list = [nodes.ref("x{}".format(index)) for index in range(5000)]
+    table = NodeTable()
+    
+    table[node_list[-1]] = "last"
+    table[node_list[0]] = "first"
+    for node in reversed(node_list[1:-1]):
+        table[node] = "middle"
+    
+    assert_equal("first", table[node_list[0]])
+    assert_equal("last", table[node_list[-1]])
+    assert_equal(len(node_list), len(table.keys()))
+
+
+@istest
+def keys_are_in_insertion_order_without_duplicates():
+    first = nodes.ref("x")
+    second = nodes.ref("y")
+    table = NodeTable()
+    
+    table[second] = 1
+    table[first] = 2
+    table[second] = 3
+    
+    assert_equal([second, first], table.keys())
+    assert_equal(3, table[second])
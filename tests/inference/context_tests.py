@@ -0,0 +1,41 @@
+from nose.tools import istest, assert_equal, assert_is
+
+from nope import types, nodes, name_declaration
+from nope.inference.context import Context
+from .util import create_references
+
+
+@istest
+def declaration_types_are_not_shared_between_modules():
+    declaration = name_declaration.VariableDeclarationNode("x")
+    builtin_declaration_types = {}
+    first_node = nodes.ref("x")
+    second_node = nodes.ref("x")
+    
+    first_context = Context.create(create_references([(first_node, declaration)]), builtin_declaration_types)
+    second_context = Context.create(create_references([(second_node, declaration)]), builtin_declaration_types)
+    first_context.update_type(first_node, types.int_type)
+    
+    assert_is(None, second_context.lookup(second_node, allow_unbound=True))
+    assert_equal({}, builtin_declaration_types)
+
+
+@istest
+def nested_instantiations_override_types_of_outer_instantiations():
+    first_declaration = name_declaration.VariableDeclarationNode("T")
+    second_declaration = name_declaration.VariableDeclarationNode("U")
+    first_node = nodes.ref("T")
+    second_node = nodes.ref("U")
+    references = create_references(
+        [(first_node, first_declaration), (second_node, second_declaration)],
+        builtins=[first_declaration],
+    )
+    
+    context = Context.create(references, {first_declaration: types.none_type})
+    outer_context = context.instantiate_types([(first_node, types.int_type), (second_node, types.int_type)])
+    inner_context = outer_context.instantiate_types([(second_node, types.str_type)])
+    
+    assert_is(types.int_type, inner_context.lookup(first_node))
+    assert_is(types.str_type, inner_context.lookup(second_node))
+    assert_is(types.int_type, outer_context.lookup(second_node))
+    assert_is(types.none_type, context.lookup(first_node))
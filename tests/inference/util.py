@@ -1,10 +1,11 @@
 from nose.tools import assert_equal
 
-from nope import types, errors, nodes, inference, name_declaration, modules
+from nope import types, errors, nodes, inference, name_declaration, modules, name_resolution
 from nope.inference.context import Context
 from nope.modules import LocalModule
 from nope.module_resolution import ResolvedImport
-from nope.identity_dict import NodeDict
+from nope.name_resolution import Slot, References
+from nope.identity_dict import NodeDict, NodeTable
 
 
 def update_context(statement, *, type_bindings=None, module_resolver=None, module_types=None, module_path=None, is_executable=False, declared_names_in_node=None, update_deferred=True):
@@ -41,25 +42,60 @@ def _create_type_checker(declaration_finder=None, module_types=None, module_reso
         module_resolver=module_resolver,
         module_types=module_types,
         module=LocalModule(module_path, nodes.module([], is_executable=is_executable)),
+        check_bodies=True,
     )
 
 
+# Creates references without running name resolution. The declarations are
+# given slots as if they were all declared in a single scope, apart from
+# builtins, which are given slots in the same way as name resolution gives
+# slots to builtins.
+def create_references(references, builtins=()):
+    slots = name_resolution._Slots()
+    slots.add_scope(1, [
+        declaration
+        for reference, declaration in references
+        if declaration not in builtins
+    ])
+    reference_slots = NodeTable.create(
+        (reference, slots.referenced_slot(declaration))
+        for reference, declaration in references
+    )
+    return References(NodeTable.create(references), reference_slots, slots)
+
+
 class SingleScopeReferences(object):
-    def __init__(self, names=None, references=None):
+    def __init__(self, names=None, references=None, slots=None):
         if names is None:
             names = []
         if references is None:
             references = {}
+        if slots is None:
+            slots = {}
         
         self._names = names
         self._references = references
+        self._slots = slots
     
     def referenced_declaration(self, node):
         return self.declaration(node.name)
     
+    def referenced_slot(self, node):
+        return self.declaration_slot(self.referenced_declaration(node))
+    
+    def declaration_slot(self, declaration):
+        return self._slots[declaration]
+    
+    def builtin_slots(self):
+        return []
+    
+    def slot_count(self):
+        return len(self._slots)
+    
     def declaration(self, name):
         if name not in self._references:
-            self._references[name] = name_declaration.VariableDeclarationNode(name)
+            declaration = self._references[name] = name_declaration.VariableDeclarationNode(name)
+            self._slots[declaration] = Slot(1, len(self._slots), len(self._slots))
         
         return self._references[name]
     
@@ -67,7 +103,7 @@ class SingleScopeReferences(object):
         return self._names
     
     def with_names(self, names):
-        return SingleScopeReferences(names, self._references)
+        return SingleScopeReferences(names, self._references, self._slots)
 
 
 class FakeDeclarationFinder(object):
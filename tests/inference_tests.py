@@ -26,6 +26,19 @@ def check_generates_type_lookup_for_all_expressions():
     assert_equal(types.str_type, type_lookup.type_of(str_node))
 
 
+@istest
+def function_bodies_are_not_checked_when_only_checking_interface():
+    module_node = nodes.module([
+        nodes.func("f", nodes.args([]), [
+            nodes.ret(nodes.str_literal("one")),
+        ], type=None),
+    ])
+    
+    module, type_lookup = _check(LocalModule(None, module_node), check_bodies=False)
+    assert_equal(types.func([], types.none_type), module.attrs.type_of("f"))
+    assert_equal(None, type_lookup)
+
+
 @istest
 def module_exports_are_specified_using_all():
     module_node = nodes.module([
@@ -131,7 +144,7 @@ def _check_module(module, path_to_module_types):
 
 
 
-def _check(module, module_resolver=None, module_types=None):
+def _check(module, module_resolver=None, module_types=None, check_bodies=True):
     declaration_finder = name_declaration.DeclarationFinder()
     checker = inference._TypeCheckerForModule(
         declaration_finder=declaration_finder,
@@ -140,5 +153,6 @@ def _check(module, module_resolver=None, module_types=None):
         module_resolver=module_resolver,
         module=module,
         module_types=module_types,
+        check_bodies=check_bodies,
     )
     return checker.check()
@@ -0,0 +1,112 @@
+import os
+
+from nose.tools import istest, assert_equal, assert_is
+import tempman
+
+import nope
+from nope import interfaces, types
+from .testing import write_file
+
+
+@istest
+def function_types_are_loaded_from_interface():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "message.py", "#:: int | str -> str\ndef describe(value):\n    return 'x'\n")
+        
+        module = _emit_and_load(path)
+        
+        assert_equal(
+            types.func([types.union(types.int_type, types.str_type)], types.str_type),
+            module.type.attrs.type_of("describe"),
+        )
+
+
+@istest
+def generic_classes_can_be_instantiated_after_being_loaded_from_interface():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "box.py", _box_source)
+        
+        module = _emit_and_load(path)
+        
+        box_type = module.type.attrs.type_of("Box").type
+        assert_is(types.int_type, box_type(types.int_type).attrs.type_of("get").return_type)
+
+
+@istest
+def types_defined_in_other_interfaces_are_shared():
+    with tempman.create_temp_dir() as temp_dir:
+        write_file(temp_dir.path, "__init__.py", "")
+        animals_path = write_file(temp_dir.path, "animals.py", "class Animal(object):\n    pass\n")
+        shelter_path = write_file(temp_dir.path, "shelter.py", "from .animals import Animal\n\n#:: -> Animal\ndef adopt():\n    return Animal()\n")
+        
+        assert nope.check(temp_dir.path, emit_interface=True).is_valid
+        animals = interfaces.load(interfaces.interface_path(animals_path))
+        shelter = interfaces.load(interfaces.interface_path(shelter_path))
+        
+        assert_is(
+            animals.type.attrs.type_of("Animal").type,
+            shelter.type.attrs.type_of("adopt").return_type,
+        )
+        assert_equal(set([animals]), shelter.dependencies)
+
+
+@istest
+def interface_is_ignored_if_interface_it_refers_to_has_changed_since_it_was_written():
+    with tempman.create_temp_dir() as temp_dir:
+        write_file(temp_dir.path, "__init__.py", "")
+        animals_path = write_file(temp_dir.path, "animals.py", "class Cat(object):\n    pass\n\nclass Dog(object):\n    pass\n")
+        shelter_path = write_file(temp_dir.path, "shelter.py", "from .animals import Dog\n\n#:: -> Dog\ndef adopt():\n    return Dog()\n")
+        assert nope.check(temp_dir.path, emit_interface=True).is_valid
+        
+        write_file(temp_dir.path, "animals.py", "class Dog(object):\n    pass\n\nclass Cat(object):\n    pass\n")
+        assert nope.check(animals_path, emit_interface=True).is_valid
+        
+        assert_is(None, interfaces.load(interfaces.interface_path(shelter_path)))
+
+
+@istest
+def modules_on_search_path_are_checked_against_their_interface():
+    with tempman.create_temp_dir() as temp_dir:
+        lib_dir = os.path.join(temp_dir.path, "lib")
+        os.mkdir(lib_dir)
+        box_path = write_file(lib_dir, "box.py", _box_source)
+        assert nope.check(box_path, emit_interface=True).is_valid
+        os.remove(box_path)
+        
+        valid_path = write_file(temp_dir.path, "valid.py", "#!/usr/bin/env python\nfrom box import Box\nx = Box(1).get() + 1\n")
+        invalid_path = write_file(temp_dir.path, "invalid.py", "#!/usr/bin/env python\nfrom box import Box\nx = Box(1).get() + 'one'\n")
+        
+        assert nope.check(valid_path, search_paths=[lib_dir]).is_valid
+        assert not nope.check(invalid_path, search_paths=[lib_dir]).is_valid
+
+
+@istest
+def interface_is_ignored_if_source_has_changed_since_it_was_written():
+    with tempman.create_temp_dir() as temp_dir:
+        lib_dir = os.path.join(temp_dir.path, "lib")
+        os.mkdir(lib_dir)
+        write_file(lib_dir, "message.py", "value = 1\n")
+        assert nope.check(lib_dir, emit_interface=True).is_valid
+        write_file(lib_dir, "message.py", "value = 'one'\n")
+        
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nfrom message import value\nx = value + 1\n")
+        
+        assert not nope.check(path, search_paths=[lib_dir]).is_valid
+
+
+_box_source = """
+#:generic T
+class Box(object):
+    #:: Self, T -> none
+    def __init__(self, value):
+        self.value = value
+    
+    #:: Self -> T
+    def get(self):
+        return self.value
+"""
+
+
+def _emit_and_load(path):
+    assert nope.check(path, emit_interface=True).is_valid
+    return interfaces.load(interfaces.interface_path(path))
@@ -1,3 +1,5 @@
+import os
+
 from nose.tools import istest, assert_is, assert_equal
 
 from nope import nodes, errors, module_resolution, name_declaration, types
@@ -158,6 +160,104 @@ class PathResolutionTests(object):
         assert_is(message_module, resolved_module)
 
 
+    @istest
+    def relative_import_in_module_on_search_path_does_not_search_search_paths(self):
+        shapes_module = _create_module("lib/shapes.py")
+        
+        resolved_module = _resolve_import(
+            _create_module("lib/more.py"),
+            [".", "shapes"],
+            modules=[shapes_module],
+            search_paths=["lib"],
+        )
+        
+        assert_is(shapes_module, resolved_module)
+
+
+    @istest
+    def module_found_both_in_module_directory_and_on_search_path_is_not_ambiguous(self):
+        message_module = _create_module("lib/message.py")
+        
+        resolved_module = _resolve_import(
+            _create_module("lib/main.py", is_executable=True),
+            ["message"],
+            modules=[message_module],
+            search_paths=["lib"],
+        )
+        
+        assert_is(message_module, resolved_module)
+
+
+@istest
+class ResolutionCacheTests(object):
+    @istest
+    def directories_are_listed_once_for_all_importing_modules(self):
+        source_tree = FakeSourceTree([_create_module("lib/message.py")])
+        listed_directories = []
+        
+        def list_directory(directory):
+            listed_directories.append(directory)
+            return source_tree.list_directory(directory)
+        
+        resolution_cache = module_resolution.ModuleResolutionCache(["lib"], list_directory=list_directory, is_file=source_tree.is_file)
+        
+        for path in ["root/main.py", "root/other.py"]:
+            for names in [["message"], ["hello"]]:
+                try:
+                    _module_resolver(
+                        _create_module(path),
+                        source_tree=source_tree,
+                        resolution_cache=resolution_cache,
+                    ).resolve_import_path(names)
+                except errors.ModuleNotFoundError:
+                    pass
+        
+        assert_equal(["lib", "lib/hello", "lib/message"], sorted(listed_directories))
+
+
+    @istest
+    def invalidating_path_lists_its_directory_again(self):
+        source_tree = FakeSourceTree([])
+        resolution_cache = module_resolution.ModuleResolutionCache(["lib"], list_directory=source_tree.list_directory, is_file=source_tree.is_file)
+        module_resolver = _module_resolver(
+            _create_module("root/main.py"),
+            source_tree=source_tree,
+            resolution_cache=resolution_cache,
+        )
+        try:
+            module_resolver.resolve_import_path(["message"])
+            assert False, "Expected error"
+        except errors.ModuleNotFoundError:
+            pass
+        
+        message_module = _create_module("lib/message.py")
+        source_tree.add(message_module)
+        resolution_cache.invalidate("lib/message.py")
+        
+        assert_is(message_module, module_resolver.resolve_import_path(["message"]))
+
+
+    @istest
+    def entries_are_only_checked_to_be_files_once_imported(self):
+        source_tree = FakeSourceTree([_create_module("lib/message.py"), _create_module("lib/other.py")])
+        checked_paths = []
+        
+        def is_file(path):
+            checked_paths.append(path)
+            return source_tree.is_file(path)
+        
+        resolution_cache = module_resolution.ModuleResolutionCache(["lib"], list_directory=source_tree.list_directory, is_file=is_file)
+        
+        for path in ["root/main.py", "root/other.py"]:
+            _module_resolver(
+                _create_module(path),
+                source_tree=source_tree,
+                resolution_cache=resolution_cache,
+            ).resolve_import_path(["message"])
+        
+        assert_equal(["lib/message.py"], checked_paths)
+
+
 @istest
 class ImportValueTests(object):
     @istest
@@ -309,23 +409,26 @@ def _resolve_import(module, names, **kwargs):
     return module_resolver.resolve_import_path(names)
 
 
-def _module_resolver(module, modules=None, builtin_modules=None, search_paths=None):
+def _module_resolver(module, modules=None, builtin_modules=None, search_paths=None, source_tree=None, resolution_cache=None):
     if modules is None:
         modules = []
     if builtin_modules is None:
         builtin_modules = {}
     if search_paths is None:
         search_paths = []
-        
-    source_tree = FakeSourceTree(modules)
+    if source_tree is None:
+        source_tree = FakeSourceTree(modules)
+    if resolution_cache is None:
+        resolution_cache = module_resolution.ModuleResolutionCache(search_paths, list_directory=source_tree.list_directory, is_file=source_tree.is_file)
+    
     return module_resolution.ModuleResolver(
         source_tree,
         builtin_modules,
         ModuleExports(name_declaration.DeclarationFinder()),
         module,
-        search_paths=search_paths,
+        resolution_cache=resolution_cache,
     )
-    
+
 
 
 def _create_module(path, is_executable=False, declares=[]):
@@ -346,5 +449,18 @@ class FakeSourceTree(object):
             for module in modules
         )
     
+    def add(self, module):
+        self._modules[module.path] = module
+    
     def module(self, path):
         return self._modules.get(path)
+    
+    def list_directory(self, directory):
+        return frozenset(
+            os.path.basename(path)
+            for path in self._modules
+            if (os.path.dirname(path) or os.curdir) == directory
+        )
+    
+    def is_file(self, path):
+        return path in self._modules
@@ -1,4 +1,4 @@
-from nose.tools import istest, assert_equal
+from nose.tools import istest, assert_equal, assert_is, assert_is_not
 
 from nope import modules, nodes, errors, name_declaration
 
@@ -38,5 +38,40 @@ def error_is_raised_if_all_is_redeclared():
         assert_equal("__all__ cannot be redeclared", str(error))
 
 
+@istest
+def exports_of_module_can_be_queried_by_name():
+    module_node = nodes.module([
+        nodes.assign(["x"], nodes.none()),
+        nodes.assign(["_y"], nodes.none()),
+    ])
+    exports = _module_exports().exports(_module(module_node))
+    
+    assert "x" in exports
+    assert "_y" not in exports
+    assert_equal(["x"], exports.names)
+
+
+@istest
+def exports_of_module_are_found_once_for_each_module_tree():
+    module_exports = _module_exports()
+    module = _module(nodes.module([nodes.assign(["x"], nodes.none())]))
+    changed_module = _module(nodes.module([nodes.assign(["y"], nodes.none())]))
+    
+    exports = module_exports.exports(module)
+    assert_is(exports, module_exports.exports(module))
+    
+    # Only the exports of the latest tree of each module are kept
+    assert_equal(["y"], module_exports.names(changed_module))
+    assert_is_not(exports, module_exports.exports(module))
+
+
+def _module_exports():
+    return modules.ModuleExports(name_declaration.DeclarationFinder())
+
+
 def _exported_names(module_node):
-    return modules.ModuleExports(name_declaration.DeclarationFinder()).names(module_node)
+    return _module_exports().names(_module(module_node))
+
+
+def _module(module_node):
+    return modules.LocalModule("main.py", module_node)
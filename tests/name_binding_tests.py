@@ -4,8 +4,7 @@ from nope import nodes, errors, name_declaration, types
 from nope.name_binding import check_bindings
 from nope.identity_dict import NodeDict
 from nope.types import TypeLookup
-from .inference.util import context_manager_class, SingleScopeReferences
-from nope.name_resolution import References
+from .inference.util import context_manager_class, SingleScopeReferences, create_references
 from .testing import wip
 
 
@@ -123,6 +122,17 @@ def declarations_in_both_if_else_branches_are_definitely_bound():
     )
 
 
+@istest
+def declarations_in_every_branch_of_long_if_elif_ladder_are_definitely_bound():
+    def create_ladder(generate):
+        node = nodes.if_(nodes.bool_literal(True), [generate.assignment()], [generate.assignment()])
+        for index in range(2000):
+            node = nodes.if_(nodes.bool_literal(True), [generate.assignment()], [node])
+        return node
+    
+    _assert_name_is_definitely_bound(create_ladder)
+
+
 @istest
 def potentially_bound_variable_becomes_definitely_bound_after_being_assigned_in_both_branches_of_if_else():
     target_node = nodes.ref("x")
@@ -544,7 +554,7 @@ def exception_handler_targets_cannot_be_accessed_from_nested_function():
     )
     
     declaration = name_declaration.ExceptionHandlerTargetNode("error")
-    references = References([
+    references = create_references([
         (target_node, declaration),
         (ref_node, declaration),
         (func_node, name_declaration.VariableDeclarationNode("f")),
@@ -565,6 +575,17 @@ def class_name_is_definitely_bound_after_class_definition():
     assert_equal(True, bindings.is_definitely_bound(node))
 
 
+@istest
+def class_name_remains_definitely_bound_after_class_is_redefined_in_one_branch_of_if_else():
+    node = nodes.class_("User", [])
+    
+    bindings = _updated_bindings(nodes.module([
+        node,
+        nodes.if_(nodes.bool_literal(True), [nodes.class_("User", [])], []),
+    ]))
+    assert_equal(True, bindings.is_definitely_bound(node))
+
+
 @istest
 def method_can_reference_later_function_if_class_is_not_used_in_the_interim():
     g_ref = nodes.ref("g")
@@ -228,8 +228,8 @@ def assert_statement_has_child_names_resolved():
     _assert_children_resolved(
         lambda ref: nodes.assert_(nodes.bool_literal(False), ref),
     )
-    
-    
+
+
 @istest
 def list_comprehension_has_child_names_resolved():
     _assert_children_resolved(
@@ -241,7 +241,7 @@ def list_comprehension_has_child_names_resolved():
     _assert_children_resolved(
         lambda ref: nodes.list_comprehension(nodes.none(), nodes.none(), ref),
     )
-    
+
 
 @istest
 def list_comprehension_adds_target_names_to_body_context():
@@ -253,7 +253,7 @@ def list_comprehension_adds_target_names_to_body_context():
     references = resolve(node, declarations)
     assert not declarations.is_declared("target")
     assert_is(references.referenced_declaration(target), references.referenced_declaration(ref))
-    
+
 
 @istest
 def list_comprehension_generator_is_not_in_same_scope_as_element():
@@ -302,7 +302,7 @@ def generic_function_definition_signature_has_names_resolved():
     assert not declarations.is_declared("T")
     assert_is(references.referenced_declaration(param), references.referenced_declaration(arg_ref))
     assert_is(references.referenced_declaration(param), references.referenced_declaration(return_ref))
-    
+
 
 @istest
 def function_definitions_adds_function_name_to_context():
@@ -355,6 +355,53 @@ def function_definitions_arguments_shadow_variables_of_same_name_in_outer_scope(
     assert_is_not(declarations.declaration("x"), references.referenced_declaration(ref))
 
 
+@istest
+def references_are_given_slots_of_declarations_in_their_scope():
+    first_arg = nodes.argument("x")
+    second_arg = nodes.argument("y")
+    args = nodes.arguments([first_arg, second_arg])
+    inner_ref = nodes.ref("y")
+    outer_ref = nodes.ref("z")
+    body = [nodes.ret(nodes.tuple_literal([inner_ref, outer_ref]))]
+    node = nodes.func("f", args, body, type=None)
+    
+    declarations = _create_declarations(["f", "z"])
+    
+    references = resolve(node, declarations)
+    assert_equal((1, 1), references.referenced_slot(inner_ref)[:2])
+    assert_equal((0, 1), references.referenced_slot(outer_ref)[:2])
+    assert_equal(references.declaration_slot(references.referenced_declaration(inner_ref)), references.referenced_slot(inner_ref))
+
+
+@istest
+def slot_numbers_are_unique_within_module():
+    args = nodes.arguments([nodes.argument("x")])
+    first_ref = nodes.ref("x")
+    second_ref = nodes.ref("x")
+    node = nodes.module([
+        nodes.func("f", args, [nodes.ret(first_ref)], type=None),
+        nodes.assign([second_ref], nodes.none()),
+    ])
+    
+    references = resolve(node, _create_declarations([]))
+    first_slot = references.referenced_slot(first_ref)
+    second_slot = references.referenced_slot(second_ref)
+    assert_equal((2, 0), first_slot[:2])
+    assert_equal(1, second_slot.depth)
+    assert first_slot.number != second_slot.number
+
+
+@istest
+def builtins_are_only_given_slots_once_referenced():
+    ref = nodes.ref("y")
+    node = nodes.module([nodes.assign([nodes.ref("x")], ref)])
+    
+    references = resolve(node, _create_declarations(["z", "y"]))
+    assert_equal(2, references.slot_count())
+    assert_equal((0, 0), references.referenced_slot(ref)[:2])
+    assert_equal([references.referenced_declaration(ref)], [declaration for declaration, slot in references.builtin_slots()])
+
+
 @istest
 def function_definitions_assignments_shadow_variables_of_same_name_in_outer_scope():
     args = nodes.arguments([])
@@ -375,7 +422,7 @@ def class_definition_is_resolved_to_class_declaration():
     declarations = _create_declarations(["User"])
     references = resolve(node, declarations)
     assert_is(declarations.declaration("User"), references.referenced_declaration(node))
-    
+
 
 @istest
 def class_definition_base_classes_are_resolved():
@@ -475,7 +522,7 @@ def names_in_module_are_defined_and_resolved():
     
     references = resolve(node, declarations)
     assert_is(references.referenced_declaration(ref_node), references.referenced_declaration(target_node))
-    
+
 
 
 def _create_declarations(names):
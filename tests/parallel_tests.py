@@ -0,0 +1,49 @@
+import os
+
+from nose.tools import istest, assert_equal
+import tempman
+
+import nope
+from .testing import program_path, write_file
+
+
+@istest
+def valid_program_is_valid_when_checked_in_parallel():
+    assert nope.check(path=program_path("valid/fib.py"), jobs=2).is_valid
+
+
+@istest
+def modules_can_import_modules_checked_by_other_workers():
+    assert nope.check(path=program_path("valid/import_module_in_package"), jobs=2).is_valid
+
+
+@istest
+def invalid_program_is_invalid_when_checked_in_parallel():
+    assert not nope.check(path=program_path("invalid/wrong_arg_type.py"), jobs=2).is_valid
+
+
+@istest
+def error_in_imported_module_is_reported():
+    with tempman.create_temp_dir() as temp_dir:
+        write_file(temp_dir.path, "message.py", "value = 1 + 'one'\n")
+        write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nimport message\nprint(message.value)\n")
+        
+        result = nope.check(path=temp_dir.path, jobs=2)
+        
+        assert not result.is_valid
+        assert_equal(os.path.join(temp_dir.path, "message.py"), result.error.node.location.filename)
+
+
+@istest
+def syntax_error_in_imported_module_is_reported():
+    with tempman.create_temp_dir() as temp_dir:
+        message_path = os.path.join(temp_dir.path, "lib", "message.py")
+        os.mkdir(os.path.dirname(message_path))
+        write_file(os.path.dirname(message_path), "message.py", "value = \n")
+        main_path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nimport message\nprint(message.value)\n")
+        
+        result = nope.check(path=main_path, jobs=2, search_paths=[os.path.dirname(message_path)])
+        
+        assert not result.is_valid
+        assert isinstance(result.error, SyntaxError)
+        assert_equal(message_path, result.error.filename)
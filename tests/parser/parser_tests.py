@@ -706,6 +706,14 @@ def nodes_have_position():
     assert_equal(0, node.location.offset)
 
 
+@istest
+def nodes_have_position_on_long_lines():
+    node = _parse_expression("\n" * 70000 + "(" + " " * 1000 + "None)", filename="take-it-easy.py")
+    
+    assert_equal(70001, node.location.lineno)
+    assert_equal(1001, node.location.offset)
+
+
 @istest
 def test_parse_empty_class():
     expected_node = nodes.class_("User", [])
@@ -195,6 +195,54 @@ class A:
     assert_equal(expected, note)
 
 
+@istest
+def notes_are_attached_to_next_token_after_comments():
+    source = """
+#:generic T
+# Option
+class Option:
+    pass
+"""
+    notes = parse_notes(io.StringIO(source))
+    assert_equal([(4, 0)], list(notes.generics.keys()))
+
+
+@istest
+def comments_inside_strings_are_not_notes():
+    source = """
+x = "#:generic T"
+y = \'\'\'
+#:generic T
+\'\'\'
+"""
+    notes = parse_notes(io.StringIO(source))
+    assert_equal({}, notes.generics)
+
+
+@istest
+def repeated_notes_are_parsed_into_distinct_nodes():
+    first = parse_explicit_type("int -> list[int]")
+    second = parse_explicit_type("int -> list[int]")
+    assert_equal(first, second)
+    assert first is not second
+    assert first.args[0] is not second.args[0]
+    assert first.returns.params[0] is not second.returns.params[0]
+
+
+@istest
+def invalid_notes_raise_syntax_error_at_position_of_note():
+    source = """
+x = 1
+#:: int ->
+y = 1
+"""
+    try:
+        parse_notes(io.StringIO(source))
+        assert False, "Expected SyntaxError"
+    except SyntaxError as error:
+        assert_equal((3, 0), (error.lineno, error.offset))
+
+
 def _parse_note_of_type(note_type, source):
     note, = getattr(parse_notes(io.StringIO(source)), note_type).values()
     return note[1]
@@ -0,0 +1,46 @@
+from nose.tools import istest, assert_equal
+
+from nope import nodes, passes, structure
+
+
+@istest
+def each_pass_visits_every_node_in_single_traversal():
+    visited = []
+    
+    def visit(name):
+        def visit_node(node, context):
+            if isinstance(node, nodes.VariableReference):
+                visited.append((name, node.name))
+            return context
+        
+        return visit_node
+    
+    node = nodes.assign([nodes.ref("x")], nodes.add(nodes.ref("y"), nodes.ref("z")))
+    passes.run_passes(node, [(visit("first"), None), (visit("second"), None)])
+    
+    assert_equal([
+        ("first", "y"), ("second", "y"),
+        ("first", "z"), ("second", "z"),
+        ("first", "x"), ("second", "x"),
+    ], visited)
+
+
+@istest
+def context_returned_by_visit_is_passed_to_children():
+    depths = {}
+    
+    def visit(node, depth):
+        if isinstance(node, nodes.VariableReference):
+            depths[node.name] = depth
+        if structure.is_scope(node):
+            return depth + 1
+        else:
+            return depth
+    
+    node = nodes.module([
+        nodes.expression_statement(nodes.ref("x")),
+        nodes.func("f", nodes.args([]), [nodes.expression_statement(nodes.ref("y"))], type=None),
+    ])
+    passes.run_passes(node, [(visit, 0)])
+    
+    assert_equal({"x": 1, "y": 2}, depths)
@@ -0,0 +1,92 @@
+import io
+import os
+import json
+
+from nose.tools import istest, assert_equal
+import tempman
+
+import nope
+from nope import profiling
+
+
+@istest
+def calls_to_phase_are_counted_per_module():
+    profiler = profiling.Profiler()
+    
+    for path in ["a.py", "a.py", "b.py"]:
+        with profiler.phase("parse", path):
+            pass
+    
+    assert_equal(
+        [("parse", "a.py", 2), ("parse", "b.py", 1)],
+        sorted((stats.phase, stats.path, stats.count) for stats in profiler.stats()),
+    )
+
+
+@istest
+def nested_phases_inherit_path_of_enclosing_phase():
+    profiler = profiling.Profiler()
+    
+    with profiler.phase("inference", "a.py"):
+        with profiler.phase("name_resolution"):
+            pass
+    
+    assert_equal(
+        [("inference", "a.py"), ("name_resolution", "a.py")],
+        sorted((stats.phase, stats.path) for stats in profiler.stats()),
+    )
+
+
+@istest
+def self_time_of_phase_excludes_time_in_nested_phases():
+    profiler = profiling.Profiler()
+    
+    with profiler.phase("inference", "a.py"):
+        with profiler.phase("parse", "b.py"):
+            pass
+    
+    stats = dict((stats.phase, stats) for stats in profiler.stats())
+    inference_stats = stats["inference"]
+    assert inference_stats.self_time <= inference_stats.total_time - stats["parse"].total_time + 1e-9
+
+
+@istest
+def phase_totals_are_summed_across_modules():
+    profiler = profiling.Profiler()
+    
+    for path in ["a.py", "b.py"]:
+        with profiler.phase("parse", path):
+            pass
+    
+    totals = profiler.phase_totals()
+    assert_equal([("parse", None, 2)], [(stats.phase, stats.path, stats.count) for stats in totals])
+
+
+@istest
+def checking_program_records_phases_when_profiling():
+    with tempman.create_temp_dir() as temp_dir:
+        path = os.path.join(temp_dir.path, "main.py")
+        with open(path, "w") as main_file:
+            main_file.write("#!/usr/bin/env python\nprint(1)\n")
+        
+        with profiling.profile(profiling.Profiler()) as profiler:
+            assert nope.check(path).is_valid
+        
+        phases = set(stats.phase for stats in profiler.stats() if stats.path == path)
+        for phase in ["parse", "parse_notes", "transform", "name_resolution", "inference", "name_binding"]:
+            assert phase in phases, phase
+
+
+@istest
+def stats_can_be_written_as_json():
+    profiler = profiling.Profiler()
+    with profiler.phase("parse", "a.py"):
+        pass
+    
+    output = io.StringIO()
+    profiler.write_json(output)
+    
+    stats, = json.loads(output.getvalue())
+    assert_equal("parse", stats["phase"])
+    assert_equal("a.py", stats["path"])
+    assert_equal(1, stats["count"])
@@ -5,7 +5,7 @@ import spur
 import tempman
 
 import nope
-from .testing import program_path
+from .testing import program_path, write_file
 
 
 _local = spur.LocalShell()
@@ -56,6 +56,16 @@ def can_import_from_local_package():
     assert nope.check(path=program_path("valid/import_value_from_local_package")).is_valid
 
 
+@istest
+def function_bodies_of_imported_modules_are_only_checked_if_module_is_being_checked():
+    with tempman.create_temp_dir() as temp_dir:
+        message_path = write_file(temp_dir.path, "message.py", "#:: -> int\ndef value():\n    return 'one'\n")
+        main_path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nimport message\nprint(message.value())\n")
+        
+        assert nope.check(path=main_path).is_valid
+        assert not nope.check(path=[main_path, message_path]).is_valid
+
+
 @istest
 def test_loop_control_module_is_run():
     result = _check_program_string("break")
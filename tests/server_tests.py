@@ -0,0 +1,115 @@
+import os
+import threading
+
+from nose.tools import istest, assert_equal
+
+from nope import injection, server, main
+import tempman
+from .testing import write_file
+
+
+@istest
+def requests_are_sent_to_server_and_responses_returned():
+    with tempman.create_temp_dir() as temp_dir:
+        socket_path = os.path.join(temp_dir.path, "nope.sock")
+        
+        with _running_server(socket_path, lambda request: {"value": request["value"] + 1}):
+            assert_equal({"value": 2}, server.send_request(socket_path, {"value": 1}))
+            assert_equal({"value": 3}, server.send_request(socket_path, {"value": 2}))
+
+
+@istest
+def session_picks_up_changes_between_checks():
+    with tempman.create_temp_dir() as temp_dir:
+        session = injection.create_injector().get(server.Session)
+        
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nx = 1\n")
+        assert session.check(path).is_valid
+        write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nx = 1 + 'one'\n")
+        assert not session.check(path).is_valid
+
+
+@istest
+def session_keeps_types_consistent_when_module_is_checked_in_full_after_only_its_interface_was_checked():
+    with tempman.create_temp_dir() as temp_dir:
+        write_file(temp_dir.path, "__init__.py", "")
+        lib_path = write_file(temp_dir.path, "lib.py", "class Widget(object):\n    pass\n\n#:: Widget -> none\ndef use(widget):\n    pass\n")
+        write_file(temp_dir.path, "a.py", "from .lib import Widget\nw = Widget()\n")
+        first_path = write_file(temp_dir.path, "app1.py", "#!/usr/bin/env python\nimport a\n")
+        second_path = write_file(temp_dir.path, "app2.py", "#!/usr/bin/env python\nimport a\nimport lib\nlib.use(a.w)\n")
+        session = injection.create_injector().get(server.Session)
+        
+        assert session.check(first_path).is_valid
+        assert session.check(lib_path).is_valid
+        result = session.check(second_path)
+        assert result.is_valid, result.error
+
+
+@istest
+def session_compiles_checked_modules():
+    with tempman.create_temp_dir() as temp_dir:
+        output_dir = os.path.join(temp_dir.path, "output")
+        os.mkdir(output_dir)
+        session = injection.create_injector().get(server.Session)
+        
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nprint(1)\n")
+        session.compile(path, output_dir, "node")
+        
+        assert os.path.exists(os.path.join(output_dir, "main.js"))
+
+
+@istest
+def paths_in_requests_are_relative_to_working_directory_of_request():
+    with tempman.create_temp_dir() as temp_dir:
+        valid_dir = os.path.join(temp_dir.path, "valid")
+        invalid_dir = os.path.join(temp_dir.path, "invalid")
+        os.mkdir(valid_dir)
+        os.mkdir(invalid_dir)
+        valid_path = write_file(valid_dir, "main.py", "#!/usr/bin/env python\nx = 1 + 1\n")
+        invalid_path = write_file(invalid_dir, "main.py", "#!/usr/bin/env python\nx = 1+'a'\n")
+        os.utime(invalid_path, ns=(os.stat(valid_path).st_atime_ns, os.stat(valid_path).st_mtime_ns))
+        session = injection.create_injector().get(server.Session)
+        
+        original_cwd = os.getcwd()
+        try:
+            assert_equal(0, _check_in_session(session, valid_dir, "main.py")["exit_code"])
+            assert_equal(1, _check_in_session(session, invalid_dir, "main.py")["exit_code"])
+        finally:
+            os.chdir(original_cwd)
+
+
+@istest
+def check_options_that_server_cannot_honour_are_rejected():
+    with tempman.create_temp_dir() as temp_dir:
+        socket_path = os.path.join(temp_dir.path, "nope.sock")
+        session = injection.create_injector().get(server.Session)
+        
+        original_cwd = os.getcwd()
+        try:
+            response = _check_in_session(session, temp_dir.path, "main.py", "--jobs", "2", "--server", socket_path)
+        finally:
+            os.chdir(original_cwd)
+        
+        assert_equal(2, response["exit_code"])
+        assert "--jobs cannot be used with --server" in response["output"]
+
+
+def _check_in_session(session, cwd, *argv):
+    return main._handle_request(session, {
+        "cwd": cwd,
+        "argv": ["check"] + list(argv),
+    })
+
+
+class _running_server(object):
+    def __init__(self, socket_path, handle_request):
+        self._server = server.create_server(socket_path, handle_request)
+    
+    def __enter__(self):
+        thread = threading.Thread(target=self._server.serve_forever)
+        thread.daemon = True
+        thread.start()
+    
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
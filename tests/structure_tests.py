@@ -0,0 +1,33 @@
+from nose.tools import istest, assert_equal, assert_is
+
+from nope import nodes, structure
+
+
+@istest
+def lists_of_children_are_flattened():
+    func = nodes.ref("f")
+    args = [nodes.ref("x"), nodes.ref("y")]
+    node = nodes.call(func, args)
+    
+    assert_equal([func] + args, list(structure.scoped_children(node)))
+
+
+@istest
+def structural_nodes_are_reused_by_later_traversals():
+    node = nodes.assign([nodes.ref("x")], nodes.none())
+    
+    first_target = list(structure.scoped_children(node))[1]
+    second_target = list(structure.scoped_children(node))[1]
+    
+    assert_equal(nodes.Target, type(first_target))
+    assert_is(first_target, second_target)
+
+
+@istest
+def branches_can_be_traversed_more_than_once():
+    node = nodes.while_(nodes.bool_literal(True), [nodes.break_()])
+    
+    body = list(structure.scoped_children(node))[1]
+    
+    assert_equal([nodes.break_()], list(structure.scoped_children(body)))
+    assert_equal([nodes.break_()], list(structure.scoped_children(body)))
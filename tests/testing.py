@@ -28,6 +28,13 @@ def program_path(path):
     return os.path.join(os.path.dirname(__file__), "programs", path)
 
 
+def write_file(directory, name, contents):
+    path = os.path.join(directory, name)
+    with open(path, "w") as source_file:
+        source_file.write(contents)
+    return path
+
+
 def wip(func):
     @functools.wraps(func)
     def run_test(*args, **kwargs):
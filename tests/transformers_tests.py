@@ -0,0 +1,60 @@
+from nose.tools import istest, assert_equal, assert_is
+
+from nope import injection, nodes, parser, transformers
+
+
+@istest
+def modules_without_class_builder_imports_are_unchanged():
+    module_node = parser.parse("""
+x = 1
+User = namedtuple("User", [])
+""")
+    
+    assert_is(module_node, _transform(module_node))
+
+
+@istest
+def collections_namedtuple_is_transformed_into_class():
+    module_node = _transform(parser.parse("""
+import collections
+
+User = collections.namedtuple("User", [
+    #:field int
+    "id",
+])
+"""))
+    
+    class_node = module_node.body[1]
+    assert_equal(nodes.ClassDefinition, type(class_node))
+    assert_equal("User", class_node.name)
+
+
+@istest
+def dodge_data_class_is_transformed_into_class_in_same_pass():
+    module_node = _transform(parser.parse("""
+import collections
+import dodge
+
+User = collections.namedtuple("User", [])
+Message = dodge.data_class("Message", [])
+"""))
+    
+    assert_equal(nodes.ClassDefinition, type(module_node.body[2]))
+    assert_equal(nodes.ClassDefinition, type(module_node.body[3]))
+
+
+@istest
+def unchanged_statements_are_not_rebuilt():
+    original = parser.parse("""
+import collections
+
+x = 1
+User = collections.namedtuple("User", [])
+""")
+    module_node = _transform(original)
+    
+    assert_is(original.body[1], module_node.body[1])
+
+
+def _transform(module_node):
+    return injection.create_injector().get(transformers.ClassBuilderTransform)(module_node)
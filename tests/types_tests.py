@@ -1,3 +1,6 @@
+import gc
+import weakref
+
 from nose.tools import istest, assert_equal, assert_not_equal
 
 from nope import types
@@ -59,6 +62,44 @@ class TypeEqualityTests(object):
         second_instantiated_type = generic_type.instantiate([second_class_type])
         
         assert_not_equal(first_instantiated_type, second_instantiated_type)
+        
+    @istest
+    def equal_function_types_have_equal_hashes(self):
+        first_func_type = types.func([types.func_arg("x", int_type)], types.union(int_type, none_type))
+        second_func_type = types.func([types.func_arg("x", int_type)], types.union(none_type, int_type))
+        assert_equal(first_func_type, second_func_type)
+        assert_equal(hash(first_func_type), hash(second_func_type))
+        
+    @istest
+    def structurally_identical_function_types_are_the_same_object(self):
+        first_func_type = types.func([types.func_arg("x", int_type)], types.union(int_type, none_type))
+        second_func_type = types.func([types.func_arg("x", int_type)], types.union(int_type, none_type))
+        assert first_func_type is second_func_type
+        
+    @istest
+    def union_types_with_same_members_in_same_order_are_the_same_object(self):
+        assert types.union(int_type, str_type) is types.union(int_type, str_type)
+        assert types.union(int_type, str_type) is not types.union(str_type, int_type)
+        
+    @istest
+    def equal_instantiated_types_have_equal_hashes(self):
+        generic_type = types.generic_class("List", ["T"])
+        first_instantiated_type = generic_type.instantiate([int_type])
+        second_instantiated_type = generic_type.instantiate([int_type])
+        assert_equal(hash(first_instantiated_type), hash(second_instantiated_type))
+        
+    @istest
+    def instantiating_generic_type_again_is_a_cache_hit(self):
+        generic_type = types.generic_class("List", ["T"])
+        
+        stats_before = types.instantiation_cache_stats()
+        first_instantiated_type = generic_type.instantiate([int_type])
+        second_instantiated_type = generic_type.instantiate([int_type])
+        stats_after = types.instantiation_cache_stats()
+        
+        assert first_instantiated_type is second_instantiated_type
+        assert_equal(1, stats_after.misses - stats_before.misses)
+        assert_equal(1, stats_after.hits - stats_before.hits)
 
 
 @istest
@@ -88,6 +129,32 @@ class SubTypeTests(object):
         assert types.is_sub_type(super_super_type, cls)
         assert not types.is_sub_type(cls, super_super_type)
         
+    @istest
+    def sub_typing_of_classes_is_cached_after_attributes_are_added_to_other_types(self):
+        super_type = types.class_type("Parent")
+        cls = types.class_type("Blah", base_classes=[super_type])
+        assert types.is_sub_type(super_type, cls)
+        
+        types.class_type("Other").attrs.add("name", types.str_type)
+        stats_before = types.sub_type_cache_stats()
+        assert types.is_sub_type(super_type, cls)
+        stats_after = types.sub_type_cache_stats()
+        
+        assert_equal(1, stats_after.hits - stats_before.hits)
+        assert_equal(0, stats_after.misses - stats_before.misses)
+        
+    @istest
+    def sub_typing_cache_does_not_keep_types_alive(self):
+        super_type = types.class_type("Parent")
+        cls = types.class_type("Blah", base_classes=[super_type])
+        assert types.is_sub_type(super_type, cls)
+        
+        cls_reference = weakref.ref(cls)
+        del cls
+        gc.collect()
+        
+        assert cls_reference() is None
+        
     @istest
     def class_type_is_subtype_of_structural_type_if_it_has_subset_of_attrs(self):
         # TODO: how to handle sub-typing of mutable attrs
@@ -112,6 +179,17 @@ class SubTypeTests(object):
         assert not types.is_sub_type(structural_type, cls)
         assert not types.is_sub_type(cls, structural_type)
         
+    @istest
+    def class_type_is_subtype_of_structural_type_once_missing_attrs_are_added(self):
+        cls = types.class_type("Person")
+        structural_type = types.structural_type("HasName", [
+            types.attr("name", types.str_type),
+        ])
+        
+        assert not types.is_sub_type(structural_type, cls)
+        cls.attrs.add("name", types.str_type)
+        assert types.is_sub_type(structural_type, cls)
+        
     @istest
     def class_type_is_subtype_of_structural_type_if_attr_is_subtype_of_attr_on_structural_type(self):
         cls = types.class_type("Person", [
@@ -0,0 +1,90 @@
+import os
+
+from nose.tools import istest, assert_equal
+
+from nope import injection, errors
+from nope.check import ModuleChecker
+from nope.source import SourceTree
+from nope.watch import Watcher
+import tempman
+from .testing import write_file
+
+
+@istest
+def changes_to_module_are_picked_up_on_next_check():
+    with tempman.create_temp_dir() as temp_dir:
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nx = 1\n")
+        watcher = injection.create_injector().get(Watcher)
+        
+        assert watcher.check(path).is_valid
+        write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nx = 1 + 'one'\n")
+        assert not watcher.check(path).is_valid
+
+
+@istest
+def importers_of_changed_module_are_checked_again():
+    with tempman.create_temp_dir() as temp_dir:
+        write_file(temp_dir.path, "message.py", "value = 1\n")
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nfrom message import value\nx = value + 1\n")
+        watcher = injection.create_injector().get(Watcher)
+        
+        assert watcher.check(path).is_valid
+        write_file(temp_dir.path, "message.py", "value = 'one'\n")
+        result = watcher.check(path)
+        
+        assert not result.is_valid
+        assert isinstance(result.error, errors.NoSuchAttributeError)
+
+
+@istest
+def modules_added_to_search_path_are_found_on_next_check():
+    with tempman.create_temp_dir() as temp_dir:
+        lib_path = os.path.join(temp_dir.path, "lib")
+        os.mkdir(lib_path)
+        path = write_file(temp_dir.path, "main.py", "#!/usr/bin/env python\nfrom message import value\nx = value + 1\n")
+        watcher = injection.create_injector(search_paths=[lib_path]).get(Watcher)
+        
+        assert not watcher.check(path).is_valid
+        write_file(lib_path, "message.py", "value = 1\n")
+        assert watcher.check(path).is_valid
+
+
+@istest
+def modules_added_to_current_directory_are_found_on_next_check():
+    with tempman.create_temp_dir() as temp_dir:
+        original_cwd = os.getcwd()
+        os.chdir(temp_dir.path)
+        try:
+            write_file(".", "main.py", "#!/usr/bin/env python\nfrom message import value\nx = value + 1\n")
+            watcher = injection.create_injector().get(Watcher)
+            
+            assert not watcher.check("main.py").is_valid
+            write_file(".", "message.py", "value = 1\n")
+            assert watcher.check("main.py").is_valid
+        finally:
+            os.chdir(original_cwd)
+
+
+@istest
+def invalidating_module_invalidates_transitive_importers_only():
+    with tempman.create_temp_dir() as temp_dir:
+        package_path = os.path.join(temp_dir.path, "package")
+        os.mkdir(package_path)
+        write_file(package_path, "__init__.py", "")
+        write_file(package_path, "a.py", "value = 1\n")
+        write_file(package_path, "b.py", "from .a import value\n")
+        write_file(package_path, "c.py", "from .b import value\n")
+        write_file(package_path, "d.py", "value = 1\n")
+        injector = injection.create_injector()
+        source_tree = injector.get(SourceTree)
+        module_checker = injector.get(ModuleChecker)
+        
+        for name in ["c.py", "d.py"]:
+            module_checker.check(source_tree.module(os.path.join(package_path, name)))
+        
+        invalidated_paths = module_checker.invalidate(os.path.join(package_path, "a.py"))
+        
+        assert_equal(
+            set(os.path.join(package_path, name) for name in ["a.py", "b.py", "c.py"]),
+            invalidated_paths,
+        )